@@ -0,0 +1,37 @@
+import featureio
+
+from .datagen import random_genes
+
+
+class TimeArithmetic:
+    params = [10 ** 4, 10 ** 5]
+
+    def setup(self, n):
+        self.a = random_genes(n, seed=0)
+        self.b = random_genes(n, seed=1)
+        self.sorted_a = sorted(self.a, key=lambda g: (g.chrom, g.start))
+        self.sizes = {f'chr{i}': 10 ** 8 + 10 ** 6 for i in range(20)}
+
+    def time_merge_exons(self, n):
+        for _ in featureio.merge_exons(self.a):
+            pass
+
+    def time_merge_exons_sorted(self, n):
+        for _ in featureio.merge_exons(self.sorted_a, sorted_input=True):
+            pass
+
+    def time_intersect(self, n):
+        for _ in featureio.intersect(self.a, self.b):
+            pass
+
+    def time_subtract(self, n):
+        for _ in featureio.subtract(self.a, self.b, stranded=True):
+            pass
+
+    def time_complement(self, n):
+        for _ in featureio.complement(self.a, self.sizes):
+            pass
+
+    def time_coverage(self, n):
+        for _ in featureio.coverage(self.a):
+            pass
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+
+import featureio
+
+from .datagen import random_genes
+
+
+class TimeParquet:
+    """Write and read genes as Parquet, BED12 and GFF3 files"""
+    params = [10 ** 5, 10 ** 6]
+    formats = {'parquet': 'parquet', 'bed12': 'bed', 'gff3': 'gff3'}
+
+    def setup(self, n):
+        self.genes = random_genes(n)
+        self.tmpdir = tempfile.mkdtemp()
+        self.filenames = {format: os.path.join(self.tmpdir, f'genes.{ext}')
+                          for format, ext in self.formats.items()}
+        for format, filename in self.filenames.items():
+            featureio.write(self.genes, filename, format)
+        self.table = featureio.to_arrow(self.genes)
+
+    def teardown(self, n):
+        shutil.rmtree(self.tmpdir)
+
+    def _read(self, format, lazy=False):
+        for _ in featureio.parse(self.filenames[format], format, lazy=lazy):
+            pass
+
+    def time_write_parquet(self, n):
+        featureio.write(self.genes, self.filenames['parquet'], 'parquet')
+
+    def time_write_bed12(self, n):
+        featureio.write(self.genes, self.filenames['bed12'], 'bed12')
+
+    def time_write_gff3(self, n):
+        featureio.write(self.genes, self.filenames['gff3'], 'gff3')
+
+    def time_read_parquet(self, n):
+        self._read('parquet')
+
+    def time_read_bed12(self, n):
+        self._read('bed12')
+
+    def time_read_parquet_lazy(self, n):
+        self._read('parquet', lazy=True)
+
+    def time_read_bed12_lazy(self, n):
+        self._read('bed12', lazy=True)
+
+    def time_to_arrow(self, n):
+        featureio.to_arrow(self.genes)
+
+    def time_from_arrow(self, n):
+        for _ in featureio.from_arrow(self.table):
+            pass
+
+    def track_size_parquet(self, n):
+        return os.path.getsize(self.filenames['parquet'])
+
+    def track_size_bed12(self, n):
+        return os.path.getsize(self.filenames['bed12'])
+
+    def track_size_gff3(self, n):
+        return os.path.getsize(self.filenames['gff3'])
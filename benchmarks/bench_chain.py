@@ -0,0 +1,21 @@
+import io
+
+import featureio
+
+from .datagen import random_chains, random_genes
+
+
+class TimeLiftover:
+    params = [10 ** 4, 10 ** 5]
+
+    def setup(self, n):
+        self.chains = random_chains()
+        self.index = featureio.ChainIndex(
+            featureio.parse_chains(io.StringIO(self.chains)))
+        self.genes = random_genes(n)
+
+    def time_parse_chains(self, n):
+        featureio.ChainIndex(featureio.parse_chains(io.StringIO(self.chains)))
+
+    def time_liftover(self, n):
+        featureio.liftover(self.genes, self.index)
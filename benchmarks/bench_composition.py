@@ -0,0 +1,48 @@
+import os
+import shutil
+import tempfile
+
+import featureio
+
+from .datagen import BACTERIAL_GENOME, write_random_fasta
+
+
+class TimeBacterialComposition:
+    def setup(self):
+        self.index = featureio.IndexedFasta(BACTERIAL_GENOME)
+
+    def time_base_composition(self):
+        featureio.sequence_composition(self.index)
+
+    def time_gc_windows(self):
+        featureio.sequence_composition(self.index, window=1000)
+
+    def time_kmers_12(self):
+        featureio.genome_composition(self.index, k=12, canonical=True)
+
+    def time_stream_kmers_6(self):
+        featureio.sequence_composition(BACTERIAL_GENOME, k=6, window=1000)
+
+
+class TimeSyntheticComposition:
+    params = [10 ** 7, 10 ** 9]
+
+    def setup(self, size):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'genome.fa')
+        write_random_fasta(self.filename, size)
+
+    def teardown(self, size):
+        shutil.rmtree(self.tmpdir)
+
+    def time_stream_kmers_8(self, size):
+        featureio.sequence_composition(self.filename, k=8, window=10000)
+
+    def time_stream_kmers_8_parallel(self, size):
+        featureio.sequence_composition(self.filename, k=8, window=10000,
+                                       workers=os.cpu_count())
+
+    def time_indexed_kmers_8_parallel(self, size):
+        featureio.sequence_composition(featureio.IndexedFasta(self.filename),
+                                       k=8, window=10000,
+                                       workers=os.cpu_count())
@@ -0,0 +1,162 @@
+import io
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import featureio
+
+from .datagen import random_sequence, write_random_fasta
+
+
+class TimeFastaRecords:
+    params = [10 ** 6, 10 ** 7]
+
+    def setup(self, size):
+        self.seq = featureio.Seq('chr1', random_sequence(size))
+        self.text = featureio.fasta_string(self.seq, wrap=60)
+
+    def time_parse_fasta_record(self, size):
+        featureio.parse_fasta_record(io.StringIO(self.text))
+
+    def time_read_fasta_chunks(self, size):
+        for _ in featureio.read_fasta_chunks(io.StringIO(self.text)):
+            pass
+
+    def time_fasta_string(self, size):
+        featureio.fasta_string(self.seq, wrap=60)
+
+    def time_write_fasta_record(self, size):
+        featureio.write_fasta_record(self.seq, io.StringIO(), wrap=60)
+
+
+class TimeByteSeq:
+    """Take 1,000 windows of 10kb from transformed views of a chromosome"""
+    params = [10 ** 7, 10 ** 8]
+
+    def setup(self, size):
+        text = random_sequence(size, alphabet=b'ACGTacgtN')
+        self.seq = featureio.Seq('chr1', text)
+        self.byte_seq = featureio.ByteSeq('chr1', text)
+        rng = np.random.default_rng(0)
+        self.starts = rng.integers(0, size - 10000, 1000).tolist()
+
+    def time_str_upper_windows(self, size):
+        upper = self.seq.sequence.upper()
+        for start in self.starts:
+            upper[start:start + 10000]
+
+    def time_byte_seq_upper_windows(self, size):
+        upper = self.byte_seq.upper()
+        for start in self.starts:
+            str(upper[start:start + 10000])
+
+    def time_byte_seq_reverse_complement_windows(self, size):
+        rc = self.byte_seq.mask().reverse_complement()
+        for start in self.starts:
+            str(rc[start:start + 10000])
+
+    def time_soft_masked_intervals(self, size):
+        self.byte_seq.soft_masked_intervals()
+
+
+class TimeFastaWriter:
+    """Write a genome of 10 sequences or many short sequences"""
+    params = [[10 ** 7, 10 ** 8], [10, 10 ** 5]]
+
+    def setup(self, size, n_seqs):
+        length = size // n_seqs
+        sequence = random_sequence(length)
+        self.seqs = [featureio.Seq(f'seq{i}', sequence)
+                     for i in range(n_seqs)]
+        self.bytes_processed = size
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'out.fa')
+
+    def teardown(self, size, n_seqs):
+        shutil.rmtree(self.tmpdir)
+
+    def time_write_fasta_record(self, size, n_seqs):
+        with open(self.filename, 'w') as f:
+            for seq in self.seqs:
+                featureio.write_fasta_record(seq, f, wrap=60)
+
+    def time_fasta_writer(self, size, n_seqs):
+        featureio.write_fasta(self.seqs, self.filename, wrap=60)
+
+    def time_fasta_writer_index(self, size, n_seqs):
+        featureio.write_fasta(self.seqs, self.filename, wrap=60, index=True)
+
+
+class TimeIndexFetch:
+    """Fetch 10,000 exon-sized regions from an indexed genome"""
+    params = [10 ** 6, 10 ** 8, 10 ** 9]
+
+    def setup(self, size):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'genome.fa')
+        write_random_fasta(self.filename, size)
+        self.index = featureio.IndexedFasta(self.filename)
+        self.twobit_filename = os.path.join(self.tmpdir, 'genome.2bit')
+        featureio.write_twobit(
+            (featureio.Seq(name, self.index.fetch(name, 0, record.length))
+             for name, record in self.index.records.items()),
+            self.twobit_filename)
+        rng = np.random.default_rng(0)
+        length = size // 10
+        starts = np.sort(rng.integers(0, length - 500, 10000))
+        self.regions = [(f'chr{i % 10}', int(s), int(s) + 200)
+                        for i, s in enumerate(starts)]
+
+    def teardown(self, size):
+        shutil.rmtree(self.tmpdir)
+
+    def time_load_index(self, size):
+        featureio.IndexedFasta(self.filename)
+
+    def time_get_sequence(self, size):
+        self.index.get_sequence('chr0')
+
+    def time_fetch_each(self, size):
+        for region in self.regions:
+            self.index.fetch(*region)
+
+    def time_fetch_many(self, size):
+        self.index.fetch_many(self.regions)
+
+    def time_twobit_fetch_many(self, size):
+        featureio.TwoBitFile(self.twobit_filename).fetch_many(self.regions)
+
+
+class TimeCollectionStartup:
+    """Open a collection of 10,000 contig files and fetch one region"""
+
+    def setup(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.files = []
+        sequence = random_sequence(1000)
+        for i in range(10000):
+            filename = os.path.join(self.tmpdir, f'contig{i}.fa')
+            with open(filename, 'w') as f:
+                f.write(f'>contig{i}\n{sequence}\n')
+            with open(filename + '.fai', 'w') as f:
+                f.write(f'contig{i}\t1000\t{len(f"contig{i}") + 2}\t1000\t'
+                        f'1001\n')
+            self.files.append(filename)
+        self.lookup = os.path.join(self.tmpdir, 'lookup')
+        featureio.IndexedFastaCollection(self.files).write_lookup(self.lookup)
+
+    def teardown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def time_eager(self):
+        featureio.IndexedFastaCollection(self.files).fetch(
+            'contig5000', 0, 100)
+
+    def time_lookup(self):
+        featureio.IndexedFastaCollection(lookup=self.lookup).fetch(
+            'contig5000', 0, 100)
+
+    def time_lazy_init(self):
+        featureio.IndexedFastaCollection(self.files, lazy=True)
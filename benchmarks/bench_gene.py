@@ -0,0 +1,136 @@
+import io
+
+import numpy as np
+
+import featureio
+
+from .datagen import random_bed12, random_genes
+
+
+class TimeGeneInit:
+    params = [10 ** 4, 10 ** 5, 10 ** 6]
+
+    def setup(self, n):
+        self.fields = [line.split('\t')
+                       for line in random_bed12(n).splitlines()]
+
+    def time_gene_init(self, n):
+        for fields in self.fields:
+            featureio.Gene(*fields)
+
+    def time_gene_init_lazy(self, n):
+        for fields in self.fields:
+            featureio.Gene(*fields, lazy=True)
+
+
+class TimeGeneCopy:
+    def setup(self):
+        self.genes = random_genes(10 ** 5)
+
+    def time_copy(self):
+        for gene in self.genes:
+            gene.copy()
+
+    def time_modified(self):
+        for gene in self.genes:
+            gene.modified(name='copy')
+
+
+class TimeFilterPipeline:
+    """Filter genes by location, then copy the survivors"""
+
+    def setup(self):
+        self.bed = random_bed12(10 ** 5)
+
+    def _filter(self, lazy):
+        return [g.modified(name=g.name + '.kept')
+                for g in featureio.parse(io.StringIO(self.bed), 'bed12',
+                                         lazy=lazy)
+                if g.chrom == 'chr1' and g.start < 5 * 10 ** 7]
+
+    def time_filter_eager(self):
+        self._filter(lazy=False)
+
+    def time_filter_lazy(self):
+        self._filter(lazy=True)
+
+
+class TimeOverlap:
+    """Compare every gene with its neighbors on the same chromosome"""
+
+    def setup(self):
+        genes = sorted(random_genes(10 ** 4),
+                       key=lambda g: (g.chrom, g.start))
+        self.pairs = list(zip(genes, genes[1:]))
+
+    def time_locus_overlap(self):
+        for a, b in self.pairs:
+            a.locus_overlap(b)
+
+    def time_overlap(self):
+        for a, b in self.pairs:
+            a.overlap(b)
+
+    def time_overlap_length(self):
+        for a, b in self.pairs:
+            a.overlap_length(b)
+
+    def time_is_isoform(self):
+        for a, b in self.pairs:
+            a.is_isoform(b)
+
+    def time_identical(self):
+        for a, b in self.pairs:
+            a.identical(b)
+
+
+class TimeCoordinates:
+    """Map positions between genome and transcript coordinates"""
+
+    def setup(self):
+        self.genes = random_genes(10 ** 4)
+        rng = np.random.default_rng(0)
+        self.positions = [rng.integers(g.start, g.end, 100)
+                          for g in self.genes]
+        self.scalar_positions = [p[:10].tolist() for p in self.positions]
+
+    def time_genome_to_transcript(self):
+        for gene, positions in zip(self.genes, self.scalar_positions):
+            for pos in positions:
+                gene.genome_to_transcript(pos)
+
+    def time_transcript_to_genome(self):
+        for gene, positions in zip(self.genes, self.scalar_positions):
+            for pos in positions:
+                gene.transcript_to_genome(pos - gene.start)
+
+    def time_genome_to_transcript_array(self):
+        for gene, positions in zip(self.genes, self.positions):
+            gene.genome_to_transcript(positions)
+
+    def time_cds_to_genome_array(self):
+        for gene, positions in zip(self.genes, self.positions):
+            gene.cds_to_genome(positions - gene.start)
+
+
+class TimeDeduplicate:
+    """Collapse the transcripts of three merged copies of an annotation"""
+    params = [10 ** 5, 10 ** 6]
+
+    def setup(self, n):
+        self.genes = [g for seed in (0, 0, 1)
+                      for g in random_genes(n // 3, seed=seed)]
+        self.sorted_genes = sorted(self.genes, key=lambda g: g.chrom)
+
+    def time_deduplicate(self, n):
+        for _ in featureio.deduplicate(self.genes):
+            pass
+
+    def time_deduplicate_cds_longest(self, n):
+        for _ in featureio.deduplicate(self.genes, 'cds_exons',
+                                       keep='longest'):
+            pass
+
+    def time_deduplicate_grouped(self, n):
+        for _ in featureio.deduplicate(self.sorted_genes, grouped=True):
+            pass
@@ -0,0 +1,50 @@
+import io
+
+import featureio
+
+from .datagen import random_augustus_gtf, random_bed12, random_genes, \
+    random_psl
+
+
+class TimeReaders:
+    params = [10 ** 4, 10 ** 5, 10 ** 6]
+
+    def setup(self, n):
+        self.text = {'bed12': random_bed12(n), 'psl': random_psl(n),
+                     'blatpsl': random_psl(n, header=True),
+                     'augustusgtf': random_augustus_gtf(n)}
+
+    def _parse(self, format):
+        for _ in featureio.parse(io.StringIO(self.text[format]), format):
+            pass
+
+    def time_bed12(self, n):
+        self._parse('bed12')
+
+    def time_psl(self, n):
+        self._parse('psl')
+
+    def time_blatpsl(self, n):
+        self._parse('blatpsl')
+
+    def time_augustusgtf(self, n):
+        self._parse('augustusgtf')
+
+
+class TimeWriters:
+    params = [10 ** 4, 10 ** 5, 10 ** 6]
+
+    def setup(self, n):
+        self.genes = random_genes(n)
+
+    def _write(self, format):
+        featureio.write(self.genes, io.StringIO(), format)
+
+    def time_bed12(self, n):
+        self._write('bed12')
+
+    def time_gff3(self, n):
+        self._write('gff3')
+
+    def time_augustus_exon_hints(self, n):
+        self._write('augustus_exon_hints')
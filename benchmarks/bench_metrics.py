@@ -0,0 +1,28 @@
+import io
+
+import featureio
+from featureio import metrics
+
+from .datagen import random_bed12
+
+
+class TimeMetricsOverhead:
+    """Parse and write with metrics disabled and enabled"""
+
+    def setup(self):
+        self.bed = random_bed12(10 ** 5)
+
+    def teardown(self):
+        metrics.disable()
+        metrics.reset()
+
+    def _parse_and_write(self, enabled):
+        metrics.enable() if enabled else metrics.disable()
+        genes = featureio.parse(io.StringIO(self.bed), 'bed12')
+        featureio.write(genes, io.StringIO(), 'bed12')
+
+    def time_disabled(self):
+        self._parse_and_write(False)
+
+    def time_enabled(self):
+        self._parse_and_write(True)
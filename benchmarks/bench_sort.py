@@ -0,0 +1,36 @@
+import os
+import shutil
+import tempfile
+
+import featureio
+
+from .datagen import random_bed12
+
+
+class TimeSort:
+    params = [[10 ** 5], ['1G', '4M'], [1, 4]]
+
+    def setup(self, n, mem_limit, workers):
+        self.tmp = tempfile.mkdtemp()
+        self.bed = os.path.join(self.tmp, 'genes.bed')
+        with open(self.bed, 'w') as f:
+            f.write(random_bed12(n))
+        self.out = os.path.join(self.tmp, 'sorted.bed')
+
+    def teardown(self, n, mem_limit, workers):
+        shutil.rmtree(self.tmp)
+
+    def time_sort(self, n, mem_limit, workers):
+        featureio.sort(self.bed, 'bed12', self.out, mem_limit=mem_limit,
+                       workers=workers, tmp_dir=self.tmp)
+
+
+
+class TimeSortInMemory(TimeSort):
+    """Parse, sort and write all genes in memory, for comparison"""
+    params = [[10 ** 5], ['1G'], [1]]
+
+    def time_sort(self, n, mem_limit, workers):
+        genes = sorted(featureio.parse(self.bed, 'bed12'),
+                       key=lambda g: (g.chrom, g.start))
+        featureio.write(genes, self.out, 'bed12')
@@ -0,0 +1,23 @@
+import featureio
+
+from .datagen import random_genes
+
+
+class TimeJunctions:
+    params = [10 ** 5, 10 ** 6]
+
+    def setup(self, n):
+        # alignments of a tenth as many transcripts, so junctions repeat
+        genes = random_genes(n // 10)
+        self.genes = genes * 10
+        self.a = featureio.junctions(genes[:len(genes) // 2 + 1000])
+        self.b = featureio.junctions(genes[len(genes) // 2:])
+
+    def time_junctions(self, n):
+        featureio.junctions(self.genes)
+
+    def time_intersect_junctions(self, n):
+        featureio.intersect_junctions(self.a, self.b)
+
+    def time_union_junctions(self, n):
+        featureio.union_junctions(self.a, self.b)
@@ -0,0 +1,43 @@
+import featureio
+
+from .datagen import random_cds
+
+
+def translate_codon_dict(seq, codons={
+        a + b + c: aa for (a, b, c), aa in zip(
+            ((a, b, c) for a in 'TCAG' for b in 'TCAG' for c in 'TCAG'),
+            featureio.genetic_codes[1])}):
+    """The per-codon dict lookup translate_many replaces"""
+    return ''.join(codons.get(seq[i:i + 3], 'X')
+                   for i in range(0, len(seq) - 2, 3))
+
+
+class TimeTranslate:
+    """A proteome-sized set of coding sequences: 20,000 CDS of ~1.3kb"""
+
+    def setup(self):
+        self.cds = random_cds(20000)
+        self.genome = ''.join(self.cds[:1000])
+        self.exons = [seq[i:i + 150] for seq in self.cds[:2000]
+                      for i in range(0, len(seq) - 149, 150)]
+
+    def time_translate_many(self):
+        featureio.translate_many(self.cds)
+
+    def time_translate_each(self):
+        for seq in self.cds:
+            featureio.translate(seq)
+
+    def time_translate_many_exons(self):
+        featureio.translate_many(self.exons)
+
+    def time_translate_each_exon(self):
+        for seq in self.exons:
+            featureio.translate(seq)
+
+    def time_translate_codon_dict(self):
+        for seq in self.cds:
+            translate_codon_dict(seq)
+
+    def time_find_orfs(self):
+        featureio.find_orfs(self.genome)
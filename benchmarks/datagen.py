@@ -0,0 +1,171 @@
+"""Deterministic synthetic data for the benchmarks.
+
+All generators take a seed, so the same data is produced on every run and
+timings are comparable between runs.
+"""
+import io
+import os
+
+import numpy as np
+
+import featureio
+
+BACTERIAL_GENOME = os.path.join(os.path.dirname(__file__), os.pardir, 'tests',
+                                'fasta',
+                                'GCF_000744065.1_ASM74406v1_genomic.fna')
+
+
+def random_sequence(length, seed=0, alphabet=b'ACGT'):
+    """Generate a random sequence of the given length"""
+    rng = np.random.default_rng(seed)
+    bases = np.frombuffer(alphabet, dtype=np.uint8)
+    return bases[rng.integers(0, len(bases), length)].tobytes().decode()
+
+
+def random_cds(n, mean_codons=430, seed=0):
+    """Generate n random coding sequences of about mean_codons codons"""
+    rng = np.random.default_rng(seed)
+    bases = np.frombuffer(b'ACGT', dtype=np.uint8)
+    lengths = rng.poisson(mean_codons, n) * 3
+    return [bases[rng.integers(0, 4, length)].tobytes().decode()
+            for length in lengths]
+
+
+def write_random_fasta(filename, size, n_seqs=10, wrap=60, seed=0,
+                       block_size=1 << 24):
+    """Write a random soft-masked fasta file of about size bases
+
+    The index is written alongside as ``filename.fai``.
+    """
+    rng = np.random.default_rng(seed)
+    alphabet = np.frombuffer(b'ACGTacgtN', dtype=np.uint8)
+    weights = np.array([0.2] * 4 + [0.04] * 4 + [0.04])
+    index = []
+    with open(filename, 'wb') as f:
+        for n in range(n_seqs):
+            header = f'>chr{n}\n'.encode()
+            f.write(header)
+            length = size // n_seqs
+            index.append(f'chr{n}\t{length}\t{f.tell()}\t{wrap}\t{wrap + 1}\n')
+            remaining = length
+            while remaining:
+                block = min(remaining, block_size - block_size % wrap)
+                seq = alphabet[rng.choice(len(alphabet), block, p=weights)]
+                lines = np.full((-(-block // wrap), wrap + 1), ord('\n'),
+                                dtype=np.uint8)
+                lines.ravel()[np.arange(block) // wrap * (wrap + 1) +
+                              np.arange(block) % wrap] = seq
+                f.write(lines.tobytes()[:block + block // wrap +
+                                        (1 if block % wrap else 0)])
+                remaining -= block
+    with open(filename + '.fai', 'w') as f:
+        f.writelines(index)
+
+
+def _random_transcripts(n, seed, n_chroms=20, chrom_size=10 ** 8):
+    """Generate n transcripts as (chrom, start, strand, sizes, starts)"""
+    rng = np.random.default_rng(seed)
+    for i in range(n):
+        n_exons = int(rng.integers(1, 15))
+        sizes = rng.integers(50, 500, n_exons)
+        introns = rng.integers(50, 5000, n_exons)
+        starts = np.concatenate(([0], np.cumsum(sizes + introns)[:-1]))
+        yield (f'chr{i % n_chroms}', int(rng.integers(0, chrom_size)),
+               '+-'[i % 2], sizes, starts)
+
+
+def random_bed12(n, seed=0):
+    """Generate BED12 text of n multi-exon genes on 20 chromosomes"""
+    lines = []
+    for i, (chrom, start, strand, sizes, starts) in enumerate(
+            _random_transcripts(n, seed)):
+        end = start + int(starts[-1] + sizes[-1])
+        lines.append('\t'.join(map(str, [
+            chrom, start, end, f'gene{i}', 0, strand,
+            start + int(sizes[0]) // 2, end - int(sizes[-1]) // 2, 0,
+            len(sizes), ','.join(map(str, sizes)),
+            ','.join(map(str, starts))])))
+    return '\n'.join(lines) + '\n'
+
+
+def random_psl(n, seed=0, header=False):
+    """Generate PSL text of n spliced alignments on 20 chromosomes
+
+    :param header: if True, include the 5 line header written by blat
+    """
+    lines = ['psLayout version 3', '', 'match\tmis-\trep.', 'match\tmatch',
+             '-' * 20] if header else []
+    for i, (chrom, start, strand, sizes, starts) in enumerate(
+            _random_transcripts(n, seed)):
+        length = int(sizes.sum())
+        end = start + int(starts[-1] + sizes[-1])
+        q_starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        lines.append('\t'.join(map(str, [
+            length, 0, 0, 0, 0, 0, len(sizes) - 1, end - start - length,
+            strand, f'read{i}', length, 0, length, chrom, 10 ** 8 + 10 ** 6,
+            start, end, len(sizes), ','.join(map(str, sizes)) + ',',
+            ','.join(map(str, q_starts)) + ',',
+            ','.join(map(str, starts + start)) + ','])))
+    return '\n'.join(lines) + '\n'
+
+
+def random_augustus_gtf(n, seed=0):
+    """Generate augustus GTF output of n single-transcript genes"""
+    lines = []
+    for i, (chrom, start, strand, sizes, starts) in enumerate(
+            _random_transcripts(n, seed)):
+        # augustus coordinates are 1-based and inclusive
+        start += 1
+        end = start + int(starts[-1] + sizes[-1]) - 1
+        gene, transcript = f'g{i}', f'g{i}.t1'
+        attrs = f'transcript_id "{transcript}"; gene_id "{gene}";'
+        lines.append(f'# start gene {gene}')
+        lines.append(f'{chrom}\tAUGUSTUS\tgene\t{start}\t{end}\t1\t{strand}'
+                     f'\t.\t{gene}')
+        lines.append(f'{chrom}\tAUGUSTUS\ttranscript\t{start}\t{end}\t1\t'
+                     f'{strand}\t.\t{transcript}')
+        for size, offset in zip(sizes, starts):
+            exon_start = start + int(offset)
+            exon_end = exon_start + int(size) - 1
+            for feature in ('CDS', 'exon'):
+                lines.append(f'{chrom}\tAUGUSTUS\t{feature}\t{exon_start}\t'
+                             f'{exon_end}\t1\t{strand}\t0\t{attrs}')
+        protein = random_sequence(int(sizes.sum()) // 3, seed=i,
+                                  alphabet=b'ACDEFGHIKLMNPQRSTVWY')
+        protein_lines = [protein[j:j + 60] for j in
+                         range(0, len(protein), 60)] or ['']
+        lines.append(f'# protein sequence = [{protein_lines[0]}')
+        lines.extend(f'# {line}' for line in protein_lines[1:])
+        lines[-1] += ']'
+        lines.append(f'# end gene {gene}')
+    return '\n'.join(lines) + '\n'
+
+
+def random_genes(n, seed=0, lazy=False):
+    """Generate a list of n multi-exon ``Gene`` objects"""
+    return list(featureio.parse(io.StringIO(random_bed12(n, seed)), 'bed12',
+                                lazy=lazy))
+
+
+def random_chains(seed=0, n_chroms=20, chrom_size=10 ** 8, block_size=10000):
+    """Generate chain file text mapping the chromosomes of the random genes
+
+    Each chromosome is mapped by a single chain of blocks of about
+    block_size bases with small gaps, alternating between strands.
+    """
+    rng = np.random.default_rng(seed)
+    lines = []
+    for i in range(n_chroms):
+        n = chrom_size // block_size
+        sizes = rng.integers(block_size // 2, block_size * 3 // 2, n)
+        t_gaps = rng.integers(0, 20, n - 1)
+        q_gaps = rng.integers(0, 20, n - 1)
+        t_end = int(sizes.sum() + t_gaps.sum())
+        q_size = int(sizes.sum() + q_gaps.sum())
+        lines.append(f'chain {i} chr{i} {t_end} + 0 {t_end} chr{i}_new '
+                     f'{q_size} {"+-"[i % 2]} 0 {q_size} {i + 1}')
+        lines.extend(f'{s}\t{t}\t{q}'
+                     for s, t, q in zip(sizes[:-1], t_gaps, q_gaps))
+        lines.append(f'{sizes[-1]}')
+        lines.append('')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,194 @@
+"""Run the featureio benchmarks and track regressions.
+
+Benchmarks are written in the style of airspeed velocity (asv): each
+``bench_*.py`` module in this directory contains classes with optional
+``setup`` and ``teardown`` methods and ``time_*`` methods which are timed.
+A class may define ``params``, a list of values (or a list of lists of
+values for several parameters), which are passed to ``setup`` and to each
+benchmark method. A class may also set ``bytes_processed`` in ``setup``,
+in which case the throughput of its benchmarks is reported in MB/s.
+``track_*`` methods are not timed; the value they return, such as a file
+size, is stored apart from the timings and reported against the baseline
+without being checked for regressions.
+
+Usage::
+
+    python -m benchmarks.run [--quick] [--output results.json]
+        [--baseline baseline.json] [--threshold 0.2] [pattern]
+
+With ``--baseline``, each result is compared against the baseline and the
+exit status is 1 if any benchmark is slower by more than the threshold.
+"""
+import argparse
+import datetime
+import importlib
+import inspect
+import itertools
+import json
+import pkgutil
+import platform
+import sys
+import time
+
+import benchmarks
+
+
+def _param_combinations(cls, quick=False):
+    """List the parameter tuples a benchmark class should be run with"""
+    params = getattr(cls, 'params', None)
+    if params is None:
+        return [()]
+    if not params or not isinstance(params[0], (list, tuple)):
+        params = [params]
+    if quick:
+        params = [values[:1] for values in params]
+    return list(itertools.product(*params))
+
+
+def benchmark_name(module, cls, method, params=()):
+    """The name under which a benchmark result is stored"""
+    name = f'{module}.{cls.__name__}.{method}'
+    if params:
+        name += '(' + ', '.join(repr(p) for p in params) + ')'
+    return name
+
+
+def discover(pattern='', quick=False):
+    """Find all benchmarks whose name contains pattern
+
+    :return: a list of (name, class, method name, params) tuples
+    """
+    found = []
+    for module_info in pkgutil.iter_modules(benchmarks.__path__):
+        if not module_info.name.startswith('bench_'):
+            continue
+        module = importlib.import_module(f'benchmarks.{module_info.name}')
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for params in _param_combinations(cls, quick):
+                for method in sorted(vars(cls)):
+                    name = benchmark_name(module_info.name, cls, method,
+                                          params)
+                    if method.startswith(('time_', 'track_')) and \
+                            pattern in name:
+                        found.append((name, cls, method, params))
+    return found
+
+
+def run(pattern='', quick=False, repeat=5):
+    """Run all benchmarks matching pattern
+
+    Benchmarks of the same class and parameters share a single ``setup``.
+
+    :return: a dictionary of benchmark names and their best time in seconds,
+        and a dictionary of tracked benchmark names and their values
+    """
+    results = {}
+    tracked = {}
+    groups = itertools.groupby(discover(pattern, quick),
+                               key=lambda b: (b[1], b[3]))
+    for (cls, params), group in groups:
+        instance = cls()
+        if hasattr(instance, 'setup'):
+            instance.setup(*params)
+        try:
+            for name, _, method, _ in group:
+                if method.startswith('track_'):
+                    tracked[name] = getattr(instance, method)(*params)
+                    print(f'{name}\t{tracked[name]}', flush=True)
+                    continue
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    getattr(instance, method)(*params)
+                    timings.append(time.perf_counter() - start)
+                results[name] = min(timings)
+                throughput = ''
+                if getattr(instance, 'bytes_processed', None):
+                    throughput = '\t{:.1f} MB/s'.format(
+                        instance.bytes_processed / results[name] / 1e6)
+                print(f'{name}\t{results[name]:.6f}s{throughput}',
+                      flush=True)
+        finally:
+            if hasattr(instance, 'teardown'):
+                instance.teardown(*params)
+    return results, tracked
+
+
+def compare(results, baseline, threshold=0.2):
+    """Compare results against baseline results
+
+    :param results: a dictionary of benchmark names and times
+    :param baseline: a dictionary of benchmark names and times
+    :param threshold: the fraction by which a benchmark may be slower than
+        its baseline before it is considered a regression
+    :return: a list of (name, baseline time, time, ratio) of regressions
+    """
+    regressions = []
+    for name in sorted(set(results) & set(baseline)):
+        ratio = results[name] / baseline[name] if baseline[name] else 1.0
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append((name, baseline[name], results[name], ratio))
+            flag = '\tREGRESSION'
+        elif ratio < 1 / (1 + threshold):
+            flag = '\timproved'
+        print(f'{name}\t{baseline[name]:.6f}s -> {results[name]:.6f}s\t'
+              f'{ratio:.2f}x{flag}')
+    return regressions
+
+
+def compare_tracked(tracked, baseline):
+    """Report tracked values against baseline values
+
+    Tracked values are not timings, so they are not checked for regressions.
+
+    :param tracked: a dictionary of tracked benchmark names and values
+    :param baseline: a dictionary of tracked benchmark names and values
+    """
+    for name in sorted(set(tracked) & set(baseline)):
+        change = ''
+        if baseline[name]:
+            change = f'\t{tracked[name] / baseline[name]:.2f}x'
+        print(f'{name}\t{baseline[name]} -> {tracked[name]}{change}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('pattern', nargs='?', default='',
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('--quick', action='store_true',
+                        help='only run the first value of each parameter')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of timings per benchmark')
+    parser.add_argument('--output', help='write the results to this file')
+    parser.add_argument('--baseline',
+                        help='compare against results in this file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown against the baseline as a '
+                             'fraction (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    results, tracked = run(args.pattern, args.quick, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'date': datetime.datetime.now().isoformat(),
+                       'python': platform.python_version(),
+                       'machine': platform.node(),
+                       'results': results, 'tracked': tracked},
+                      f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.threshold)
+        compare_tracked(tracked, baseline.get('tracked', {}))
+        if regressions:
+            print(f'{len(regressions)} benchmark(s) regressed by more than '
+                  f'{args.threshold:.0%}', file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,12 @@
+from . import metrics
 from .gene import *
 from .parsers import *
 from .seq import *
-
+from .twobit import *
+from .translation import *
+from .composition import *
+from .arithmetic import *
+from .extsort import *
+from .chain import *
+from .splicing import *
+from .arrow import *
@@ -0,0 +1,245 @@
+"""Genome arithmetic on the exons of gene sets.
+
+The exons of the genes are partitioned by chromosome (and strand, if
+``stranded``) and each partition is processed with vectorized sweeps over
+sorted start and end arrays. Intervals are 0-based and half-open, as in BED,
+and results are (chrom, start, end, strand) tuples, which can be passed
+directly to ``IndexedFasta.fetch_many``. When the strand is ignored it is
+reported as '.'.
+
+If the genes are grouped by chromosome, e.g. sorted by chromosome and start,
+pass ``sorted_input=True`` to process one chromosome at a time instead of
+reading all genes into memory first.
+"""
+import itertools
+from typing import Dict, Iterable, Iterator, Tuple
+
+import numpy as np
+
+from .gene import Gene
+
+Interval = Tuple[str, int, int, str]
+_empty = np.zeros(0, dtype=np.int64)
+
+
+def _partition_key(gene: Gene, stranded: bool) -> Tuple[str, str]:
+    return gene.chrom, gene.strand if stranded else '.'
+
+
+def _exon_arrays(genes: Iterable[Gene], comparison: str):
+    """Collect the exon starts and ends of genes into arrays"""
+    starts, ends = [], []
+    for gene in genes:
+        for start, end in getattr(gene, comparison):
+            starts.append(start)
+            ends.append(end)
+    return np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+
+
+def _partitions(genes: Iterable[Gene], comparison: str, stranded: bool,
+                sorted_input: bool):
+    """Yield the exon arrays of each chromosome (and strand) of genes"""
+    def key(gene):
+        return _partition_key(gene, stranded)
+
+    if sorted_input:
+        if stranded:
+            # the strands of a chromosome are interleaved in sorted input
+            for _, group in itertools.groupby(genes, lambda g: g.chrom):
+                group = sorted(group, key=lambda g: g.strand)
+                for k, strand_group in itertools.groupby(group, key):
+                    yield (k, *_exon_arrays(strand_group, comparison))
+        else:
+            for k, group in itertools.groupby(genes, key):
+                yield (k, *_exon_arrays(group, comparison))
+    else:
+        groups: Dict[Tuple[str, str], list] = {}
+        for gene in genes:
+            groups.setdefault(key(gene), []).append(gene)
+        for k in sorted(groups):
+            yield (k, *_exon_arrays(groups.pop(k), comparison))
+
+
+def _merge(starts: np.ndarray, ends: np.ndarray, distance: int = 0):
+    """Merge overlapping or book-ended intervals into sorted disjoint ones"""
+    if not len(starts):
+        return _empty, _empty
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    new = np.ones(len(starts), dtype=bool)
+    new[1:] = starts[1:] > reach[:-1] + distance
+    first = np.flatnonzero(new)
+    return starts[first], np.maximum.reduceat(ends, first)
+
+
+def _sweep(a_starts, a_ends, b_starts, b_ends):
+    """Sweep over the boundaries of two interval sets.
+
+    :return: the starts and ends of the elementary segments between
+        consecutive boundaries and the depth of a and b on each
+    """
+    positions = np.concatenate((a_starts, a_ends, b_starts, b_ends))
+    n_a, n_b = len(a_starts), len(b_starts)
+    a_delta = np.concatenate((np.ones(n_a, np.int64), -np.ones(n_a, np.int64),
+                              np.zeros(2 * n_b, np.int64)))
+    b_delta = np.concatenate((np.zeros(2 * n_a, np.int64),
+                              np.ones(n_b, np.int64), -np.ones(n_b, np.int64)))
+    order = np.argsort(positions, kind='stable')
+    positions = positions[order]
+    a_depth = np.cumsum(a_delta[order])
+    b_depth = np.cumsum(b_delta[order])
+    # the depth of a segment is the depth after the last event at its start
+    last = np.flatnonzero(positions[1:] != positions[:-1])
+    return (positions[last], positions[last + 1], a_depth[last],
+            b_depth[last])
+
+
+def _intervals(key: Tuple[str, str], starts: np.ndarray,
+               ends: np.ndarray) -> Iterator[Interval]:
+    chrom, strand = key
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        yield chrom, start, end, strand
+
+
+def merge_exons(genes: Iterable[Gene], comparison: str = 'exons',
+                stranded: bool = False, distance: int = 0,
+                sorted_input: bool = False) -> Iterator[Interval]:
+    """Merge the overlapping exons of genes.
+
+    :param genes: an iterable of ``Gene`` objects
+    :param comparison: the exon attribute to use, 'exons' or 'cds_exons'
+    :param stranded: if True, only merge exons on the same strand
+    :param distance: also merge exons at most this far apart. Book-ended
+        exons are always merged.
+    :param sorted_input: if True, genes are grouped by chromosome and are
+        processed one chromosome at a time
+    :return: an iterator of (chrom, start, end, strand) intervals
+    """
+    for key, starts, ends in _partitions(genes, comparison, stranded,
+                                         sorted_input):
+        yield from _intervals(key, *_merge(starts, ends, distance))
+
+
+def _set_operation(a: Iterable[Gene], b: Iterable[Gene], keep,
+                   comparison: str, stranded: bool,
+                   sorted_input: bool) -> Iterator[Interval]:
+    b_partitions = {key: _merge(starts, ends) for key, starts, ends in
+                    _partitions(b, comparison, stranded, False)}
+    for key, starts, ends in _partitions(a, comparison, stranded,
+                                         sorted_input):
+        a_starts, a_ends = _merge(starts, ends)
+        b_starts, b_ends = b_partitions.get(key, (_empty, _empty))
+        seg_starts, seg_ends, a_depth, b_depth = _sweep(a_starts, a_ends,
+                                                        b_starts, b_ends)
+        selected = keep(a_depth, b_depth)
+        yield from _intervals(key, *_merge(seg_starts[selected],
+                                           seg_ends[selected]))
+
+
+def intersect(a: Iterable[Gene], b: Iterable[Gene],
+              comparison: str = 'exons', stranded: bool = False,
+              sorted_input: bool = False) -> Iterator[Interval]:
+    """Find the regions covered by exons of both a and b.
+
+    All genes of b are read into memory, while the genes of a are streamed
+    if ``sorted_input`` is True.
+
+    :param a: an iterable of ``Gene`` objects
+    :param b: an iterable of ``Gene`` objects
+    :param comparison: the exon attribute to use, 'exons' or 'cds_exons'
+    :param stranded: if True, only intersect exons on the same strand
+    :param sorted_input: if True, a is grouped by chromosome
+    :return: an iterator of disjoint (chrom, start, end, strand) intervals
+    """
+    return _set_operation(a, b, lambda a_depth, b_depth: (a_depth > 0) &
+                          (b_depth > 0), comparison, stranded, sorted_input)
+
+
+def subtract(a: Iterable[Gene], b: Iterable[Gene],
+             comparison: str = 'exons', stranded: bool = False,
+             sorted_input: bool = False) -> Iterator[Interval]:
+    """Find the regions covered by exons of a but not by exons of b.
+
+    All genes of b are read into memory, while the genes of a are streamed
+    if ``sorted_input`` is True.
+
+    :param a: an iterable of ``Gene`` objects
+    :param b: an iterable of ``Gene`` objects
+    :param comparison: the exon attribute to use, 'exons' or 'cds_exons'
+    :param stranded: if True, only subtract exons on the same strand
+    :param sorted_input: if True, a is grouped by chromosome
+    :return: an iterator of disjoint (chrom, start, end, strand) intervals
+    """
+    return _set_operation(a, b, lambda a_depth, b_depth: (a_depth > 0) &
+                          (b_depth == 0), comparison, stranded, sorted_input)
+
+
+def _chrom_sizes(chrom_sizes) -> Dict[str, int]:
+    """Get sequence lengths from a dictionary or a sequence index"""
+    if hasattr(chrom_sizes, 'lengths'):
+        return chrom_sizes.lengths()
+    return dict(chrom_sizes)
+
+
+def complement(genes: Iterable[Gene], chrom_sizes,
+               comparison: str = 'exons') -> Iterator[Interval]:
+    """Find the regions of the genome not covered by any exon.
+
+    :param genes: an iterable of ``Gene`` objects
+    :param chrom_sizes: a dictionary of chromosome lengths, or an
+        ``IndexedFasta``, ``TwoBitFile`` or ``IndexedFastaCollection`` whose
+        sequence lengths are used
+    :param comparison: the exon attribute to use, 'exons' or 'cds_exons'
+    :return: an iterator of (chrom, start, end, '.') intervals in the order
+        of ``chrom_sizes``
+    """
+    partitions = {key[0]: _merge(starts, ends) for key, starts, ends in
+                  _partitions(genes, comparison, False, False)}
+    for chrom, length in _chrom_sizes(chrom_sizes).items():
+        starts, ends = partitions.get(chrom, (_empty, _empty))
+        seg_starts, seg_ends, genome, covered = _sweep(
+            np.array([0]), np.array([length]), np.clip(starts, 0, length),
+            np.clip(ends, 0, length))
+        selected = (genome > 0) & (covered == 0)
+        yield from _intervals((chrom, '.'), seg_starts[selected],
+                              seg_ends[selected])
+
+
+def coverage(genes: Iterable[Gene], comparison: str = 'exons',
+             stranded: bool = False, sorted_input: bool = False,
+             chrom_sizes=None) -> Iterator[Tuple[str, int, int, str, int]]:
+    """Compute the per-base depth of exons, as runs of equal depth.
+
+    :param genes: an iterable of ``Gene`` objects
+    :param comparison: the exon attribute to use, 'exons' or 'cds_exons'
+    :param stranded: if True, compute the depth of each strand separately
+    :param sorted_input: if True, genes are grouped by chromosome and are
+        processed one chromosome at a time
+    :param chrom_sizes: if given, also report runs of zero depth up to the
+        end of each chromosome with exons. See ``complement``.
+    :return: an iterator of (chrom, start, end, strand, depth) runs, like a
+        bedGraph
+    """
+    sizes = None if chrom_sizes is None else _chrom_sizes(chrom_sizes)
+    for key, starts, ends in _partitions(genes, comparison, stranded,
+                                         sorted_input):
+        if sizes is not None:
+            bounds = np.array([0, sizes.get(key[0], ends.max(initial=0))])
+        else:
+            bounds = _empty
+        seg_starts, seg_ends, depth, in_bounds = _sweep(
+            starts, ends, bounds[:1], bounds[1:])
+        selected = depth > 0 if sizes is None else in_bounds > 0
+        seg_starts, seg_ends, depth = \
+            seg_starts[selected], seg_ends[selected], depth[selected]
+        # join adjacent segments of the same depth into runs
+        new = np.ones(len(depth), dtype=bool)
+        new[1:] = (seg_starts[1:] != seg_ends[:-1]) | (depth[1:] != depth[:-1])
+        first = np.flatnonzero(new)
+        run_ends = seg_ends[np.append(first[1:], len(depth)) - 1] \
+            if len(first) else _empty
+        chrom, strand = key
+        for start, end, d in zip(seg_starts[first].tolist(),
+                                 run_ends.tolist(), depth[first].tolist()):
+            yield chrom, start, end, strand, d
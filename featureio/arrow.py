@@ -0,0 +1,169 @@
+"""Conversion of genes to and from Apache Arrow, and Parquet files.
+
+Genes become rows with the BED12 fields as columns. The blocks are stored as
+``list<int32>`` columns of sizes and starts relative to the gene start, as in
+BED12, ``attrs`` as a ``map<string, string>`` column and auxiliary attributes
+such as the ``seq`` and ``gene_id`` of the augustus reader as a struct column
+``aux`` with one field per attribute. The struct is omitted when no gene has
+auxiliary attributes.
+
+Genes are converted in record batches, so that reading and writing Parquet
+files streams with constant memory. pyarrow is only needed when these
+functions are used.
+"""
+import functools
+import itertools
+from typing import Iterable, Iterator
+
+from . import gene
+
+_fields = ['chrom', 'start', 'end', 'name', 'score', 'strand', 'cds_start',
+           'cds_end', 'item_rgb']
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('pyarrow is required for Arrow and Parquet '
+                          'conversion. Install it with pip install pyarrow')
+    return pyarrow
+
+
+def _parquet():
+    _pyarrow()
+    import pyarrow.parquet
+    return pyarrow.parquet
+
+
+def gene_schema(aux=None):
+    """The Arrow schema of converted genes
+
+    :param aux: the ``pyarrow.StructType`` of the auxiliary attributes, or
+        None if there are none
+    :return: a ``pyarrow.Schema``
+    """
+    pa = _pyarrow()
+    fields = [('chrom', pa.dictionary(pa.int32(), pa.string())),
+              ('start', pa.int64()), ('end', pa.int64()),
+              ('name', pa.string()), ('score', pa.int64()),
+              ('strand', pa.string()), ('cds_start', pa.int64()),
+              ('cds_end', pa.int64()), ('item_rgb', pa.string()),
+              ('block_sizes', pa.list_(pa.int32())),
+              ('block_starts', pa.list_(pa.int32())),
+              ('attrs', pa.map_(pa.string(), pa.string()))]
+    if aux is not None:
+        fields.append(('aux', aux))
+    return pa.schema(fields)
+
+
+def _aux_type(genes):
+    """Infer the struct type of the auxiliary attributes of genes"""
+    pa = _pyarrow()
+    aux = [{k: g.__dict__[k] for k in g._aux_attrs} for g in genes]
+    if not any(aux):
+        return None
+    return pa.array(aux).type
+
+
+def _record_batch(genes, schema):
+    pa = _pyarrow()
+    columns = [[getattr(g, f) for g in genes] for f in _fields[:8]]
+    columns.append([str(g.item_rgb) for g in genes])
+    columns.append([g.block_sizes for g in genes])
+    columns.append([g.block_starts for g in genes])
+    columns.append([[(k, str(v)) for k, v in g.attrs.items()]
+                    for g in genes])
+    if 'aux' in schema.names:
+        aux_type = schema.field('aux').type
+        names = {aux_type.field(i).name for i in range(aux_type.num_fields)}
+        aux = []
+        for g in genes:
+            if not names.issuperset(g._aux_attrs):
+                raise ValueError(
+                    f'Gene {g.name} has auxiliary attributes '
+                    f'{",".join(sorted(set(g._aux_attrs) - names))} which '
+                    f'are not in the schema')
+            aux.append({k: g.__dict__[k] for k in g._aux_attrs})
+        columns.append(aux)
+    elif any(g._aux_attrs for g in genes):
+        raise ValueError('Genes with auxiliary attributes cannot be '
+                         'converted with a schema without them')
+    return pa.RecordBatch.from_arrays(
+        [pa.array(c, type=t) for c, t in zip(columns, schema.types)],
+        schema=schema)
+
+
+def to_record_batches(genes: Iterable[gene.Gene], batch_size: int = 65536,
+                      schema=None) -> Iterator:
+    """Convert genes to Arrow record batches
+
+    :param genes: an iterable of ``Gene`` objects
+    :param batch_size: the number of genes per batch
+    :param schema: the schema of the batches. By default, it is inferred
+        from the auxiliary attributes of the first batch.
+    :return: an iterator of ``pyarrow.RecordBatch``
+    """
+    genes = iter(genes)
+    while True:
+        batch = list(itertools.islice(genes, batch_size))
+        if not batch:
+            return
+        if schema is None:
+            schema = gene_schema(_aux_type(batch))
+        yield _record_batch(batch, schema)
+
+
+def to_arrow(genes: Iterable[gene.Gene], batch_size: int = 65536):
+    """Convert genes to an Arrow table
+
+    :param genes: an iterable of ``Gene`` objects
+    :param batch_size: the number of genes per record batch
+    :return: a ``pyarrow.Table``
+    """
+    pa = _pyarrow()
+    genes = list(genes)
+    schema = gene_schema(_aux_type(genes))
+    return pa.Table.from_batches(
+        to_record_batches(genes, batch_size, schema), schema=schema)
+
+
+def _batch_genes(batch, cls):
+    pa = _pyarrow()
+    import pyarrow.compute as pc
+    columns = [batch.column(f).to_pylist() for f in _fields]
+    blocks = [pc.binary_join(batch.column(f).cast(pa.list_(pa.string())),
+                             ',').to_pylist()
+              for f in ('block_sizes', 'block_starts')]
+    block_counts = pc.list_value_length(batch.column('block_sizes'))
+    columns.insert(9, block_counts.to_pylist())
+    columns.extend(blocks)
+    attrs = batch.column('attrs').to_pylist()
+    if 'aux' in batch.schema.names:
+        aux = ({k: v for k, v in a.items() if v is not None}
+               for a in batch.column('aux').to_pylist())
+    else:
+        aux = itertools.repeat({})
+    for fields, a, kwargs in zip(zip(*columns), attrs, aux):
+        yield cls(*fields, dict(a), **kwargs)
+
+
+def from_arrow(data, cls=gene.Gene, lazy: bool = False) \
+        -> Iterator[gene.Gene]:
+    """Convert Arrow data written by ``to_arrow`` to genes
+
+    :param data: a ``pyarrow.Table``, a ``pyarrow.RecordBatch`` or an
+        iterable of record batches
+    :param cls: the class of the genes
+    :param lazy: defer parsing the blocks until they are accessed
+    :return: an iterator of genes
+    """
+    pa = _pyarrow()
+    if lazy:
+        cls = functools.partial(cls, lazy=True)
+    if isinstance(data, pa.Table):
+        data = data.to_batches()
+    elif isinstance(data, pa.RecordBatch):
+        data = [data]
+    for batch in data:
+        yield from _batch_genes(batch, cls)
@@ -0,0 +1,326 @@
+"""Projection of genes between assemblies with UCSC chain files.
+
+The aligned blocks of all chains are indexed per target chromosome as sorted
+arrays of block starts and ends. The exon boundaries and CDS bounds of all
+genes on a chromosome are then mapped with a single vectorized search over
+these arrays, instead of a search per exon.
+"""
+import itertools
+from typing import Dict, Iterable, Iterator, List, TextIO, Tuple, Union
+
+import attr
+import numpy as np
+
+from .gene import Gene
+
+_flipped_strand = {'+': '-', '-': '+'}
+
+
+@attr.s
+class Chain(object):
+    """A chain of gapless aligned blocks between two assemblies.
+
+    The target (t) is the assembly genes are mapped from and the query (q)
+    the assembly they are mapped to. Query coordinates are on the query
+    strand, i.e. counted from the end of the query sequence when
+    ``q_strand`` is '-'.
+
+    :param t_starts: the target starts of the blocks
+    :param q_starts: the query starts of the blocks
+    :param sizes: the sizes of the blocks
+    """
+    score: int = attr.ib(converter=int)
+    t_name: str = attr.ib()
+    t_size: int = attr.ib(converter=int)
+    t_strand: str = attr.ib()
+    t_start: int = attr.ib(converter=int)
+    t_end: int = attr.ib(converter=int)
+    q_name: str = attr.ib()
+    q_size: int = attr.ib(converter=int)
+    q_strand: str = attr.ib()
+    q_start: int = attr.ib(converter=int)
+    q_end: int = attr.ib(converter=int)
+    id: str = attr.ib()
+    t_starts: np.ndarray = attr.ib(repr=False)
+    q_starts: np.ndarray = attr.ib(repr=False)
+    sizes: np.ndarray = attr.ib(repr=False)
+
+
+def _chain_blocks(t_start: int, q_start: int, lines: List[List[str]]):
+    """Convert (size, dt, dq) lines into block start and size arrays"""
+    values = np.zeros((len(lines), 3), dtype=np.int64)
+    for i, fields in enumerate(lines):
+        values[i, :len(fields)] = [int(f) for f in fields]
+    sizes = values[:, 0]
+    # each block starts after the previous blocks and gaps
+    t_starts = t_start + np.concatenate(
+        ([0], np.cumsum(sizes[:-1] + values[:-1, 1])))
+    q_starts = q_start + np.concatenate(
+        ([0], np.cumsum(sizes[:-1] + values[:-1, 2])))
+    return t_starts, q_starts, sizes
+
+
+def read_chains(file: TextIO) -> Iterator[Chain]:
+    """Read chains from an opened chain file
+
+    :param file: an opened chain file
+    :return: an iterator of ``Chain`` objects
+    """
+    header, lines = None, []
+    for line in file:
+        fields = line.split()
+        if not fields or fields[0].startswith('#'):
+            continue
+        if fields[0] == 'chain':
+            if header is not None:
+                raise ValueError(f"Chain {header[11]} has no final block")
+            if len(fields) < 13:
+                raise ValueError(f"Invalid chain header: {line.strip()}")
+            header = fields[1:13]
+        elif header is None:
+            raise ValueError(f"Alignment data outside a chain: "
+                             f"{line.strip()}")
+        else:
+            lines.append(fields)
+            if len(fields) == 1:
+                yield Chain(*header, *_chain_blocks(int(header[4]),
+                                                    int(header[9]), lines))
+                header, lines = None, []
+    if header is not None:
+        raise ValueError(f"Chain {header[11]} has no final block")
+
+
+def parse_chains(maybe_handle: Union[TextIO, str]) -> Iterator[Chain]:
+    """Read chains from a chain file
+
+    :param maybe_handle: a filename or an opened chain file
+    :return: an iterator of ``Chain`` objects
+    """
+    if isinstance(maybe_handle, str):
+        with open(maybe_handle) as f:
+            yield from read_chains(f)
+    else:
+        yield from read_chains(maybe_handle)
+
+
+class ChainIndex(object):
+    """An index of the aligned blocks of chains by target chromosome.
+
+    The blocks of a chromosome are assumed not to overlap, as in the netted
+    ``over.chain`` files distributed by UCSC. Where they do overlap, a
+    position is mapped with the block starting closest before it.
+    """
+
+    def __init__(self, chains: Iterable[Chain]):
+        """Build the index
+
+        :param chains: an iterable of ``Chain`` objects
+        """
+        self.chains = list(chains)
+        self.q_names = [chain.q_name for chain in self.chains]
+        self.q_sizes = np.array([chain.q_size for chain in self.chains],
+                                dtype=np.int64)
+        self.q_reverse = np.array([chain.q_strand == '-'
+                                   for chain in self.chains], dtype=bool)
+        by_chrom: Dict[str, List[int]] = {}
+        for i, chain in enumerate(self.chains):
+            by_chrom.setdefault(chain.t_name, []).append(i)
+        self.blocks: Dict[str, Tuple[np.ndarray, ...]] = {}
+        for chrom, indices in by_chrom.items():
+            t_starts = np.concatenate([self.chains[i].t_starts
+                                       for i in indices])
+            order = np.argsort(t_starts, kind='stable')
+            sizes = np.concatenate([self.chains[i].sizes
+                                    for i in indices])[order]
+            # bases in the blocks before each block, to count aligned bases
+            aligned = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+            self.blocks[chrom] = (
+                t_starts[order], t_starts[order] + sizes,
+                np.concatenate([self.chains[i].q_starts
+                                for i in indices])[order],
+                np.concatenate([np.full(len(self.chains[i].sizes), i)
+                                for i in indices])[order],
+                sizes, aligned)
+
+    def __contains__(self, chrom: str) -> bool:
+        return chrom in self.blocks
+
+    def map_positions(self, chrom: str, positions: np.ndarray):
+        """Map bases of a target chromosome to the query
+
+        :param chrom: the target chromosome
+        :param positions: an array of 0-based positions
+        :return: an array of the index of the chain each position is mapped
+            with, -1 if the position is not in any block, and an array of the
+            mapped positions on the forward strand of the query
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        if chrom not in self.blocks:
+            return (np.full(len(positions), -1, dtype=np.int64),
+                    np.zeros(len(positions), dtype=np.int64))
+        t_starts, t_ends, q_starts, chains, _, _ = self.blocks[chrom]
+        block = np.searchsorted(t_starts, positions, side='right') - 1
+        clipped = np.maximum(block, 0)
+        mapped = (block >= 0) & (positions < t_ends[clipped])
+        chain = np.where(mapped, chains[clipped], -1)
+        q = q_starts[clipped] + positions - t_starts[clipped]
+        reverse = self.q_reverse[chains[clipped]]
+        q = np.where(reverse, self.q_sizes[chains[clipped]] - 1 - q, q)
+        return chain, q
+
+    def aligned_bases(self, chrom: str, starts: np.ndarray,
+                      ends: np.ndarray) -> np.ndarray:
+        """Count the bases of target intervals in aligned blocks
+
+        :param chrom: the target chromosome
+        :param starts: an array of 0-based interval starts
+        :param ends: an array of interval ends
+        :return: the number of bases of each interval in a block
+        """
+        if chrom not in self.blocks:
+            return np.zeros(len(starts), dtype=np.int64)
+        t_starts, _, _, _, sizes, aligned = self.blocks[chrom]
+
+        def before(positions):
+            block = np.searchsorted(t_starts, positions, side='right') - 1
+            clipped = np.maximum(block, 0)
+            count = aligned[clipped] + np.clip(
+                positions - t_starts[clipped], 0, sizes[clipped])
+            return np.where(block >= 0, count, 0)
+
+        return before(np.asarray(ends)) - before(np.asarray(starts))
+
+
+def _lift_chrom(genes: List[Gene], chrom: str, index: ChainIndex,
+                min_match: float):
+    """Map the genes of a single target chromosome
+
+    :return: a list with a lifted ``Gene`` or a failure reason for each gene
+    """
+    n_exons = np.array([len(g.exons) for g in genes], dtype=np.int64)
+    bounds = np.concatenate(([0], np.cumsum(n_exons)))
+    flatten = itertools.chain.from_iterable
+    exons = np.fromiter(flatten(flatten(g.exons for g in genes)),
+                        dtype=np.int64).reshape(-1, 2)
+    cds = np.fromiter(flatten((g.cds_start, g.cds_end) for g in genes),
+                      dtype=np.int64).reshape(-1, 2)
+    coding = cds[:, 1] > cds[:, 0]
+
+    # map the first and last base of every exon and CDS at once
+    n = len(exons)
+    chain, q = index.map_positions(chrom, np.concatenate(
+        (exons[:, 0], exons[:, 1] - 1, cds[:, 0], cds[:, 1] - 1)))
+    start_chain, end_chain = chain[:n], chain[n:2 * n]
+    cds_chain = chain[2 * n:].reshape(2, -1)
+    q_starts, q_ends, q_cds = q[:n], q[n:2 * n], q[2 * n:].reshape(2, -1)
+
+    gene_of_exon = np.repeat(np.arange(len(genes)), n_exons)
+    # genes without exons are reported as deleted
+    gene_chain = np.append(start_chain, -1)[bounds[:-1]]
+    exon_chain = gene_chain[gene_of_exon]
+
+    def any_per_gene(flags):
+        return np.bincount(gene_of_exon, weights=flags,
+                           minlength=len(genes)) > 0
+
+    def sum_per_gene(values):
+        return np.bincount(gene_of_exon, weights=values, minlength=len(genes))
+
+    deleted = (n_exons == 0) | any_per_gene((start_chain < 0) |
+                                            (end_chain < 0))
+    split = any_per_gene((start_chain != exon_chain) |
+                         (end_chain != exon_chain))
+    partial = sum_per_gene(index.aligned_bases(
+        chrom, exons[:, 0], exons[:, 1])) < \
+        min_match * sum_per_gene(exons[:, 1] - exons[:, 0])
+    cds_deleted = coding & ((cds_chain < 0).any(axis=0) |
+                            (cds_chain != gene_chain).any(axis=0))
+
+    # exons mapped to the reverse strand swap their ends and their order
+    reverse = np.append(index.q_reverse, False)[gene_chain]
+    exon_reverse = reverse[gene_of_exon]
+    new_starts = np.where(exon_reverse, q_ends, q_starts)
+    new_ends = np.where(exon_reverse, q_starts, q_ends) + 1
+    same_gene = gene_of_exon[1:] == gene_of_exon[:-1]
+    overlapping = np.where(exon_reverse[1:], new_ends[1:] > new_starts[:-1],
+                           new_starts[1:] < new_ends[:-1]) & same_gene
+    rearranged = any_per_gene(new_starts >= new_ends) | any_per_gene(
+        np.append(overlapping, False))
+    cds_starts = np.where(reverse, q_cds[1], q_cds[0])
+    cds_ends = np.where(reverse, q_cds[0], q_cds[1]) + 1
+
+    reasons = np.select(
+        [deleted, split, partial, cds_deleted, rearranged],
+        ['Deleted in new', 'Split in new', 'Partially deleted in new',
+         'CDS deleted in new', 'Rearranged in new'], '')
+    # indexing lists is much faster than indexing arrays in the loop
+    new_starts, new_ends = new_starts.tolist(), new_ends.tolist()
+    reasons, reverse, coding, bounds, gene_chain, cds_starts, cds_ends = (
+        a.tolist() for a in (reasons, reverse, coding, bounds, gene_chain,
+                             cds_starts, cds_ends))
+    results = []
+    for i, gene in enumerate(genes):
+        if reasons[i]:
+            results.append(reasons[i])
+            continue
+        first, last = bounds[i], bounds[i + 1]
+        starts, ends = new_starts[first:last], new_ends[first:last]
+        if reverse[i]:
+            starts.reverse()
+            ends.reverse()
+            strand = _flipped_strand.get(gene.strand, gene.strand)
+        else:
+            strand = gene.strand
+        start = starts[0]
+        cds_start, cds_end = (cds_starts[i], cds_ends[i]) \
+            if coding[i] else (start, start)
+        results.append(gene.__class__(
+            index.q_names[gene_chain[i]], start, ends[-1], gene.name,
+            gene.score, strand, cds_start, cds_end, gene.item_rgb,
+            len(starts), ','.join([str(e - s) for s, e in zip(starts, ends)]),
+            ','.join([str(s - start) for s in starts]), dict(gene.attrs),
+            lazy=True, **{k: gene.__dict__[k] for k in gene._aux_attrs}))
+    return results
+
+
+def liftover(genes: Iterable[Gene], chains, min_match: float = 0.95
+             ) -> Tuple[List[Gene], List[Tuple[Gene, str]]]:
+    """Project genes to another assembly.
+
+    A gene is mapped if the first and last bases of all of its exons and of
+    its CDS are aligned in the same chain and at least ``min_match`` of its
+    exonic bases are aligned. Exons may contain gaps of the chain, as with
+    UCSC liftOver. Genes mapped to the reverse strand of the query have their
+    strand flipped.
+
+    :param genes: an iterable of ``Gene`` objects
+    :param chains: a ``ChainIndex``, an iterable of ``Chain`` objects, or the
+        filename or an opened handle of a chain file
+    :param min_match: the minimum fraction of exonic bases which must be
+        aligned
+    :return: a list of lifted genes, in the order of ``genes``, and a list of
+        (gene, reason) tuples of the genes which could not be mapped
+    """
+    if not isinstance(chains, ChainIndex):
+        if isinstance(chains, str) or hasattr(chains, 'read'):
+            chains = parse_chains(chains)
+        chains = ChainIndex(chains)
+    genes = list(genes)
+    by_chrom: Dict[str, List[int]] = {}
+    for i, gene in enumerate(genes):
+        by_chrom.setdefault(gene.chrom, []).append(i)
+
+    results: List[Union[Gene, str]] = [None] * len(genes)
+    for chrom, indices in by_chrom.items():
+        lifted = _lift_chrom([genes[i] for i in indices], chrom, chains,
+                             min_match)
+        for i, result in zip(indices, lifted):
+            results[i] = result
+
+    lifted, failures = [], []
+    for gene, result in zip(genes, results):
+        if isinstance(result, str):
+            failures.append((gene, result))
+        else:
+            lifted.append(result)
+    return lifted, failures
@@ -0,0 +1,335 @@
+import collections
+import concurrent.futures
+from typing import Dict, Iterable, Iterator, Optional, TextIO, Tuple, Union
+
+import attr
+import numpy as np
+
+from .seq import read_fasta_chunks
+
+# k-mers are numbered in lexicographic order of ACGT, i.e. AA..A=0, TT..T=4^k-1
+MAX_K = 12
+_kmer_codes = np.full(256, 4, dtype=np.uint8)
+for _code, _bases in enumerate(['Aa', 'Cc', 'Gg', 'Tt']):
+    for _base in _bases:
+        _kmer_codes[ord(_base)] = _code
+
+
+@attr.s
+class Composition(object):
+    """Base composition, GC windows and k-mer counts of a sequence.
+
+    :param length: the number of bases counted
+    :param histogram: the number of occurrences of each byte value
+    :param kmers: the number of occurrences of each k-mer, or None
+    :param window: the size of the GC windows, or None
+    :param window_gc: the number of G and C bases in each window
+    :param window_bases: the number of A, C, G and T bases in each window
+    """
+    length: int = attr.ib(default=0)
+    histogram: np.ndarray = attr.ib(
+        factory=lambda: np.zeros(256, dtype=np.int64), repr=False)
+    kmers: Optional[np.ndarray] = attr.ib(default=None, repr=False)
+    window: Optional[int] = attr.ib(default=None)
+    window_gc: Optional[np.ndarray] = attr.ib(default=None, repr=False)
+    window_bases: Optional[np.ndarray] = attr.ib(default=None, repr=False)
+
+    @property
+    def k(self) -> Optional[int]:
+        """The length of the counted k-mers"""
+        return None if self.kmers is None else \
+            int(np.log2(len(self.kmers))) // 2
+
+    def count(self, bases: str) -> int:
+        """Count the occurrences of any of the bases, ignoring case
+
+        :param bases: a string of bases, e.g. 'GC'
+        :return: the total number of those bases
+        """
+        chars = set(bases.upper() + bases.lower())
+        return int(sum(self.histogram[ord(c)] for c in chars))
+
+    @property
+    def base_counts(self) -> Dict[str, int]:
+        """The number of occurrences of each base, ignoring case"""
+        return {base: self.count(base) for base in 'ACGTN'}
+
+    @property
+    def gc(self) -> float:
+        """The fraction of G and C among A, C, G and T bases"""
+        acgt = self.count('ACGT')
+        return self.count('GC') / acgt if acgt else float('nan')
+
+    @property
+    def n_fraction(self) -> float:
+        """The fraction of N bases"""
+        return self.count('N') / self.length if self.length else float('nan')
+
+    @property
+    def masked_fraction(self) -> float:
+        """The fraction of soft-masked (lower case) bases"""
+        masked = int(self.histogram[ord('a'):ord('z') + 1].sum())
+        return masked / self.length if self.length else float('nan')
+
+    def gc_windows(self) -> np.ndarray:
+        """The GC fraction in each window, nan if it contains no ACGT bases"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.window_gc / self.window_bases
+
+    def merge(self, other: 'Composition') -> 'Composition':
+        """Combine the counts of two compositions.
+
+        The windows are not kept, as the compositions may come from
+        different sequences.
+
+        :param other: another ``Composition``
+        :return: a new ``Composition`` with the sum of the counts
+        """
+        if self.kmers is None or other.kmers is None:
+            kmers = self.kmers if other.kmers is None else other.kmers
+        elif len(self.kmers) != len(other.kmers):
+            raise ValueError(f"Cannot merge {self.k}-mer counts with "
+                             f"{other.k}-mer counts")
+        else:
+            kmers = self.kmers + other.kmers
+        return Composition(self.length + other.length,
+                           self.histogram + other.histogram, kmers)
+
+
+def count_kmers(seq: Union[str, bytes], k: int,
+                canonical: bool = False) -> np.ndarray:
+    """Count the k-mers in a sequence with a 2-bit rolling hash.
+
+    k-mers containing bases other than ACGT are skipped.
+
+    :param seq: a sequence
+    :param k: the k-mer length, at most 12
+    :param canonical: if True, count each k-mer together with its reverse
+        complement at the smaller of the two indices
+    :return: an array of 4^k counts, in lexicographic order of the k-mers
+    """
+    return np.bincount(_kmer_indices(seq, k, canonical),
+                       minlength=4 ** k).astype(np.int64)
+
+
+def _kmer_indices(seq: Union[str, bytes], k: int,
+                  canonical: bool) -> np.ndarray:
+    """Compute the indices of all k-mers consisting only of ACGT"""
+    if not 0 < k <= MAX_K:
+        raise ValueError(f"k should be between 1 and {MAX_K}")
+    if isinstance(seq, str):
+        seq = seq.encode()
+    codes = _kmer_codes[np.frombuffer(seq, dtype=np.uint8)]
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.zeros(0, dtype=np.uint32)
+    invalid = np.concatenate(([0], np.cumsum(codes > 3)))
+    valid = invalid[k:] == invalid[:-k]
+    bits = codes & 3
+    kmers = np.zeros(n, dtype=np.uint32)
+    for i in range(k):
+        kmers <<= 2
+        kmers |= bits[i:i + n]
+    if canonical:
+        reverse = np.zeros(n, dtype=np.uint32)
+        for i in range(k):
+            reverse |= (3 - bits[i:i + n]).astype(np.uint32) << (2 * i)
+        kmers = np.minimum(kmers, reverse)
+    return kmers[valid]
+
+
+def kmer_string(index: int, k: int) -> str:
+    """Convert a k-mer index as used by ``count_kmers`` into its sequence"""
+    return ''.join('ACGT'[(index >> (2 * i)) & 3] for i in reversed(range(k)))
+
+
+def chunk_composition(chunk: str, tail: str = '', k: Optional[int] = None,
+                      canonical: bool = False,
+                      window: Optional[int] = None) -> Composition:
+    """Compute the composition of a single chunk of a sequence.
+
+    :param chunk: the sequence of the chunk. If windows are computed, the
+        chunk should begin at a multiple of the window size.
+    :param tail: the k-1 bases following the chunk, so that k-mers spanning
+        two chunks are counted
+    :param k: if given, count k-mers of this length
+    :param canonical: count canonical k-mers, see ``count_kmers``
+    :param window: if given, count GC in windows of this size
+    :return: a ``Composition`` of the chunk
+    """
+    data = np.frombuffer(chunk.encode(), dtype=np.uint8)
+    composition = Composition(len(data), np.bincount(data, minlength=256))
+    if k is not None:
+        composition.kmers = count_kmers(chunk + tail[:k - 1], k, canonical)
+    if window is not None:
+        upper = data & 0xDF
+        gc = (upper == ord('G')) | (upper == ord('C'))
+        acgt = gc | (upper == ord('A')) | (upper == ord('T'))
+        starts = np.arange(0, len(data), window)
+        composition.window = window
+        composition.window_gc = np.zeros(len(starts), dtype=np.int64)
+        composition.window_bases = np.zeros(len(starts), dtype=np.int64)
+        if len(data):
+            np.add.reduceat(gc, starts, dtype=np.int64,
+                            out=composition.window_gc)
+            np.add.reduceat(acgt, starts, dtype=np.int64,
+                            out=composition.window_bases)
+    return composition
+
+
+def _indexed_chunks(index, chunk_size: int, overlap: int
+                    ) -> Iterator[Tuple[str, str, str]]:
+    """Fetch chunks with their k-mer tails from an indexed sequence file"""
+    for name, length in index.lengths().items():
+        for start in range(0, max(length, 1), chunk_size):
+            seq = index.fetch(name, start, start + chunk_size + overlap)
+            yield name, seq[:chunk_size], seq[chunk_size:]
+
+
+def _stream_chunks(file: TextIO, chunk_size: int, overlap: int
+                   ) -> Iterator[Tuple[str, str, str]]:
+    """Read chunks with their k-mer tails from a fasta file"""
+    previous = None
+    for name, _, chunk in read_fasta_chunks(file, chunk_size):
+        if previous is not None:
+            tail = chunk[:overlap] if name == previous[0] else ''
+            yield previous[0], previous[1], tail
+        previous = (name, chunk)
+    if previous is not None:
+        yield previous[0], previous[1], ''
+
+
+def _chunk_task(args):
+    name, chunk, tail, k, canonical, window = args
+    composition = chunk_composition(chunk, window=window)
+    if k is None:
+        return name, composition, None
+    kmers = _kmer_indices(chunk + tail[:k - 1], k, canonical)
+    # chunks much smaller than the k-mer table are counted sparsely
+    if 4 * len(kmers) < 4 ** k:
+        return name, composition, np.unique(kmers, return_counts=True)
+    return name, composition, np.bincount(kmers, minlength=4 ** k)
+
+
+def _chunk_compositions(source, k: Optional[int], canonical: bool,
+                        window: Optional[int], chunk_size: int, workers: int
+                        ) -> Iterator[Tuple[str, Composition, object]]:
+    """Compute the composition and k-mer counts of each chunk in order
+
+    The k-mer counts are None, an array of 4^k counts or a tuple of the
+    indices and counts of the k-mers found.
+    """
+    if window is not None:
+        chunk_size = max(window, chunk_size - chunk_size % window)
+    overlap = 0 if k is None else k - 1
+    if isinstance(source, str):
+        with open(source) as f:
+            yield from _chunk_compositions(f, k, canonical, window,
+                                           chunk_size, workers)
+        return
+    if hasattr(source, 'fetch'):
+        chunks = _indexed_chunks(source, chunk_size, overlap)
+    else:
+        chunks = _stream_chunks(source, chunk_size, overlap)
+    tasks = ((name, chunk, tail, k, canonical, window)
+             for name, chunk, tail in chunks)
+
+    if workers == 1:
+        yield from map(_chunk_task, tasks)
+        return
+
+    # keep a bounded number of chunks in flight to limit memory use
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        pending = collections.deque()
+        for task in tasks:
+            pending.append(executor.submit(_chunk_task, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _accumulate(total: Composition, other: Composition, kmers,
+                k: Optional[int], windows: bool) -> None:
+    """Add the counts of a chunk to total in place"""
+    total.length += other.length
+    total.histogram += other.histogram
+    if kmers is not None:
+        if total.kmers is None:
+            total.kmers = np.zeros(4 ** k, dtype=np.int64)
+        if isinstance(kmers, tuple):
+            total.kmers[kmers[0]] += kmers[1]
+        else:
+            total.kmers += kmers
+    if windows and other.window is not None:
+        total.window = other.window
+        total.window_gc = np.concatenate(
+            [a for a in (total.window_gc, other.window_gc) if a is not None])
+        total.window_bases = np.concatenate(
+            [a for a in (total.window_bases, other.window_bases)
+             if a is not None])
+
+
+def sequence_composition(source, k: Optional[int] = None,
+                         canonical: bool = False,
+                         window: Optional[int] = None,
+                         chunk_size: int = 1 << 22,
+                         workers: int = 1) -> Dict[str, Composition]:
+    """Compute the composition of every sequence in a fasta file.
+
+    Sequences are read in chunks, so that memory use is bounded by the chunk
+    size and the k-mer tables, and chunks can be processed in parallel. Each
+    sequence gets its own k-mer table of 4^k counts, so use
+    ``genome_composition`` for k-mer spectra of files with many sequences.
+
+    :param source: an ``IndexedFasta``, ``TwoBitFile``, the path to a fasta
+        file or an opened fasta file
+    :param k: if given, count k-mers of this length (at most 12)
+    :param canonical: count canonical k-mers, see ``count_kmers``
+    :param window: if given, count GC in windows of this size
+    :param chunk_size: the number of bases per chunk. It is rounded down to a
+        multiple of the window size.
+    :param workers: the number of processes to use
+    :return: a dictionary of sequence names and their ``Composition``
+    """
+    results: Dict[str, Composition] = {}
+    for name, chunk_result, kmers in _chunk_compositions(
+            source, k, canonical, window, chunk_size, workers):
+        _accumulate(results.setdefault(name, Composition()), chunk_result,
+                    kmers, k, windows=True)
+    return results
+
+
+def genome_composition(source, k: Optional[int] = None,
+                       canonical: bool = False, chunk_size: int = 1 << 22,
+                       workers: int = 1) -> Composition:
+    """Compute the composition of all sequences in a fasta file together.
+
+    This is like ``sequence_composition``, but only a single k-mer table is
+    kept for the whole file.
+
+    :param source: an ``IndexedFasta``, ``TwoBitFile``, the path to a fasta
+        file or an opened fasta file
+    :param k: if given, count k-mers of this length (at most 12)
+    :param canonical: count canonical k-mers, see ``count_kmers``
+    :param chunk_size: the number of bases per chunk
+    :param workers: the number of processes to use
+    :return: a ``Composition`` without windows
+    """
+    total = Composition()
+    for _, chunk_result, kmers in _chunk_compositions(
+            source, k, canonical, None, chunk_size, workers):
+        _accumulate(total, chunk_result, kmers, k, windows=False)
+    return total
+
+
+def merge_compositions(compositions: Iterable[Composition]) -> Composition:
+    """Sum the counts of many compositions, e.g. of all chromosomes
+
+    :param compositions: an iterable of ``Composition`` objects
+    :return: a ``Composition`` without windows
+    """
+    total = Composition()
+    for c in compositions:
+        total = total.merge(c)
+    return total
@@ -0,0 +1,178 @@
+"""Sorting of annotation files larger than memory.
+
+Genes are parsed with the existing readers and buffered until the memory
+limit is reached. Each buffer is sorted and written to a temporary run file
+as a stream of pickled records, optionally by worker processes while the
+input is still being parsed. The runs are then merged with ``heapq.merge``
+and written with the existing writers.
+"""
+import concurrent.futures
+import heapq
+import operator
+import os
+import pickle
+import re
+import tempfile
+from typing import Callable, Iterator, List, Union
+
+from . import gene
+from .parsers import parse, write, _writers
+
+_record_key = operator.itemgetter(0, 1)
+_units = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+def parse_size(size: Union[int, str]) -> int:
+    """Convert a size such as 512M or 2G to a number of bytes"""
+    if isinstance(size, int):
+        return size
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)B?\s*', size.upper())
+    if match is None:
+        raise ValueError(f"Could not parse size {size}. Use e.g. 512M or 2G")
+    return int(float(match.group(1)) * _units[match.group(2)])
+
+
+def _key_function(key: Union[str, Callable]) -> Callable:
+    if callable(key):
+        return key
+    attrs = [k.strip() for k in key.split(',') if len(k.strip())]
+    if not attrs:
+        raise ValueError("No attributes given to sort by")
+    return operator.attrgetter(*attrs) if len(attrs) > 1 else \
+        lambda g: (getattr(g, attrs[0]),)
+
+
+def _gene_record(g: gene.Gene) -> tuple:
+    """Convert a gene into a tuple of its BED12 fields, attrs and aux attrs"""
+    # the blocks of lazily parsed genes are passed on without parsing them
+    blocks = g.__dict__.get('_blocks') or (','.join(map(str, g.block_sizes)),
+                                           ','.join(map(str, g.block_starts)))
+    return (g.chrom, g.start, g.end, g.name, g.score, g.strand, g.cds_start,
+            g.cds_end, g.item_rgb, g.block_count, *blocks, g.attrs,
+            {k: g.__dict__[k] for k in g._aux_attrs})
+
+
+def _write_run(records: List[tuple], filename: str) -> str:
+    """Sort pickled records by their key and write them to a run file"""
+    records.sort(key=_record_key)
+    with open(filename, 'wb') as f:
+        for record in records:
+            f.write(record[2])
+    return filename
+
+
+def _read_run(filename: str) -> Iterator[tuple]:
+    with open(filename, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _merge_runs(filenames: List[str], filename: str) -> str:
+    """Merge sorted runs into a single run file"""
+    with open(filename, 'wb') as f:
+        for record in heapq.merge(*map(_read_run, filenames),
+                                  key=_record_key):
+            pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+    for run in filenames:
+        os.remove(run)
+    return filename
+
+
+def sort(in_path, format: str, out_path, key: Union[str, Callable] =
+         'chrom,start', mem_limit: Union[int, str] = '512M',
+         out_format: str = None, workers: int = 1, max_open: int = 256,
+         tmp_dir: str = None, cls=gene.Gene) -> int:
+    """Sort an annotation file using limited memory.
+
+    :param in_path: the path or an opened handle of the file to sort
+    :param format: the format of the input, one of ``valid_readers``
+    :param out_path: the path or an opened handle to write the sorted genes
+    :param key: comma separated ``Gene`` attributes to sort by, or a function
+        taking a ``Gene`` and returning a sort key. The sort is stable.
+    :param mem_limit: the approximate amount of memory used for buffering
+        records across all processes, as a number of bytes or a string such
+        as 512M or 2G. With several workers, the limit is shared between the
+        buffer being filled and the runs being written.
+    :param out_format: the format of the output, one of ``valid_writers``.
+        Defaults to ``format``.
+    :param workers: the number of processes sorting and writing runs
+    :param max_open: the largest number of runs merged at once. More runs
+        are first merged into intermediate runs.
+    :param tmp_dir: the directory for temporary runs
+    :param cls: the class used to parse and reconstruct genes
+    :return: the number of sorted genes
+    """
+    out_format = format if out_format is None else out_format
+    if out_format not in _writers:
+        raise ValueError('Unknown format {}. Should be one of {}'.format(
+            out_format, ','.join(_writers.keys())))
+    key_function = _key_function(key)
+    mem_limit = parse_size(mem_limit)
+    if workers > 1:
+        # the parent keeps each submitted buffer until its run is written
+        # and the worker writing it holds a copy, so with `workers` runs in
+        # flight there are up to 2 * workers + 1 buffers in memory
+        buffer_limit = mem_limit // (2 * workers + 1)
+    else:
+        buffer_limit = mem_limit
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp, \
+            concurrent.futures.ProcessPoolExecutor(workers) \
+            if workers > 1 else _InlineExecutor() as executor:
+        runs, pending, buffer, size, n = [], [], [], 0, 0
+        # a buffer entry takes about 100 bytes besides the pickled record
+        for n, g in enumerate(parse(in_path, format, cls=cls, lazy=True), 1):
+            k = key_function(g)
+            record = pickle.dumps((k, n, _gene_record(g)),
+                                  protocol=pickle.HIGHEST_PROTOCOL)
+            buffer.append((k, n, record))
+            size += len(record) + 100
+            if size >= buffer_limit:
+                # wait for a run to be written before starting another one
+                if len(pending) >= workers:
+                    runs.append(pending.pop(0).result())
+                pending.append(executor.submit(
+                    _write_run, buffer,
+                    os.path.join(tmp, f'run{len(runs) + len(pending)}')))
+                buffer, size = [], 0
+        runs.extend(future.result() for future in pending)
+
+        if not runs:
+            # everything fit into memory
+            buffer.sort(key=_record_key)
+            records = (pickle.loads(record[2]) for record in buffer)
+        else:
+            if buffer:
+                runs.append(_write_run(buffer, os.path.join(
+                    tmp, f'run{len(runs)}')))
+            buffer = None
+            while len(runs) > max_open:
+                groups = [runs[i:i + max_open]
+                          for i in range(0, len(runs), max_open)]
+                futures = [executor.submit(_merge_runs, group, os.path.join(
+                    tmp, f'merge{len(runs)}.{i}'))
+                    for i, group in enumerate(groups)]
+                runs = [future.result() for future in futures]
+            records = heapq.merge(*map(_read_run, runs), key=_record_key)
+
+        write((cls(*fields[:13], lazy=True, **fields[13])
+               for _, _, fields in records), out_path, out_format)
+    return n
+
+
+class _InlineExecutor(object):
+    """An executor running submitted functions immediately"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def submit(self, fn, *args):
+        future = concurrent.futures.Future()
+        future.set_result(fn(*args))
+        return future
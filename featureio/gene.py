@@ -1,4 +1,9 @@
+import bisect
+import functools
 import itertools
+import operator
+
+import numpy as np
 
 
 def complement_char(c):
@@ -21,57 +26,91 @@ class Gene(object):
     # TODO: make a separate "from_blocks" instantiator for bed-style formats
     # TODO: gene-transcript concept
     # separate from gff-style
+
+    # attributes derived from the blocks, computed on first access when lazy
+    _block_attrs = frozenset(['block_sizes', 'block_starts', 'exons',
+                              'cds_exons', 'length', 'cds_length'])
+    # coordinates the block attributes are derived from
+    _block_coordinates = frozenset(['start', 'cds_start', 'cds_end'])
+
     def __init__(self, chrom, start, end, name, score, strand, cds_start,
                  cds_end, item_rgb, block_count, block_sizes, block_starts,
-                 attrs=None, *args, **kwargs):
-        self.chrom = chrom
-        self.start = int(start)
-        self.end = int(end)
-        self.name = name
-        self.score = int(score)
-        self.strand = strand
-        self.cds_start = int(cds_start)
-        self.cds_end = int(cds_end)
-        self.item_rgb = item_rgb
-        self.block_count = int(block_count)
-        self.block_sizes = [int(s) for s in block_sizes.split(',') if len(s)]
-        self.length = sum(self.block_sizes)
-        self.block_starts = [int(s) for s in block_starts.split(',') if len(s)]
-        self.attrs = {} if attrs is None else attrs
+                 attrs=None, *args, lazy=False, **kwargs):
+        # attributes are set in __dict__ directly, bypassing __setattr__
+        start, end = int(start), int(end)
+        cds_start, cds_end = int(cds_start), int(cds_end)
+        self.__dict__.update({
+            'chrom': chrom, 'start': start, 'end': end, 'name': name,
+            'score': int(score), 'strand': strand, 'cds_start': cds_start,
+            'cds_end': cds_end, 'item_rgb': item_rgb,
+            'block_count': int(block_count),
+            'attrs': {} if attrs is None else attrs})
 
         self.__dict__.update(kwargs)
-        self._aux_attrs = kwargs.keys()
+        self.__dict__['_aux_attrs'] = kwargs.keys()
+
+        if lazy:
+            self.__dict__['_blocks'] = (block_sizes, block_starts)
+        else:
+            self._set_blocks(block_sizes, block_starts)
 
-        self.exons = []
-        self.cds_exons = []
+        if strand == '+':
+            self.__dict__.update(fivep=start, cds_fivep=cds_start)
+        else:
+            self.__dict__.update(fivep=end, cds_fivep=cds_end)
+
+    def _set_blocks(self, block_sizes, block_starts):
+        block_sizes = tuple(int(s) for s in block_sizes.split(',') if len(s))
+        block_starts = tuple(int(s) for s in block_starts.split(',')
+                             if len(s))
 
-        for start, size in zip(self.block_starts, self.block_sizes):
+        exons = []
+        cds_exons = []
+        for start, size in zip(block_starts, block_sizes):
             start += self.start
             end = start + size
             sc = sorted([start, end, self.cds_start, self.cds_end])
-            self.exons.append((start, end))
+            exons.append((start, end))
             if (sc[0] == start and sc[1] == end) or (
                     sc[0] == self.cds_start and sc[1] == self.cds_end):
                 continue
-            self.cds_exons.append(
+            cds_exons.append(
                 (max(self.cds_start, start), min(self.cds_end, end)))
+        self.__dict__.update(
+            block_sizes=block_sizes, block_starts=block_starts,
+            exons=tuple(exons), cds_exons=tuple(cds_exons),
+            length=sum([e[1] - e[0] + 1 for e in exons]),
+            cds_length=sum([e[1] - e[0] + 1 for e in cds_exons]))
 
-        self.length = sum([e[1] - e[0] + 1 for e in self.exons])
-        self.cds_length = sum([e[1] - e[0] + 1 for e in self.cds_exons])
+    def _parse_blocks(self):
+        """Parse the pending blocks of a lazy gene"""
+        # attributes set since construction take precedence, as they would
+        # on an eagerly parsed gene
+        assigned = {a: self.__dict__[a] for a in Gene._block_attrs
+                    if a in self.__dict__}
+        self._set_blocks(*self.__dict__.pop('_blocks'))
+        self.__dict__.update(assigned)
 
-        if strand == '+':
-            self.fivep = self.start
-            self.cds_fivep = self.cds_start
-        else:
-            self.fivep = self.end
-            self.cds_fivep = self.cds_end
+    def __getattr__(self, item):
+        # only called when item is not yet set, i.e. for unparsed lazy blocks
+        if item in Gene._block_attrs and '_blocks' in self.__dict__:
+            self._parse_blocks()
+            return getattr(self, item)
+        raise AttributeError(f"'{self.__class__.__name__}' object has no "
+                             f"attribute '{item}'")
+
+    def __setattr__(self, name, value):
+        # the blocks are relative to the coordinates at construction
+        if name in Gene._block_coordinates and '_blocks' in self.__dict__:
+            self._parse_blocks()
+        object.__setattr__(self, name, value)
 
     def copy(self):
-        return Gene(self.chrom, self.start, self.end, self.name, self.score,
-                    self.strand, self.cds_start, self.cds_end, self.item_rgb,
-                    self.block_count, ','.join(map(str, self.block_sizes)),
-                    ','.join(map(str, self.block_starts)),
-                    {k: self.__dict__[k] for k in self._aux_attrs})
+        # the coordinates are immutable and shared between copies
+        copy = object.__new__(self.__class__)
+        copy.__dict__.update(self.__dict__)
+        copy.attrs = dict(self.attrs)
+        return copy
 
     def modified(self, **kwargs):
         copy = self.copy()
@@ -79,9 +118,17 @@ class Gene(object):
             setattr(copy, a, v)
         return copy
 
+    def _regions(self, exons):
+        return [(self.chrom, c[0] - 1, c[1])
+                for c in sorted(exons, key=lambda a: a[0])]
+
     def _get_seq(self, seq, exons):
-        gseq = ''.join(seq[c[0] - 1:c[1]]
-                       for c in sorted(exons, key=lambda a: a[0]))
+        # indexed fastas can fetch all exons with coalesced reads
+        if hasattr(seq, 'fetch_many'):
+            gseq = ''.join(seq.fetch_many(self._regions(exons)))
+        else:
+            gseq = ''.join(str(seq[c[0] - 1:c[1]])
+                           for c in sorted(exons, key=lambda a: a[0]))
         if self.strand == '-':
             gseq = reverse_complement(gseq)
         return gseq
@@ -92,6 +139,98 @@ class Gene(object):
     def get_exons(self, seq):
         return self._get_seq(seq, self.exons)
 
+    def _coordinate_index(self, comparison):
+        # cached while the exons and the strand are unchanged
+        exons = getattr(self, comparison)
+        key = '_' + comparison + '_index'
+        index = self.__dict__.get(key)
+        if index is None or index[0] is not exons or index[1] != self.strand:
+            ordered = sorted(exons)
+            offsets = [0] + list(itertools.accumulate(
+                e - s for s, e in ordered))
+            index = [exons, self.strand, [s for s, _ in ordered],
+                     [e for _, e in ordered], offsets, None]
+            self.__dict__[key] = index
+        return index
+
+    def _coordinate_arrays(self, comparison):
+        index = self._coordinate_index(comparison)
+        if index[5] is None:
+            index[5] = tuple(np.array(a, dtype=np.int64) for a in index[2:5])
+        return index[1], index[5]
+
+    def _genome_to_local(self, comparison, pos):
+        if isinstance(pos, np.ndarray):
+            strand, (starts, ends, offsets) = \
+                self._coordinate_arrays(comparison)
+            if not len(starts):
+                return np.full(pos.shape, -1, dtype=np.int64)
+            i = np.searchsorted(starts, pos, side='right') - 1
+            clipped = np.maximum(i, 0)
+            local = offsets[clipped] + pos - starts[clipped]
+            if strand == '-':
+                local = offsets[-1] - 1 - local
+            return np.where((i >= 0) & (pos < ends[clipped]), local, -1)
+        _, strand, starts, ends, offsets, _ = \
+            self._coordinate_index(comparison)
+        i = bisect.bisect_right(starts, pos) - 1
+        if i < 0 or pos >= ends[i]:
+            return None
+        local = offsets[i] + pos - starts[i]
+        return offsets[-1] - 1 - local if strand == '-' else local
+
+    def _local_to_genome(self, comparison, pos):
+        if isinstance(pos, np.ndarray):
+            strand, (starts, _, offsets) = self._coordinate_arrays(comparison)
+            if not len(starts):
+                return np.full(pos.shape, -1, dtype=np.int64)
+            in_range = (pos >= 0) & (pos < offsets[-1])
+            if strand == '-':
+                pos = offsets[-1] - 1 - pos
+            i = np.clip(np.searchsorted(offsets, pos, side='right') - 1, 0,
+                        len(starts) - 1)
+            return np.where(in_range, starts[i] + pos - offsets[i], -1)
+        _, strand, starts, _, offsets, _ = self._coordinate_index(comparison)
+        if not 0 <= pos < offsets[-1]:
+            return None
+        if strand == '-':
+            pos = offsets[-1] - 1 - pos
+        i = bisect.bisect_right(offsets, pos) - 1
+        return starts[i] + pos - offsets[i]
+
+    def genome_to_transcript(self, pos):
+        """Convert genome positions to positions in the spliced transcript.
+
+        Transcript positions are 0-based offsets from the 5' end of the
+        transcript (``fivep``), i.e. they count from the end of the last
+        exon on the '-' strand.
+
+        :param pos: a 0-based genome position, or a numpy array of positions
+        :return: the transcript position, or None if pos is not in an exon.
+            For arrays, an array with -1 for positions not in an exon.
+        """
+        return self._genome_to_local('exons', pos)
+
+    def transcript_to_genome(self, pos):
+        """Convert positions in the spliced transcript to genome positions.
+
+        :param pos: a 0-based transcript position, or a numpy array of
+            positions. See ``genome_to_transcript``.
+        :return: the genome position, or None if pos is outside the
+            transcript. For arrays, an array with -1 for positions outside.
+        """
+        return self._local_to_genome('exons', pos)
+
+    def genome_to_cds(self, pos):
+        """Convert genome positions to offsets from the start of the CDS
+        (``cds_fivep``). See ``genome_to_transcript``."""
+        return self._genome_to_local('cds_exons', pos)
+
+    def cds_to_genome(self, pos):
+        """Convert CDS offsets to genome positions. See
+        ``transcript_to_genome``."""
+        return self._local_to_genome('cds_exons', pos)
+
     def locus_overlap(self, other):
         if self.start > other.end or other.start > self.end:
             return False
@@ -116,6 +255,15 @@ class Gene(object):
         return len(self_exons) == len(other_exons) and \
             all(a == b for a, b in zip(self_exons, other_exons))
 
+    def exon_key(self, comparison='exons'):
+        """A hashable key, equal for genes with the same exons on the same
+        chromosome and strand
+
+        :param comparison: the exon attribute to use, 'exons' or 'cds_exons'
+        """
+        return self.chrom, self.strand, tuple(sorted(getattr(self,
+                                                             comparison)))
+
     def overlap(self, other, comparison='exons'):
         if not self.locus_overlap(other):
             return False
@@ -142,3 +290,83 @@ class Gene(object):
                           self.block_count,
                           ','.join(str(s) for s in self.block_sizes),
                           ','.join(str(s) for s in self.block_starts)])
+
+
+def get_sequences(genes, index, comparison='exons', max_gap=4096):
+    """Fetch the spliced sequences of many genes from an indexed fasta.
+
+    All regions are fetched with a single call to ``fetch_many`` so that
+    neighboring exons of all genes are read together.
+
+    :param genes: an iterable of ``Gene`` objects
+    :param index: an ``IndexedFasta`` or ``IndexedFastaCollection``
+    :param comparison: the exon attribute to use, 'exons' or 'cds_exons'
+    :param max_gap: passed to ``fetch_many``
+    :return: a list of sequences in the order of ``genes``
+    """
+    genes = list(genes)
+    regions = []
+    bounds = [0]
+    for gene in genes:
+        regions.extend(gene._regions(getattr(gene, comparison)))
+        bounds.append(len(regions))
+    seqs = index.fetch_many(regions, max_gap=max_gap)
+    result = []
+    for gene, start, end in zip(genes, bounds, bounds[1:]):
+        gseq = ''.join(seqs[start:end])
+        result.append(reverse_complement(gseq)
+                      if gene.strand == '-' else gseq)
+    return result
+
+
+def _keep_function(keep):
+    if callable(keep):
+        return keep
+    if keep == 'first':
+        return operator.itemgetter(0)
+    if keep == 'longest':
+        # max keeps the first of equally long genes
+        return functools.partial(max, key=operator.attrgetter('length'))
+    raise ValueError(f"Unknown keep {keep}. Should be 'first', 'longest' or "
+                     f"a function")
+
+
+def deduplicate(genes, comparison='exons', keep='first', grouped=False):
+    """Collapse genes with identical exon chains.
+
+    Genes are grouped by ``Gene.exon_key`` in a single pass. Genes without
+    any exons of the comparison, e.g. non-coding genes when comparing
+    'cds_exons', are never collapsed.
+
+    :param genes: an iterable of ``Gene`` objects
+    :param comparison: the exon attribute to compare, 'exons' or 'cds_exons'
+    :param keep: which gene of each group to keep, 'first', 'longest' (the
+        gene with the longest exons, e.g. with the longest UTRs when
+        comparing 'cds_exons') or a function taking the list of identical
+        genes and returning the gene to keep
+    :param grouped: the genes are grouped by chromosome, e.g. sorted. Each
+        chromosome is reported as soon as the next one starts, so that only
+        the genes of one chromosome are kept in memory.
+    :return: an iterator of (gene, names) tuples of each kept gene and the
+        names of the genes collapsed into it, including its own, in the
+        order of the first gene of each group
+    """
+    select = _keep_function(keep)
+    groups = {}
+    chrom = None
+    for gene in genes:
+        if grouped and gene.chrom != chrom:
+            for group in groups.values():
+                yield select(group), [g.name for g in group]
+            groups = {}
+            chrom = gene.chrom
+        key = gene.exon_key(comparison)
+        if not key[2]:
+            key = gene
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [gene]
+        else:
+            group.append(gene)
+    for group in groups.values():
+        yield select(group), [g.name for g in group]
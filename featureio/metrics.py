@@ -0,0 +1,350 @@
+"""Opt-in instrumentation of the featureio readers, writers and indices.
+
+Metrics are disabled by default, in which case instrumented functions only
+check a single flag per call. When enabled, readers report records, bytes
+read, time spent reading, time spent in I/O and time spent constructing
+``Gene`` objects, writers report records, bytes written, time spent writing
+and time spent in I/O, and fasta indices report regions, whole records,
+reads, bytes read and fetch times::
+
+    from featureio import metrics
+
+    metrics.enable()
+    genes = list(featureio.parse('genes.bed', 'bed12'))
+    print(metrics.to_json())
+
+Counter and timer names are dotted, e.g. ``read.bed12.records``,
+``write.GFF3Writer.io`` or ``fetch.time``.
+"""
+import collections
+import contextlib
+import functools
+import inspect
+import json
+import time
+from typing import Callable, Dict
+
+
+class Timer(object):
+    """Accumulated timings of a stage"""
+
+    __slots__ = ['count', 'total', 'min', 'max']
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {'count': self.count, 'total': self.total,
+                'min': self.min if self.count else 0.0, 'max': self.max,
+                'mean': self.total / self.count if self.count else 0.0}
+
+
+class _TimerContext(object):
+    __slots__ = ['registry', 'name', 'start']
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.add_time(self.name, time.perf_counter() - self.start)
+
+
+class _NullContext(object):
+    """A context manager doing nothing, as contextlib.nullcontext"""
+
+    __slots__ = []
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_null_context = _NullContext()
+
+
+class Registry(object):
+    """A registry of counters and timers."""
+
+    def __init__(self):
+        self.enabled = False
+        self.listeners = []
+        self.reset()
+
+    def enable(self) -> None:
+        """Start recording metrics"""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording metrics. Recorded metrics are kept."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Discard all recorded metrics"""
+        self.counters: Dict[str, int] = collections.defaultdict(int)
+        self.timers: Dict[str, Timer] = collections.defaultdict(Timer)
+
+    @contextlib.contextmanager
+    def recording(self):
+        """Record metrics within a with block"""
+        enabled = self.enabled
+        self.enabled = True
+        try:
+            yield self
+        finally:
+            self.enabled = enabled
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add value to a counter
+
+        :param name: the name of the counter
+        :param value: the amount to add
+        """
+        if not self.enabled:
+            return
+        self.counters[name] += value
+        for listener in self.listeners:
+            listener('counter', name, value)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Add a timing to a timer
+
+        :param name: the name of the timer
+        :param seconds: the time taken
+        """
+        if not self.enabled:
+            return
+        self.timers[name].add(seconds)
+        for listener in self.listeners:
+            listener('timer', name, seconds)
+
+    def timer(self, name: str):
+        """A context manager timing its block when metrics are enabled
+
+        :param name: the name of the timer
+        """
+        return _TimerContext(self, name) if self.enabled else _null_context
+
+    def add_listener(self, callback: Callable[[str, str, float], None]):
+        """Call a function on every recorded metric
+
+        :param callback: a function taking the kind ('counter' or 'timer'),
+            the name and the value of each recorded metric
+        """
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback) -> None:
+        """Stop calling a function added with ``add_listener``"""
+        self.listeners.remove(callback)
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """Export the recorded metrics as a dictionary
+
+        :return: a dictionary with the counters and the timers, each timer
+            with its count, total, min, max and mean in seconds
+        """
+        return {'counters': dict(self.counters),
+                'timers': {name: timer.to_dict()
+                           for name, timer in self.timers.items()}}
+
+    def to_json(self, **kwargs) -> str:
+        """Export the recorded metrics as JSON
+
+        :param kwargs: passed to ``json.dumps``
+        """
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def report(self, callback: Callable[[Dict], None]) -> None:
+        """Pass the recorded metrics as a dictionary to a function"""
+        callback(self.to_dict())
+
+
+registry = Registry()
+enable = registry.enable
+disable = registry.disable
+reset = registry.reset
+recording = registry.recording
+count = registry.count
+add_time = registry.add_time
+timer = registry.timer
+add_listener = registry.add_listener
+remove_listener = registry.remove_listener
+to_dict = registry.to_dict
+to_json = registry.to_json
+report = registry.report
+
+
+def enabled() -> bool:
+    """Indicate whether metrics are being recorded"""
+    return registry.enabled
+
+
+class _CountingReader(object):
+    """Proxy a handle, counting the characters read and timing reads"""
+
+    def __init__(self, handle, name):
+        self.handle = handle
+        self.name = name
+
+    def _record(self, start, data):
+        registry.add_time(self.name + '.io', time.perf_counter() - start)
+        registry.count(self.name + '.bytes', len(data))
+        return data
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            line = next(self.handle)
+        except StopIteration:
+            registry.add_time(self.name + '.io',
+                              time.perf_counter() - start)
+            raise
+        return self._record(start, line)
+
+    def readline(self, *args):
+        start = time.perf_counter()
+        return self._record(start, self.handle.readline(*args))
+
+    def read(self, *args):
+        start = time.perf_counter()
+        return self._record(start, self.handle.read(*args))
+
+    def __getattr__(self, item):
+        return getattr(self.handle, item)
+
+
+class _TimedWriter(object):
+    """Proxy a handle, counting the characters written and timing writes"""
+
+    def __init__(self, handle, name):
+        self.handle = handle
+        self.name = name
+
+    def write(self, data):
+        start = time.perf_counter()
+        result = self.handle.write(data)
+        registry.add_time(self.name + '.io', time.perf_counter() - start)
+        registry.count(self.name + '.bytes', len(data))
+        return result
+
+    def __getattr__(self, item):
+        return getattr(self.handle, item)
+
+
+def _timed_constructor(cls, name):
+    @functools.wraps(cls, updated=())
+    def construct(*args, **kwargs):
+        start = time.perf_counter()
+        obj = cls(*args, **kwargs)
+        registry.add_time(name, time.perf_counter() - start)
+        return obj
+    return construct
+
+
+def _instrumented_reader(name, reader, default_cls, handle, *args, **kwargs):
+    handle = _CountingReader(handle, name)
+    if args:
+        cls, args = args[0], args[1:]
+    else:
+        cls = kwargs.pop('cls', default_cls)
+    records = reader(handle, *args,
+                     cls=_timed_constructor(cls, name + '.construct'),
+                     **kwargs)
+    while True:
+        start = time.perf_counter()
+        try:
+            record = next(records)
+        except StopIteration:
+            return
+        registry.add_time(name + '.time', time.perf_counter() - start)
+        registry.count(name + '.records')
+        yield record
+
+
+def instrument_reader(format: str):
+    """Decorate a reader to report to the registry when metrics are enabled
+
+    The reader should take a handle and a ``cls`` keyword argument. It
+    reports ``read.<format>.records``, ``read.<format>.bytes`` and the
+    timers ``read.<format>.time``, the time per record, which includes
+    ``read.<format>.io``, the time spent in the handle's reads, and
+    ``read.<format>.construct``, the time spent constructing records.
+
+    :param format: the name of the format read
+    """
+    name = f'read.{format}'
+
+    def decorator(reader):
+        default_cls = inspect.signature(reader).parameters['cls'].default
+
+        @functools.wraps(reader)
+        def wrapper(handle, *args, **kwargs):
+            if not registry.enabled:
+                return reader(handle, *args, **kwargs)
+            return _instrumented_reader(name, reader, default_cls, handle,
+                                        *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def _instrumented_writer(writer, name):
+    handle = writer.handle
+    writer.handle = _TimedWriter(handle, name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        writer.handle = handle
+        registry.add_time(name + '.time', time.perf_counter() - start)
+
+
+def instrument_writer(writer):
+    """Report the output of a ``GeneWriter`` within a with block
+
+    This reports ``write.<class>.bytes`` and the timers
+    ``write.<class>.time``, the total time, and ``write.<class>.io``, the
+    time spent in the handle's write.
+
+    :param writer: a ``GeneWriter``
+    """
+    if not registry.enabled:
+        return _null_context
+    return _instrumented_writer(writer,
+                                f'write.{writer.__class__.__name__}')
+
+
+def counted(iterable, name: str):
+    """Count the items of an iterable as they are consumed
+
+    :param iterable: any iterable
+    :param name: the name of the counter
+    :return: the iterable itself when metrics are disabled
+    """
+    if not registry.enabled:
+        return iterable
+    return _counted(iterable, name)
+
+
+def _counted(iterable, name):
+    for item in iterable:
+        registry.count(name)
+        yield item
@@ -1,9 +1,12 @@
 #! /usr/bin/env python
 import functools
 
+from . import arrow
 from . import gene
+from . import metrics
 
 
+@metrics.instrument_reader('bed12')
 def BedIterator(handle, cls=gene.Gene):
     for n, line in enumerate(handle):
         if line.startswith('#'):
@@ -29,19 +32,22 @@ def parse_psl_line(matches, misMatches, repMatches, nCount, qNumInsert,
                block_count, block_sizes, corr_block_starts)
 
 
+@metrics.instrument_reader('psl')
 def PslIterator(handle, cls=gene.Gene):
     for line in handle:
         fields = line.strip().split()
         yield parse_psl_line(*fields, cls=cls)
 
 
+@metrics.instrument_reader('blatpsl')
 def BlatPslIterator(handle, cls=gene.Gene):
     for _ in range(5):  # skip the header
         next(handle)
     for line in handle:
-        yield parse_psl_line(line, cls=cls)
+        yield parse_psl_line(*line.strip().split(), cls=cls)
 
 
+@metrics.instrument_reader('augustusgtf')
 def AugustusGtfIterator(handle, cls=gene.Gene):
     while True:
         line = handle.readline()
@@ -92,6 +98,12 @@ def AugustusGtfIterator(handle, cls=gene.Gene):
                     break
 
 
+@metrics.instrument_reader('parquet')
+def ParquetIterator(handle, cls=gene.Gene, batch_size=65536):
+    batches = arrow._parquet().ParquetFile(handle).iter_batches(batch_size)
+    yield from arrow.from_arrow(batches, cls=cls)
+
+
 '''
 def GFF3Iterator(handle, cls=Gene):
     genes = {}
@@ -120,15 +132,25 @@ def GFF3Iterator(handle, cls=Gene):
 
 _readers = {"bed12": BedIterator, "psl": PslIterator,
             "blatpsl": BlatPslIterator,
-            "augustusgtf": AugustusGtfIterator}
+            "augustusgtf": AugustusGtfIterator,
+            "parquet": ParquetIterator}
 
 
 # "gff3": GFF3Iterator}
 
+# formats read and written in binary mode
+_binary_formats = {"parquet"}
 
-def parse(maybe_handle, format, mode='r', cls=gene.Gene, **kwargs):
-    # type: (Union[TextIO, str], str, str, Callable[[...], gene.Gene], ...) -> List[gene.Gene]
+
+def parse(maybe_handle, format, mode=None, cls=gene.Gene, lazy=False,
+          **kwargs):
+    # type: (Union[TextIO, str], str, str, Callable[[...], gene.Gene], bool, ...) -> List[gene.Gene]
     # this can be better handled with contextlib.contextmanager
+    if lazy:
+        # defer parsing blocks and deriving exons until they are accessed
+        cls = functools.partial(cls, lazy=True)
+    if mode is None:
+        mode = 'rb' if format in _binary_formats else 'r'
     if isinstance(maybe_handle, str):
         fp = open(maybe_handle, mode, **kwargs)
     else:
@@ -169,10 +191,12 @@ class GeneWriter(object):
         pass
 
     def write_file(self, genes):
-        self.write_header()
-        for gene in genes:
-            self.write_gene(gene)
-        self.write_footer()
+        with metrics.instrument_writer(self):
+            self.write_header()
+            for gene in metrics.counted(
+                    genes, f'write.{self.__class__.__name__}.records'):
+                self.write_gene(gene)
+            self.write_footer()
 
 
 class AugustusExonHintWriter(GeneWriter):
@@ -271,14 +295,53 @@ class GFF3Writer(GeneWriter):
                          enumerate(GFF3Writer._sorted_cds(gene)), 0)
 
 
+class ParquetWriter(GeneWriter):
+    """Write genes to a Parquet file in row groups of batch_size genes.
+
+    The schema, including the auxiliary attributes, is taken from the first
+    batch. See ``featureio.arrow``.
+    """
+
+    def __init__(self, handle, batch_size=65536, compression='zstd',
+                 **kwargs):
+        super(ParquetWriter, self).__init__(handle, **kwargs)
+        self.batch_size = batch_size
+        self.compression = compression
+        self.genes = []
+        self.writer = None
+        self.schema = None
+
+    def write_batch(self):
+        if self.schema is None:
+            self.schema = arrow.gene_schema(arrow._aux_type(self.genes))
+        if self.writer is None:
+            self.writer = arrow._parquet().ParquetWriter(
+                self.handle, self.schema, compression=self.compression)
+        self.writer.write_batch(arrow._record_batch(self.genes, self.schema))
+        self.genes = []
+
+    def write_gene(self, gene):
+        self.genes.append(gene)
+        if len(self.genes) >= self.batch_size:
+            self.write_batch()
+
+    def write_footer(self):
+        if self.genes or self.writer is None:
+            self.write_batch()
+        self.writer.close()
+
+
 _writers = {"bed12": Bed12Writer,
             "augustus_exon_hints": AugustusExonHintWriter,
-            "gff3": GFF3Writer}
+            "gff3": GFF3Writer,
+            "parquet": ParquetWriter}
 valid_writers = _writers.keys()
 valid_readers = _readers.keys()
 
 
-def write(genes, maybe_handle, format, mode='w', **kwargs):
+def write(genes, maybe_handle, format, mode=None, **kwargs):
+    if mode is None:
+        mode = 'wb' if format in _binary_formats else 'w'
     if isinstance(maybe_handle, str):
         fp = open(maybe_handle, mode, **kwargs)
     else:
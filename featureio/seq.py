@@ -1,7 +1,14 @@
+import io
+import json
 import os
-from typing import TextIO, List, Dict
+import struct
+from typing import TextIO, List, Dict, Iterable, Iterator, Sequence, Tuple
 
 import attr
+import numpy as np
+
+from . import metrics
+from .gene import complement_char, reverse_complement
 
 
 class Seq(object):
@@ -31,6 +38,135 @@ class Seq(object):
             ))
 
 
+_identity_table = bytes(range(256))
+_upper_table = bytes.maketrans(b'abcdefghijklmnopqrstuvwxyz',
+                               b'ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+_mask_table = bytes.maketrans(b'abcdefghijklmnopqrstuvwxyz', b'N' * 26)
+_complement_table = bytes.maketrans(complement_char.chars.encode(),
+                                    complement_char.compl.encode())
+
+
+class ByteSeq(Seq):
+    """A sequence backed by bytes, sliced without copying.
+
+    Slices are views sharing the underlying buffer. The transforms
+    ``upper``, ``mask`` and ``reverse_complement`` also return views, which
+    are only applied to the window that is materialized with ``str``,
+    ``bytes`` or ``tobytes``::
+
+        chrom = ByteSeq('chr1', data)
+        window = chrom.mask().reverse_complement()[1000:2000]
+        str(window)  # copies and transforms 1000 bases
+    """
+
+    def __init__(self, name, sequence, description=None, table=None,
+                 reverse=False):
+        """Initialize a sequence view
+
+        :param name: Name of the sequence
+        :param sequence: the sequence as bytes or another buffer such as an
+            mmap, or as a str, which is encoded
+        :param description: an optional description
+        :param table: a 256 byte translation table applied to the bases
+        :param reverse: if True, the view is reversed
+        """
+        if isinstance(sequence, str):
+            sequence = sequence.encode('ascii')
+        self.name = name
+        self.description = description
+        self.data = memoryview(sequence).cast('B')
+        self.table = table
+        self.reverse = reverse
+
+    def _view(self, data: memoryview, table: bytes, reverse: bool):
+        return ByteSeq(self.name, data, self.description, table, reverse)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError("ByteSeq index out of range")
+            return str(self[key:key + 1])
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("ByteSeq slices cannot have a step")
+            stop = max(start, stop)
+            if self.reverse:
+                start, stop = len(self) - stop, len(self) - start
+            return self._view(self.data[start:stop], self.table,
+                              self.reverse)
+        raise ValueError("Cannot getitem from a Seq with {}".format(
+            type(key)))
+
+    def _transformed(self, table: bytes = None, reverse: bool = False):
+        if self.table is not None and table is not None:
+            # translate with the current table, then with the new one
+            table = self.table.translate(table)
+        return self._view(self.data, table or self.table,
+                          self.reverse != reverse)
+
+    def upper(self) -> 'ByteSeq':
+        """A view of the sequence in upper case"""
+        return self._transformed(_upper_table)
+
+    def mask(self) -> 'ByteSeq':
+        """A view with the soft-masked (lower case) bases replaced by N"""
+        return self._transformed(_mask_table)
+
+    def reverse_complement(self) -> 'ByteSeq':
+        """A view of the reverse complement of the sequence"""
+        return self._transformed(_complement_table, reverse=True)
+
+    def buffer(self) -> memoryview:
+        """The bases as a buffer, copied only if the view is transformed"""
+        if self.table is None and not self.reverse:
+            return self.data
+        return memoryview(self.tobytes())
+
+    def tobytes(self) -> bytes:
+        """Copy the bases of the view, applying its transforms"""
+        data = self.data.tobytes()
+        if self.table is not None:
+            data = data.translate(self.table)
+        return data[::-1] if self.reverse else data
+
+    def __bytes__(self):
+        return self.tobytes()
+
+    def __str__(self):
+        return self.tobytes().decode('ascii')
+
+    @property
+    def sequence(self) -> str:
+        return str(self)
+
+    def soft_masked_intervals(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the soft-masked (lower case) runs of the underlying sequence
+
+        The transforms of the view are ignored, i.e. the intervals of an
+        ``upper`` view are those of the original sequence.
+
+        :return: arrays of the 0-based starts and the ends of the runs, in
+            the coordinates of the view
+        """
+        lower = np.frombuffer(self.data, dtype=np.uint8) >= ord('a')
+        # the runs alternately start and end at the changes of case
+        bounds = np.flatnonzero(lower[1:] != lower[:-1]) + 1
+        if len(lower) and lower[0]:
+            bounds = np.concatenate(([0], bounds))
+        if len(lower) and lower[-1]:
+            bounds = np.append(bounds, len(lower))
+        starts, ends = bounds[::2], bounds[1::2]
+        if self.reverse:
+            return len(self) - ends[::-1], len(self) - starts[::-1]
+        return starts, ends
+
+
 def parse_fasta_record(file: TextIO) -> Seq:
     """Read a single fasta record from an opened file
 
@@ -69,6 +205,52 @@ def parse_fasta_record(file: TextIO) -> Seq:
     return Seq(id, sequence, description)
 
 
+def read_fasta(file: TextIO) -> Iterable[Seq]:
+    """Iterate over all records of an opened fasta file
+
+    :param file: an opened file object that implements read() and seek()
+    :return: an iterator of ``Seq`` objects
+    """
+    while True:
+        try:
+            yield parse_fasta_record(file)
+        except StopIteration:
+            return
+
+
+def read_fasta_chunks(file: TextIO, chunk_size: int = 1 << 20
+                      ) -> Iterator[Tuple[str, int, str]]:
+    """Stream the sequences of a fasta file in chunks
+
+    Unlike ``read_fasta``, this reads the file line by line and never holds
+    more than one chunk of a sequence in memory.
+
+    :param file: an opened fasta file
+    :param chunk_size: the number of bases in each chunk. The last chunk of
+        each sequence may be shorter.
+    :return: an iterator of (name, start, chunk) tuples, where start is the
+        0-based position of the chunk in the sequence named name
+    """
+    name, start, lines, length = None, 0, [], 0
+    for line in file:
+        if line.startswith('>'):
+            if name is not None and (length or not start):
+                yield name, start, ''.join(lines)
+            name = line[1:].split(maxsplit=1)[0]
+            start, lines, length = 0, [], 0
+            continue
+        line = line.strip()
+        lines.append(line)
+        length += len(line)
+        while length >= chunk_size:
+            chunk = ''.join(lines)
+            yield name, start, chunk[:chunk_size]
+            start += chunk_size
+            lines, length = [chunk[chunk_size:]], length - chunk_size
+    if name is not None and (length or not start):
+        yield name, start, ''.join(lines)
+
+
 def fasta_string(seq: Seq, wrap: int = 100) -> str:
     """Convert a seq object to a fasta-formatted string.
 
@@ -93,6 +275,243 @@ def write_fasta_record(seq: Seq, file: TextIO, wrap=100) -> None:
     file.write(fasta_string(seq, wrap))
 
 
+def _as_bytes(data) -> memoryview:
+    if isinstance(data, str):
+        data = data.encode('ascii')
+    elif isinstance(data, ByteSeq):
+        return data.buffer()
+    return memoryview(data).cast('B')
+
+
+class FastaWriter(object):
+    """Write line-wrapped fasta records through a reusable buffer.
+
+    Sequences are wrapped directly into a preallocated buffer, which is
+    written to the file whenever it is full, so that neither whole wrapped
+    records nor many small writes are needed. Records are either written
+    whole with ``write`` or ``write_all``, or streamed in chunks with
+    ``start_record``, ``write_chunk`` and ``end_record``::
+
+        with FastaWriter('out.fa', wrap=60, index=True) as writer:
+            writer.write_all(seqs)
+            writer.start_record('chr1')
+            for chunk in chunks:
+                writer.write_chunk(chunk)
+            writer.end_record()
+
+    Optionally a fasta index (.fai) is built while writing.
+    """
+
+    def __init__(self, maybe_handle, wrap: int = 100,
+                 buffer_size: int = 1 << 22, index=False):
+        """Create a writer
+
+        :param maybe_handle: a filename or a file opened for writing in
+            binary or text mode
+        :param wrap: the number of bases per line
+        :param buffer_size: the size of the output buffer in bytes
+        :param index: if True, write an index to the filename with a .fai
+            suffix. May also be a filename or an opened text file for the
+            index.
+        """
+        if wrap < 1:
+            raise ValueError(f"wrap should be positive, not {wrap}")
+        self.wrap = wrap
+        self.close_handle = isinstance(maybe_handle, str)
+        if self.close_handle:
+            self.handle = open(maybe_handle, 'wb')
+        else:
+            self.handle = maybe_handle
+        if isinstance(self.handle, io.TextIOBase):
+            if hasattr(self.handle, 'buffer'):
+                # write past the text layer, after what it holds
+                self.handle.flush()
+                self._write = self.handle.buffer.write
+            else:
+                self._write = lambda data: self.handle.write(
+                    str(data, 'ascii'))
+        else:
+            self._write = self.handle.write
+
+        if index is True:
+            if not self.close_handle:
+                raise ValueError("Give a filename for the index when writing "
+                                 "to an opened file")
+            index = maybe_handle + '.fai'
+        self.index = index
+        # the name, offset and length of each record written
+        self._index: List[Tuple[str, int, int]] = []
+        try:
+            self._flushed = self.handle.tell() if index else 0
+        except (OSError, AttributeError):
+            self._flushed = 0
+
+        self._buffer = bytearray(max(buffer_size, wrap + 1))
+        self._view = memoryview(self._buffer)
+        self._array = np.frombuffer(self._buffer, dtype=np.uint8)
+        self._pos = 0
+        self._column = 0
+        self._record = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _flush(self) -> None:
+        if self._pos:
+            self._write(self._view[:self._pos])
+            self._flushed += self._pos
+            self._pos = 0
+
+    def _put(self, data: memoryview) -> None:
+        """Copy bytes to the buffer, writing it out when it is full"""
+        if len(data) > len(self._buffer) - self._pos:
+            self._flush()
+            if len(data) > len(self._buffer):
+                self._write(data)
+                self._flushed += len(data)
+                return
+        self._view[self._pos:self._pos + len(data)] = data
+        self._pos += len(data)
+
+    def start_record(self, name: str, description: str = None) -> None:
+        """Start a record whose sequence is written with ``write_chunk``
+
+        :param name: the name of the sequence
+        :param description: an optional description
+        """
+        if self._record is not None:
+            self.end_record()
+        description = " " + description if description is not None else ""
+        self._put(_as_bytes(f">{name}{description}\n"))
+        self._record = (name, self._flushed + self._pos)
+        self._length = 0
+
+    def write_chunk(self, chunk) -> None:
+        """Write a part of the sequence of the current record
+
+        :param chunk: a str, bytes or other buffer of sequence
+        """
+        if self._record is None:
+            raise ValueError("No record was started")
+        data = _as_bytes(chunk)
+        self._length += len(data)
+        wrap, width, n = self.wrap, self.wrap + 1, len(data)
+        i = 0
+        if self._column:
+            # finish the current line
+            i = min(wrap - self._column, n)
+            self._put(data[:i])
+            self._column += i
+            if self._column == wrap:
+                self._put(b'\n')
+                self._column = 0
+        while n - i >= wrap:
+            lines = min((n - i) // wrap,
+                        (len(self._buffer) - self._pos) // width)
+            if lines == 0:
+                self._flush()
+                continue
+            end = i + lines * wrap
+            if lines < 64:
+                self._put(b'\n'.join([data[j:j + wrap]
+                                      for j in range(i, end, wrap)] + [b'']))
+                i = end
+                continue
+            # copy many lines at once as the rows of a 2d view
+            block = self._array[self._pos:self._pos + lines * width]
+            block = block.reshape(lines, width)
+            block[:, :wrap] = np.frombuffer(
+                data[i:end], dtype=np.uint8).reshape(lines, wrap)
+            block[:, wrap] = 10
+            self._pos += lines * width
+            i = end
+        if i < n:
+            self._put(data[i:])
+            self._column = n - i
+
+    def end_record(self) -> None:
+        """Finish the current record"""
+        if self._record is None:
+            return
+        if self._column:
+            self._put(b'\n')
+            self._column = 0
+        self._index.append((*self._record, self._length))
+        self._record = None
+
+    def write(self, seq: Seq) -> None:
+        """Write a whole record
+
+        :param seq: a ``Seq`` object
+        """
+        # byte sequences are written without converting them to str
+        sequence = seq if isinstance(seq, ByteSeq) else seq.sequence
+        wrap, n = self.wrap, len(sequence)
+        if n > 64 * wrap:
+            self.start_record(seq.name, seq.description)
+            self.write_chunk(sequence)
+            self.end_record()
+            return
+        # short records are joined and copied to the buffer at once
+        self.end_record()
+        description = " " + seq.description \
+            if seq.description is not None else ""
+        header = f">{seq.name}{description}".encode()
+        data = sequence.encode('ascii') if isinstance(sequence, str) else \
+            _as_bytes(sequence)
+        offset = self._flushed + self._pos + len(header) + 1
+        self._put(b'\n'.join([header] + [data[i:i + wrap]
+                                         for i in range(0, n, wrap)] + [b'']))
+        self._index.append((seq.name, offset, n))
+
+    def write_all(self, seqs: Iterable[Seq]) -> None:
+        """Write many records
+
+        :param seqs: an iterable of ``Seq`` objects
+        """
+        for seq in seqs:
+            self.write(seq)
+
+    def write_index(self, file: TextIO) -> None:
+        """Write the index of the records written so far
+
+        :param file: a file opened for writing
+        """
+        file.writelines(
+            f"{name}\t{length}\t{offset}\t{self.wrap}\t{self.wrap + 1}\n"
+            for name, offset, length in self._index)
+
+    def close(self) -> None:
+        """Finish the current record, flush the buffer and write the index"""
+        self.end_record()
+        self._flush()
+        if self.close_handle:
+            self.handle.close()
+        elif hasattr(self.handle, 'flush'):
+            self.handle.flush()
+        if isinstance(self.index, str):
+            with open(self.index, 'w') as f:
+                self.write_index(f)
+        elif self.index:
+            self.write_index(self.index)
+
+
+def write_fasta(seqs: Iterable[Seq], maybe_handle, wrap: int = 100,
+                index=False) -> None:
+    """Write fasta records to a file with a ``FastaWriter``
+
+    :param seqs: an iterable of ``Seq`` objects
+    :param maybe_handle: a filename or a file opened for writing
+    :param wrap: the number of bases per line
+    :param index: see ``FastaWriter``
+    """
+    with FastaWriter(maybe_handle, wrap, index=index) as writer:
+        writer.write_all(seqs)
+
+
 @attr.s
 class FastaIndexRecord(object):
     """A fasta index record.
@@ -128,6 +547,28 @@ class FastaIndexRecord(object):
                              f"{len(fields)}. Offending line was: \n{string}")
         return FastaIndexRecord(*fields)
 
+    def byte_offset(self, position: int) -> int:
+        """Compute the position in the file of a 0-based sequence position.
+
+        :param position: a 0-based position in the sequence
+        :return: the corresponding byte offset in the fasta file
+        """
+        line, column = divmod(position, self.line_bases)
+        return self.offset + line * self.line_width + column
+
+
+def _region_fields(region: Sequence) -> Tuple[str, int, int, str]:
+    """Unpack a (name, start, end[, strand]) region, defaulting to '+'"""
+    if len(region) == 3:
+        name, start, end = region
+        strand = '+'
+    elif len(region) == 4:
+        name, start, end, strand = region
+    else:
+        raise ValueError(f"Regions should be (name, start, end[, strand]) "
+                         f"but got {region}")
+    return str(name), int(start), int(end), strand
+
 
 class IndexedFasta(object):
     """An index to a fasta file and its file.
@@ -182,6 +623,10 @@ class IndexedFasta(object):
         """Return all sequence names contained in the index"""
         return self.records.keys()
 
+    def lengths(self) -> Dict[str, int]:
+        """Return the length of each sequence in the index"""
+        return {name: record.length for name, record in self.records.items()}
+
     def get_sequence(self, name: str) -> Seq:
         """Retrieve a sequence from an indexed fasta
 
@@ -199,30 +644,250 @@ class IndexedFasta(object):
             #  possibility is to take until the next record, but that violates
             #  our code reuse
 
-            offset = record.offset
-            f.seek(offset)
-            while f.read(1) != '>':
-                offset -= 1
+            with metrics.timer('fetch.time'):
+                offset = record.offset
                 f.seek(offset)
-            f.seek(offset)
-            return parse_fasta_record(f)
+                while f.read(1) != '>':
+                    offset -= 1
+                    f.seek(offset)
+                f.seek(offset)
+                seq = parse_fasta_record(f)
+            if metrics.enabled():
+                metrics.count('fetch.records')
+                metrics.count('fetch.reads')
+                metrics.count('fetch.bytes', f.tell() - offset)
+            return seq
+
+    def fetch(self, name: str, start: int, end: int, strand: str = '+') -> str:
+        """Retrieve a single region from an indexed fasta
+
+        :param name: The name of the sequence in the file
+        :param start: 0-based start of the region
+        :param end: 0-based, exclusive end of the region
+        :param strand: if '-', the reverse complement is returned
+        :return: the sequence of the region as a string
+        """
+        return self.fetch_many([(name, start, end, strand)])[0]
+
+    def fetch_many(self, regions: Iterable[Sequence],
+                   max_gap: int = 4096) -> List[str]:
+        """Retrieve many regions from an indexed fasta with few reads.
+
+        Regions are sorted by their position in the file and regions whose
+        byte ranges are no more than ``max_gap`` bytes apart are read
+        together with a single read. The coordinates follow python slicing,
+        i.e. they are 0-based and the end is exclusive, and are clipped to
+        the length of the sequence.
+
+        :param regions: an iterable (or array) of (name, start, end[, strand])
+            regions. If the strand is '-', the reverse complement is returned.
+        :param max_gap: the largest number of bytes between two regions
+            which will still be fetched with a single read.
+        :return: a list of sequence strings in the order of ``regions``
+        """
+        spans = []
+        for i, region in enumerate(regions):
+            name, start, end, strand = _region_fields(region)
+            record = self.records.get(name, None)
+            if record is None:
+                raise KeyError(f"No such sequence {name} in {self.filename}")
+            if start < 0 or end < 0:
+                raise ValueError(f"Negative coordinates in region {region}")
+            start, end = min(start, record.length), min(end, record.length)
+            if end <= start:
+                spans.append((record.offset, record.offset, i, strand))
+            else:
+                spans.append((record.byte_offset(start),
+                              record.byte_offset(end - 1) + 1, i, strand))
+        spans.sort()
+
+        results = [''] * len(spans)
+        with metrics.timer('fetch.time'), open(self.filename, 'rb') as f:
+            n = 0
+            while n < len(spans):
+                block_start, block_end = spans[n][0], spans[n][1]
+                m = n + 1
+                while m < len(spans) and spans[m][0] - block_end <= max_gap:
+                    block_end = max(block_end, spans[m][1])
+                    m += 1
+                f.seek(block_start)
+                block = f.read(block_end - block_start)
+                metrics.count('fetch.reads')
+                metrics.count('fetch.bytes', len(block))
+                # regions served by a read issued for a preceding region
+                metrics.count('fetch.coalesced', m - n - 1)
+                for begin, stop, i, strand in spans[n:m]:
+                    seq = block[begin - block_start:stop - block_start]
+                    seq = seq.translate(None, b'\r\n').decode()
+                    results[i] = reverse_complement(seq) \
+                        if strand == '-' else seq
+                n = m
+        metrics.count('fetch.regions', len(spans))
+        return results
+
+
+_LOOKUP_MAGIC = b'FIOLOOK1'
+
+
+def _aligned(offset: int) -> int:
+    return offset + -offset % 8
+
+
+class _SequenceLookup(object):
+    """A memory-mapped lookup of sequence names to files and lengths.
+
+    The file contains a JSON header with the list of files, followed by the
+    sorted sequence names as fixed width bytes, the index of the file of
+    each sequence and its length, each as a separate array so that a name
+    is found with a binary search touching only a few pages.
+    """
+
+    def __init__(self, filename: str):
+        with open(filename, 'rb') as f:
+            if f.read(len(_LOOKUP_MAGIC)) != _LOOKUP_MAGIC:
+                raise ValueError(f"{filename} is not a sequence lookup")
+            header_length, = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_length))
+        self.files: List[str] = header['files']
+        n, width = header['n'], header['width']
+        # each array starts at the next multiple of 8 bytes
+        offset = _aligned(len(_LOOKUP_MAGIC) + 8 + header_length)
+        arrays = []
+        for dtype in (f'S{width}', '<u4', '<i8'):
+            dtype = np.dtype(dtype)
+            arrays.append(np.memmap(filename, dtype, 'r', offset, (n,))
+                          if n else np.zeros(0, dtype))
+            offset = _aligned(offset + n * dtype.itemsize)
+        self.names, self.file_ids, self.lengths = arrays
+
+    def find(self, name: str) -> int:
+        """Find the row of a sequence name, or -1 if it is not present"""
+        key = name.encode()
+        if len(key) > self.names.dtype.itemsize:
+            return -1
+        i = int(np.searchsorted(self.names, key))
+        if i < len(self.names) and self.names[i] == key:
+            return i
+        return -1
+
+    @staticmethod
+    def write(filename: str, files: List[str], names: List[str],
+              file_ids: List[int], lengths: List[int]) -> None:
+        order = sorted(range(len(names)), key=lambda i: names[i].encode())
+        encoded = [names[i].encode() for i in order]
+        width = max((len(name) for name in encoded), default=1)
+        arrays = [np.array(encoded, dtype=f'S{width}'),
+                  np.array([file_ids[i] for i in order], dtype='<u4'),
+                  np.array([lengths[i] for i in order], dtype='<i8')]
+        header = json.dumps({'files': files, 'n': len(names),
+                             'width': width}).encode()
+        with open(filename, 'wb') as f:
+            f.write(_LOOKUP_MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            for array in arrays:
+                f.write(b'\0' * (_aligned(f.tell()) - f.tell()))
+                f.write(array.tobytes())
 
 
 class IndexedFastaCollection(object):
-    """A collection of indexed fasta sequences"""
+    """A collection of indexed fasta sequences
+
+    With a ``lookup``, written with ``write_lookup``, the index of each file
+    is only read when a sequence of the file is first needed. The lookup
+    maps all sequence names to their files and lengths and is
+    memory-mapped, so that even collections of thousands of files open
+    instantly. Without a lookup, finding a sequence requires all indices,
+    so a ``lazy`` collection only defers reading them until the first
+    sequence is requested.
+    """
 
-    def __init__(self, files: List[str]):
+    def __init__(self, files: List[str] = None, lazy: bool = False,
+                 lookup: str = None):
         """Initialized an IndexedFastaCollection.
 
         :param files: a list of fasta files with associated ``.fai`` files.
+            Files ending in ``.2bit`` are opened as ``TwoBitFile`` objects.
+            May be omitted if a lookup is given.
+        :param lazy: if True, defer reading the indices until they are
+            needed. Sequence name collisions are then only detected at that
+            time.
+        :param lookup: a lookup file written by ``write_lookup`` for the
+            same files
         """
-        indexed_fastas = [IndexedFasta(file) for file in files]
-        self.index_map: Dict[str, IndexedFasta] = {}
-        for indexed_fasta in indexed_fastas:
-            for k in indexed_fasta.sequences():
-                if k in self.index_map:
-                    raise ValueError(f"Key collision: sequence name {k} appears more than once.")
-                self.index_map[k] = indexed_fasta
+        self._lookup = None
+        if lookup is not None:
+            self._lookup = _SequenceLookup(lookup)
+            if files is not None and list(files) != self._lookup.files:
+                raise ValueError(f"The files of the lookup {lookup} differ "
+                                 f"from the files of the collection")
+            files = self._lookup.files
+        elif files is None:
+            raise ValueError("Give either files or a lookup")
+        self.files = list(files)
+        self._indices = {}
+        self._index_map = None
+        if not lazy and lookup is None:
+            _ = self.index_map
+
+    @staticmethod
+    def _open(file: str):
+        from .twobit import TwoBitFile
+
+        return TwoBitFile(file) if file.endswith('.2bit') \
+            else IndexedFasta(file)
+
+    def _open_all(self, files: Iterable[str]) -> None:
+        """Read the indices of files which are not yet open"""
+        self._indices.update((file, self._open(file))
+                             for file in dict.fromkeys(files)
+                             if file not in self._indices)
+
+    @property
+    def index_map(self) -> Dict[str, IndexedFasta]:
+        """The index of each sequence name, reading all indices"""
+        if self._index_map is None:
+            self._open_all(self.files)
+            index_map = {}
+            for file in self.files:
+                indexed_fasta = self._indices[file]
+                for k in indexed_fasta.sequences():
+                    if k in index_map:
+                        raise ValueError(f"Key collision: sequence name {k} "
+                                         f"appears more than once.")
+                    index_map[k] = indexed_fasta
+            self._index_map = index_map
+        return self._index_map
+
+    def _file(self, name: str) -> str:
+        """Find the file of a sequence, or None if it is not present"""
+        if self._index_map is None and self._lookup is not None:
+            i = self._lookup.find(name)
+            return self.files[self._lookup.file_ids[i]] if i >= 0 else None
+        index = self.index_map.get(name, None)
+        return None if index is None else index.filename
+
+    def _index(self, name: str):
+        file = self._file(name)
+        if file is None:
+            raise KeyError(f"No such sequence {name} found in any index!")
+        self._open_all([file])
+        return self._indices[file]
+
+    def write_lookup(self, filename: str) -> None:
+        """Write a lookup of the sequence names of the collection
+
+        The lookup should be rewritten when any of the files change.
+
+        :param filename: the file to write the lookup to
+        """
+        file_ids = {file: i for i, file in enumerate(self.files)}
+        names, ids, lengths = [], [], []
+        for name, index in self.index_map.items():
+            names.append(name)
+            ids.append(file_ids[index.filename])
+            lengths.append(index.records[name].length)
+        _SequenceLookup.write(filename, self.files, names, ids, lengths)
 
     def __contains__(self, item) -> bool:
         """Indicate whether a sequence is in any file in the collection
@@ -230,7 +895,7 @@ class IndexedFastaCollection(object):
         :param item: a sequence name
         :return: True if present in any file, False if not
         """
-        return self.index_map.__contains__(item)
+        return self._file(item) is not None
 
     def __getitem__(self, item):
         """Get a sequence by name
@@ -244,20 +909,75 @@ class IndexedFastaCollection(object):
             raise ValueError("Can only getitem of type str")
 
     def keys(self):
-        """get the names of all sequences in the index"""
+        """get the names of all sequences in the index
+
+        With a lookup, the names are sorted and the indices are not read.
+        """
+        if self._index_map is None and self._lookup is not None:
+            return [name.decode() for name in self._lookup.names.tolist()]
         return self.index_map.keys()
 
     def sequences_names(self):
         """get the names of all sequences in the index"""
         return self.keys()
 
+    def lengths(self) -> Dict[str, int]:
+        """get the length of each sequence in the index"""
+        if self._index_map is None and self._lookup is not None:
+            return dict(zip(self.keys(), self._lookup.lengths.tolist()))
+        return {name: index.records[name].length
+                for name, index in self.index_map.items()}
+
     def get_sequence(self, name):
         """Retrieve a sequence object from the collection
 
         :param str name: The name of a sequence
         :return: a featureio.Seq object
         """
-        index = self.index_map.get(name, None)
-        if index is None:
-            raise KeyError(f"No such sequence {name} found in any index!")
-        return index.get_sequence(name)
+        return self._index(name).get_sequence(name)
+
+    def fetch(self, name: str, start: int, end: int, strand: str = '+') -> str:
+        """Retrieve a single region from the collection
+
+        :param name: The name of a sequence
+        :param start: 0-based start of the region
+        :param end: 0-based, exclusive end of the region
+        :param strand: if '-', the reverse complement is returned
+        :return: the sequence of the region as a string
+        """
+        return self.fetch_many([(name, start, end, strand)])[0]
+
+    def fetch_many(self, regions: Iterable[Sequence],
+                   max_gap: int = 4096) -> List[str]:
+        """Retrieve many regions from the collection with few reads.
+
+        Regions are grouped by file and fetched with
+        ``IndexedFasta.fetch_many``. With a lookup, only the indices of the
+        files containing the regions are read.
+
+        :param regions: an iterable (or array) of (name, start, end[, strand])
+            regions.
+        :param max_gap: the largest number of bytes between two regions
+            which will still be fetched with a single read.
+        :return: a list of sequence strings in the order of ``regions``
+        """
+        groups: Dict[str, Tuple[List[int], List]] = {}
+        n_regions = 0
+        for i, region in enumerate(regions):
+            name = str(region[0])
+            file = self._file(name)
+            if file is None:
+                raise KeyError(f"No such sequence {name} found in any index!")
+            positions, file_regions = groups.setdefault(file, ([], []))
+            positions.append(i)
+            file_regions.append(region)
+            n_regions += 1
+
+        self._open_all(groups)
+        results = [''] * n_regions
+        for file, (positions, file_regions) in groups.items():
+            seqs = self._indices[file].fetch_many(file_regions,
+                                                  max_gap=max_gap)
+            for i, seq in zip(positions, seqs):
+                results[i] = seq
+        return results
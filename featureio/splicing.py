@@ -0,0 +1,222 @@
+"""Splice junctions of spliced alignments and annotations.
+
+Junctions are the introns between consecutive exons, returned as sorted
+NumPy structured arrays with the fields ``chrom``, ``strand``, ``donor``,
+``acceptor`` and ``count``. The donor and acceptor are the 0-based positions
+of the first and the last base of the intron in the orientation of the
+transcript, i.e. the donor is the larger coordinate on the '-' strand.
+Arrays are sorted by chromosome, strand and position and each junction
+appears once, with the number of genes or alignments supporting it.
+
+Introns are collected from chunks of genes and aggregated per chunk, so
+that memory use depends on the number of distinct junctions rather than on
+the number of alignments.
+"""
+import itertools
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .gene import Gene
+
+CANONICAL_MOTIFS = ('GT-AG', 'GC-AG', 'AT-AC')
+
+_Columns = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def _aggregate(chrom, strand, start, end, count) -> _Columns:
+    """Sort introns and sum the counts of identical ones"""
+    if not len(start):
+        return chrom, strand, start, end, count
+    order = np.lexsort((end, start, strand, chrom))
+    chrom, strand, start, end, count = (a[order] for a in (
+        chrom, strand, start, end, count))
+    new = np.ones(len(start), dtype=bool)
+    new[1:] = (chrom[1:] != chrom[:-1]) | (strand[1:] != strand[:-1]) | \
+        (start[1:] != start[:-1]) | (end[1:] != end[:-1])
+    first = np.flatnonzero(new)
+    return (chrom[first], strand[first], start[first], end[first],
+            np.add.reduceat(count, first))
+
+
+def _concatenate(columns: List[_Columns]) -> _Columns:
+    return tuple(np.concatenate(arrays) for arrays in zip(*columns))
+
+
+def _chunk_introns(genes: List[Gene], chroms: Dict[str, int],
+                   strands: Dict[str, int], min_length: int) -> _Columns:
+    """Collect the introns of genes, coding names with chroms and strands"""
+    flatten = itertools.chain.from_iterable
+    n_exons = np.fromiter((len(g.exons) for g in genes), dtype=np.int64,
+                          count=len(genes))
+    exons = np.fromiter(flatten(flatten(g.exons for g in genes)),
+                        dtype=np.int64).reshape(-1, 2)
+    gene_chrom = np.fromiter((chroms.setdefault(g.chrom, len(chroms))
+                              for g in genes), dtype=np.int64,
+                             count=len(genes))
+    gene_strand = np.fromiter((strands.setdefault(g.strand, len(strands))
+                               for g in genes), dtype=np.int64,
+                              count=len(genes))
+    gene_of_exon = np.repeat(np.arange(len(genes)), n_exons)
+    # introns lie between consecutive exons of the same gene
+    same = gene_of_exon[1:] == gene_of_exon[:-1]
+    start, end = exons[:-1, 1][same], exons[1:, 0][same]
+    gene = gene_of_exon[1:][same]
+    keep = end - start >= min_length
+    gene = gene[keep]
+    return (gene_chrom[gene], gene_strand[gene], start[keep], end[keep],
+            np.ones(len(gene), dtype=np.int64))
+
+
+def _to_array(chrom_names, strand_names, chrom, strand, start,
+              end, count) -> np.ndarray:
+    width = max((len(name) for name in chrom_names), default=1)
+    array = np.empty(len(start), dtype=[
+        ('chrom', f'U{width}'), ('strand', 'U1'), ('donor', np.int64),
+        ('acceptor', np.int64), ('count', np.int64)])
+    array['chrom'] = np.asarray(chrom_names, dtype=f'U{width}')[chrom] \
+        if len(chrom_names) else ''
+    array['strand'] = np.asarray(strand_names, dtype='U1')[strand] \
+        if len(strand_names) else ''
+    reverse = array['strand'] == '-'
+    array['donor'] = np.where(reverse, end - 1, start)
+    array['acceptor'] = np.where(reverse, start, end - 1)
+    array['count'] = count
+    return array
+
+
+def _ranks(codes: Dict[str, int]) -> Tuple[List[str], np.ndarray]:
+    """Sort coded names and map each code to the rank of its name"""
+    names = sorted(codes)
+    ranks = np.empty(len(codes), dtype=np.int64)
+    ranks[[codes[name] for name in names]] = np.arange(len(names))
+    return names, ranks
+
+
+def junctions(genes: Iterable[Gene], min_length: int = 1,
+              chunk_size: int = 1 << 18) -> np.ndarray:
+    """Count the distinct splice junctions of genes or alignments.
+
+    :param genes: an iterable of ``Gene`` objects, e.g. from the bed12 or
+        psl readers
+    :param min_length: the shortest gap between exons counted as an intron.
+        Increase this to ignore short alignment gaps caused by indels.
+    :param chunk_size: the number of genes whose introns are aggregated
+        at once
+    :return: a structured array of the fields chrom, strand, donor,
+        acceptor and count. See the module documentation.
+    """
+    chroms: Dict[str, int] = {}
+    strands: Dict[str, int] = {}
+    reduced, size = [], 0
+    genes = iter(genes)
+    while True:
+        chunk = list(itertools.islice(genes, chunk_size))
+        if not chunk:
+            break
+        reduced.append(_aggregate(*_chunk_introns(chunk, chroms, strands,
+                                                  min_length)))
+        size += len(reduced[-1][0])
+        if size > 4 * chunk_size:
+            # merge the chunks so far when their junctions take more space
+            # than a few chunks of introns
+            reduced = [_aggregate(*_concatenate(reduced))]
+            size = len(reduced[0][0])
+    if not reduced:
+        return _to_array([], [], *(np.zeros(0, dtype=np.int64),) * 5)
+    chrom, strand, start, end, count = _concatenate(reduced)
+    chrom_names, chrom_ranks = _ranks(chroms)
+    strand_names, strand_ranks = _ranks(strands)
+    return _to_array(chrom_names, strand_names, *_aggregate(
+        chrom_ranks[chrom], strand_ranks[strand], start, end, count))
+
+
+def _common_columns(*arrays: np.ndarray):
+    """Code the junctions of several arrays with common name codes"""
+    chrom_names, chrom = np.unique(
+        np.concatenate([a['chrom'] for a in arrays]), return_inverse=True)
+    strand_names, strand = np.unique(
+        np.concatenate([a['strand'] for a in arrays]), return_inverse=True)
+    donor = np.concatenate([a['donor'] for a in arrays])
+    acceptor = np.concatenate([a['acceptor'] for a in arrays])
+    reverse = strand_names[strand] == '-'
+    start = np.where(reverse, acceptor, donor)
+    end = np.where(reverse, donor, acceptor) + 1
+    count = np.concatenate([a['count'] for a in arrays])
+    return (chrom_names.tolist(), strand_names.tolist(),
+            (chrom.ravel(), strand.ravel(), start, end, count))
+
+
+def _in(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Find the junctions of a which are also in b"""
+    _, _, (chrom, strand, start, end, _) = _common_columns(a, b)
+    order = np.lexsort((end, start, strand, chrom))
+    chrom, strand, start, end = (x[order] for x in (chrom, strand, start,
+                                                    end))
+    # each junction is at most once in each array
+    same = (chrom[1:] == chrom[:-1]) & (strand[1:] == strand[:-1]) & \
+        (start[1:] == start[:-1]) & (end[1:] == end[:-1])
+    found = np.zeros(len(order), dtype=bool)
+    found[order[:-1][same]] = True
+    found[order[1:][same]] = True
+    return found[:len(a)]
+
+
+def intersect_junctions(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Find the junctions of a which are also in b
+
+    :param a: a junction array from ``junctions``
+    :param b: a junction array from ``junctions``
+    :return: the junctions of a in b, with their counts in a
+    """
+    return a[_in(a, b)]
+
+
+def subtract_junctions(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Find the junctions of a which are not in b
+
+    :param a: a junction array from ``junctions``
+    :param b: a junction array from ``junctions``
+    :return: the junctions of a not in b, with their counts in a
+    """
+    return a[~_in(a, b)]
+
+
+def union_junctions(*arrays: np.ndarray) -> np.ndarray:
+    """Combine junction arrays, adding the counts of common junctions
+
+    :param arrays: junction arrays from ``junctions``
+    :return: a junction array of all junctions
+    """
+    chrom_names, strand_names, columns = _common_columns(*arrays)
+    return _to_array(chrom_names, strand_names, *_aggregate(*columns))
+
+
+def splice_motifs(junctions: np.ndarray, index,
+                  max_gap: int = 4096) -> np.ndarray:
+    """Find the dinucleotides at the ends of introns.
+
+    The two bases at the donor and the two at the acceptor of all junctions
+    are fetched with a single call to ``fetch_many``. Junctions on the '-'
+    strand are reverse complemented, so canonical introns have the motif
+    'GT-AG' on either strand. See ``CANONICAL_MOTIFS``.
+
+    :param junctions: a junction array from ``junctions``
+    :param index: an ``IndexedFasta``, ``TwoBitFile`` or
+        ``IndexedFastaCollection``
+    :param max_gap: passed to ``fetch_many``
+    :return: an array of upper case motifs such as 'GT-AG'
+    """
+    regions = []
+    for chrom, strand, donor, acceptor in zip(
+            junctions['chrom'].tolist(), junctions['strand'].tolist(),
+            junctions['donor'].tolist(), junctions['acceptor'].tolist()):
+        if strand == '-':
+            regions.append((chrom, donor - 1, donor + 1, '-'))
+            regions.append((chrom, acceptor, acceptor + 2, '-'))
+        else:
+            regions.append((chrom, donor, donor + 2))
+            regions.append((chrom, acceptor - 1, acceptor + 1))
+    seqs = index.fetch_many(regions, max_gap=max_gap)
+    return np.array([f'{d}-{a}'.upper()
+                     for d, a in zip(seqs[::2], seqs[1::2])], dtype='U5')
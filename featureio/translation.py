@@ -0,0 +1,155 @@
+import functools
+from typing import Iterable, List
+
+import attr
+import numpy as np
+
+# amino acids of the NCBI genetic codes, indexed by codon with T=0, C=1, A=2,
+# G=3 for the first, second and third base, e.g. TTT=0, TTC=1, ..., GGG=63
+genetic_codes = {
+    1: 'FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+    2: 'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSS**VVVVAAAADDEEGGGG',
+    3: 'FFLLSSSSYY**CCWWTTTTPPPPHHQQRRRRIIMMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+    4: 'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+    5: 'FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSSSVVVVAAAADDEEGGGG',
+    6: 'FFLLSSSSYYQQCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+    11: 'FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG',
+}
+
+# bases are coded as T=0, C=1, A=2, G=3 and anything but ACGTU as 4, and a
+# codon as the base 5 number of its bases, e.g. TTT=0, TTC=1, ..., NNN=124,
+# so that codons with ambiguous bases need no separate check
+_base_codes = bytearray([4] * 256)
+for _code, _bases in enumerate(['TtUu', 'Cc', 'Aa', 'Gg']):
+    for _base in _bases:
+        _base_codes[ord(_base)] = _code
+_base_codes = bytes(_base_codes)
+_start_codon = 2 * 25 + 0 * 5 + 3  # ATG
+
+
+@attr.s(frozen=True)
+class Orf(object):
+    """An open reading frame.
+
+    :param start: 0-based start of the ORF on the forward strand
+    :param end: 0-based, exclusive end of the ORF on the forward strand,
+        including the stop codon.
+    :param strand: '+' or '-'
+    :param frame: the offset of the first codon from the 5' end of the strand
+    """
+    start: int = attr.ib()
+    end: int = attr.ib()
+    strand: str = attr.ib()
+    frame: int = attr.ib()
+
+
+@functools.lru_cache(maxsize=None)
+def _table(table: int) -> bytes:
+    """Get the codon translation table of an NCBI genetic code"""
+    if table not in genetic_codes:
+        raise ValueError(f"Unknown genetic code {table}. Should be one of "
+                         f"{','.join(str(k) for k in genetic_codes)}")
+    amino_acids = genetic_codes[table]
+    lookup = bytearray(b'X' * 256)
+    for codon in range(64):
+        first, second, third = codon >> 4, (codon >> 2) & 3, codon & 3
+        lookup[first * 25 + second * 5 + third] = ord(amino_acids[codon])
+    return bytes(lookup)
+
+
+def _encode(seq: str) -> np.ndarray:
+    """Encode a nucleotide sequence as an array of base codes"""
+    return np.frombuffer(seq.encode().translate(_base_codes), dtype=np.uint8)
+
+
+def _codons(codes: np.ndarray) -> np.ndarray:
+    """Compute codon indices from base codes, whose length is divisible by 3"""
+    codes = codes.reshape(-1, 3)
+    return codes[:, 0] * np.uint8(25) + codes[:, 1] * np.uint8(5) + \
+        codes[:, 2]
+
+
+def translate(seq: str, table: int = 1) -> str:
+    """Translate a nucleotide sequence to protein.
+
+    Incomplete codons at the end of the sequence are ignored and codons
+    containing ambiguous bases are translated to X.
+
+    :param seq: the nucleotide sequence, e.g. the result of ``Gene.get_cds``
+    :param table: the number of the NCBI genetic code to use
+    :return: the protein sequence with stop codons as '*'
+    """
+    codes = _encode(seq)
+    codes = codes[:len(codes) - len(codes) % 3]
+    return _codons(codes).tobytes().translate(_table(table)).decode()
+
+
+def translate_many(seqs: Iterable[str], table: int = 1) -> List[str]:
+    """Translate many nucleotide sequences to protein in a single pass.
+
+    This saves the per-call overhead of ``translate``, which dominates for
+    short sequences such as exons or peptides. Long sequences such as whole
+    coding sequences translate about as fast with either function.
+
+    :param seqs: an iterable of nucleotide sequences
+    :param table: the number of the NCBI genetic code to use
+    :return: a list of protein sequences in the order of ``seqs``
+    """
+    seqs = [seq[:len(seq) - len(seq) % 3] for seq in seqs]
+    bounds = np.cumsum([0] + [len(seq) // 3 for seq in seqs])
+    protein = _codons(_encode(''.join(seqs))).tobytes()
+    protein = protein.translate(_table(table)).decode()
+    return [protein[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def _frame_orfs(codons: np.ndarray, stop: np.ndarray, min_codons: int):
+    """Find ORFs in a frame of codons.
+
+    :return: arrays of first codon and (exclusive) last codon of each ORF
+    """
+    stops = np.flatnonzero(stop[codons])
+    starts = np.flatnonzero(codons == _start_codon)
+    if not len(starts):
+        return starts, starts
+    # the first start codon after the previous stop codon begins the ORF
+    previous = np.concatenate(([-1], stops[:-1]))
+    first = np.searchsorted(starts, previous + 1)
+    found = first < len(starts)
+    orf_starts = starts[np.minimum(first, len(starts) - 1)]
+    orf_ends = stops + 1
+    keep = found & (orf_starts < stops) & \
+        (orf_ends - orf_starts >= min_codons)
+    return orf_starts[keep], orf_ends[keep]
+
+
+def find_orfs(seq: str, min_length: int = 75, table: int = 1) -> List[Orf]:
+    """Find open reading frames on all six frames of a sequence.
+
+    An ORF begins with the first ATG following a stop codon (or the start
+    of the frame) and includes the next stop codon in the same frame. ORFs
+    without a stop codon are not reported.
+
+    :param seq: a nucleotide sequence
+    :param min_length: the minimum length of an ORF in nucleotides,
+        including the stop codon
+    :param table: the number of the NCBI genetic code whose stop codons to use
+    :return: a list of ``Orf`` objects sorted by start, end and strand
+    """
+    stop = np.frombuffer(_table(table), dtype=np.uint8) == ord('*')
+    forward = _encode(seq)
+    # complement of T, C, A, G (0, 1, 2, 3) is A, G, T, C (2, 3, 0, 1)
+    reverse = np.where(forward > 3, forward, forward ^ 2)[::-1]
+    min_codons = -(-min_length // 3)
+
+    orfs = []
+    for strand, codes in (('+', forward), ('-', reverse)):
+        for frame in range(3):
+            frame_codes = codes[frame:]
+            frame_codes = frame_codes[:len(frame_codes) - len(frame_codes) % 3]
+            starts, ends = _frame_orfs(_codons(frame_codes), stop, min_codons)
+            starts, ends = frame + starts * 3, frame + ends * 3
+            if strand == '-':
+                starts, ends = len(seq) - ends, len(seq) - starts
+            orfs.extend(Orf(int(start), int(end), strand, frame)
+                        for start, end in zip(starts, ends))
+    return sorted(orfs, key=lambda orf: (orf.start, orf.end, orf.strand))
@@ -0,0 +1,421 @@
+import os
+import shutil
+import struct
+import tempfile
+from typing import Iterable, List, Dict, Sequence, TextIO, Union
+
+import attr
+import numpy as np
+
+from . import metrics
+from .gene import reverse_complement
+from .seq import Seq, read_fasta_chunks, _region_fields
+
+TWOBIT_SIGNATURE = 0x1A412743
+
+# two bits per base, T=0, C=1, A=2, G=3, most significant bits first
+_bases = np.frombuffer(b'TCAG', dtype=np.uint8)
+_decode_table = np.stack([_bases[(np.arange(256) >> shift) & 3]
+                          for shift in (6, 4, 2, 0)], axis=1)
+_encode_table = np.zeros(256, dtype=np.uint8)
+_is_base = np.zeros(256, dtype=bool)
+for _code, _base in enumerate(b'TCAG'):
+    _encode_table[[_base, _base | 0x20]] = _code
+    _is_base[[_base, _base | 0x20]] = True
+
+
+@attr.s
+class TwoBitRecord(object):
+    """A 2bit sequence record.
+
+    This represents the location and the size of a single sequence in a
+    ``TwoBitFile``. The N-blocks and soft-mask blocks are loaded on first
+    use.
+
+    :param name: the name of the sequence
+    :param length: the length of the sequence
+    :param offset: the position of the record in the file
+    """
+    name: str = attr.ib()
+    length: int = attr.ib(converter=int)
+    offset: int = attr.ib(converter=int)
+    n_starts: np.ndarray = attr.ib(default=None, repr=False)
+    n_ends: np.ndarray = attr.ib(default=None, repr=False)
+    mask_starts: np.ndarray = attr.ib(default=None, repr=False)
+    mask_ends: np.ndarray = attr.ib(default=None, repr=False)
+    dna_offset: int = attr.ib(default=None, repr=False)
+
+
+def _block_runs(flags: np.ndarray):
+    """Find the starts and ends of runs of True in a boolean array"""
+    if not flags.any():
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    bounds = np.concatenate(
+        ([0], np.flatnonzero(flags[1:] != flags[:-1]) + 1, [len(flags)]))
+    runs = flags[bounds[:-1]]
+    return bounds[:-1][runs], bounds[1:][runs]
+
+
+def _apply_blocks(seq: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                  start: int, end: int, func) -> None:
+    """Apply func to the parts of seq (beginning at start) in the blocks"""
+    first = np.searchsorted(ends, start, side='right')
+    last = np.searchsorted(starts, end, side='left')
+    for block_start, block_end in zip(starts[first:last], ends[first:last]):
+        func(seq[max(block_start, start) - start:min(block_end, end) - start])
+
+
+def _set_n(block):
+    block[:] = ord('N')
+
+
+def _lower(block):
+    block |= 0x20
+
+
+class TwoBitFile(object):
+    """A UCSC 2bit file.
+
+    This object can be used in place of an ``IndexedFasta`` to retrieve
+    sequences and regions from a 2bit packed genome without loading it into
+    memory.
+    """
+
+    def __init__(self, filename: str):
+        """Initialize a TwoBitFile object.
+
+        :param filename: a path to a 2bit file.
+        """
+        self.filename = filename
+        if not os.path.exists(self.filename):
+            raise ValueError(f"{self.filename} does not exist")
+        with open(self.filename, 'rb') as f:
+            header = f.read(16)
+            if len(header) < 16:
+                raise ValueError(f"{self.filename} is not a 2bit file")
+            for byte_order in '<>':
+                signature, version, count, _ = struct.unpack(
+                    byte_order + 'IIII', header)
+                if signature == TWOBIT_SIGNATURE:
+                    break
+            else:
+                raise ValueError(f"{self.filename} is not a 2bit file")
+            if version not in (0, 1):
+                raise ValueError(f"Unsupported 2bit version {version} in "
+                                 f"{self.filename}")
+            self.byte_order = byte_order
+            offset_format = byte_order + ('Q' if version else 'I')
+            offset_size = struct.calcsize(offset_format)
+
+            records = []
+            for _ in range(count):
+                name = f.read(f.read(1)[0]).decode()
+                offset, = struct.unpack(offset_format, f.read(offset_size))
+                records.append((name, offset))
+            self.records: Dict[str, TwoBitRecord] = {}
+            for name, offset in records:
+                f.seek(offset)
+                length, = struct.unpack(byte_order + 'I', f.read(4))
+                self.records[name] = TwoBitRecord(name, length, offset)
+        if len(self.records) != len(records):
+            raise ValueError(f"Non-unique sequence names in {self.filename}")
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, item):
+        """Get a sequence by name
+
+        :param str item: name of the sequence
+        :return: a featureio.Seq object
+        """
+        if isinstance(item, str):
+            return self.get_sequence(item)
+        else:
+            raise ValueError("Can only getitem of type str")
+
+    def __contains__(self, item: str) -> bool:
+        """indicate whether a sequence is contained in the file
+
+        :param item: A name of a sequence
+        :return: True if present
+        """
+        return self.records.__contains__(item)
+
+    def sequences(self):
+        """Return all sequence names contained in the file"""
+        return self.records.keys()
+
+    def lengths(self) -> Dict[str, int]:
+        """Return the length of each sequence in the file"""
+        return {name: record.length for name, record in self.records.items()}
+
+    def _read_blocks(self, f, record: TwoBitRecord) -> None:
+        """Load the N-blocks and soft-mask blocks of a record"""
+        uint32 = np.dtype(self.byte_order + 'u4')
+        f.seek(record.offset + 4)
+        blocks = []
+        for _ in range(2):
+            count, = struct.unpack(self.byte_order + 'I', f.read(4))
+            starts = np.frombuffer(f.read(4 * count), dtype=uint32)
+            sizes = np.frombuffer(f.read(4 * count), dtype=uint32)
+            starts = starts.astype(np.int64)
+            blocks.extend([starts, starts + sizes])
+        (record.n_starts, record.n_ends,
+         record.mask_starts, record.mask_ends) = blocks
+        record.dna_offset = f.tell() + 4
+
+    def _decode(self, f, record: TwoBitRecord, start: int, end: int) -> str:
+        """Decode the region [start, end) of a record from an opened file"""
+        if record.dna_offset is None:
+            metrics.count('twobit.block_cache.misses')
+            self._read_blocks(f, record)
+        else:
+            metrics.count('twobit.block_cache.hits')
+        start, end = min(start, record.length), min(end, record.length)
+        if end <= start:
+            return ''
+        f.seek(record.dna_offset + start // 4)
+        packed = np.frombuffer(f.read((end - 1) // 4 - start // 4 + 1),
+                               dtype=np.uint8)
+        metrics.count('fetch.reads')
+        metrics.count('fetch.bytes', len(packed))
+        seq = _decode_table[packed].ravel()[start % 4:start % 4 + end - start]
+        _apply_blocks(seq, record.n_starts, record.n_ends, start, end, _set_n)
+        _apply_blocks(seq, record.mask_starts, record.mask_ends, start, end,
+                      _lower)
+        return seq.tobytes().decode()
+
+    def get_sequence(self, name: str) -> Seq:
+        """Retrieve a sequence from a 2bit file
+
+        :param name: The name of the sequence in the file
+        :return: A Seq object
+        """
+        record = self.records.get(name, None)
+        if record is None:
+            raise KeyError(f"No such sequence {name} in {self.filename}")
+        with metrics.timer('fetch.time'), open(self.filename, 'rb') as f:
+            metrics.count('fetch.records')
+            return Seq(name, self._decode(f, record, 0, record.length))
+
+    def fetch(self, name: str, start: int, end: int, strand: str = '+') -> str:
+        """Retrieve a single region from a 2bit file
+
+        :param name: The name of the sequence in the file
+        :param start: 0-based start of the region
+        :param end: 0-based, exclusive end of the region
+        :param strand: if '-', the reverse complement is returned
+        :return: the sequence of the region as a string
+        """
+        return self.fetch_many([(name, start, end, strand)])[0]
+
+    def fetch_many(self, regions: Iterable[Sequence],
+                   max_gap: int = 4096) -> List[str]:
+        """Retrieve many regions from a 2bit file.
+
+        Regions are decoded in the order of their position in the file and
+        returned in the order of ``regions``. The coordinates follow python
+        slicing, i.e. they are 0-based and the end is exclusive.
+
+        :param regions: an iterable (or array) of (name, start, end[, strand])
+            regions. If the strand is '-', the reverse complement is returned.
+        :param max_gap: accepted for compatibility with
+            ``IndexedFasta.fetch_many``. Regions are always read separately.
+        :return: a list of sequence strings in the order of ``regions``
+        """
+        spans = []
+        for i, region in enumerate(regions):
+            name, start, end, strand = _region_fields(region)
+            record = self.records.get(name, None)
+            if record is None:
+                raise KeyError(f"No such sequence {name} in {self.filename}")
+            if start < 0 or end < 0:
+                raise ValueError(f"Negative coordinates in region {region}")
+            spans.append((record.offset, start, end, i, strand, record))
+        spans.sort(key=lambda span: span[:4])
+
+        results = [''] * len(spans)
+        with metrics.timer('fetch.time'), open(self.filename, 'rb') as f:
+            for _, start, end, i, strand, record in spans:
+                seq = self._decode(f, record, start, end)
+                results[i] = reverse_complement(seq) if strand == '-' else seq
+        metrics.count('fetch.regions', len(spans))
+        return results
+
+
+class _RecordPacker(object):
+    """Pack a sequence into a 2bit record from consecutive chunks"""
+
+    def __init__(self):
+        self.length = 0
+        self.packed = []
+        self.tail = np.zeros(0, dtype=np.uint8)
+        self.blocks = ([], [], [], [])
+
+    def add(self, bases: np.ndarray) -> None:
+        """Add the next bases of the sequence
+
+        :param bases: the bases as an array of ASCII codes
+        """
+        for runs, starts, ends in zip(
+                (_block_runs(~_is_base[bases]),
+                 _block_runs(bases >= ord('a'))),
+                self.blocks[::2], self.blocks[1::2]):
+            starts.append(runs[0] + self.length)
+            ends.append(runs[1] + self.length)
+        self.length += len(bases)
+        # bases are packed four per byte, the rest waits for the next chunk
+        codes = _encode_table[bases]
+        if len(self.tail):
+            codes = np.concatenate((self.tail, codes))
+        n = len(codes) - len(codes) % 4
+        self.packed.append(self._pack(codes[:n]))
+        self.tail = codes[n:]
+
+    @staticmethod
+    def _pack(codes: np.ndarray) -> bytes:
+        codes = codes.reshape(-1, 4)
+        return ((codes[:, 0] << 6) | (codes[:, 1] << 4) |
+                (codes[:, 2] << 2) | codes[:, 3]).tobytes()
+
+    @staticmethod
+    def _merged(starts: List[np.ndarray], ends: List[np.ndarray]):
+        """Join the runs of all chunks, merging runs across chunk borders"""
+        if not starts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        starts, ends = np.concatenate(starts), np.concatenate(ends)
+        if not len(starts):
+            return starts, ends
+        separate = starts[1:] != ends[:-1]
+        return (starts[np.concatenate(([True], separate))],
+                ends[np.concatenate((separate, [True]))])
+
+    def record(self) -> bytes:
+        """The bytes of the record of all bases added"""
+        tail = np.concatenate((self.tail, np.zeros(-len(self.tail) % 4,
+                                                   np.uint8)))
+        n_starts, n_ends = self._merged(*self.blocks[:2])
+        mask_starts, mask_ends = self._merged(*self.blocks[2:])
+        return b''.join([
+            struct.pack('<II', self.length, len(n_starts)),
+            n_starts.astype('<u4').tobytes(),
+            (n_ends - n_starts).astype('<u4').tobytes(),
+            struct.pack('<I', len(mask_starts)),
+            mask_starts.astype('<u4').tobytes(),
+            (mask_ends - mask_starts).astype('<u4').tobytes(),
+            struct.pack('<I', 0),
+            *self.packed, self._pack(tail)])
+
+
+def twobit_record(seq: Seq) -> bytes:
+    """Pack a sequence into a 2bit record.
+
+    Bases other than ACGT are stored as N-blocks and lower case bases as
+    soft-mask blocks.
+
+    :param seq: a ``Seq`` object
+    :return: the bytes of the record, without the file header and index
+    """
+    packer = _RecordPacker()
+    packer.add(np.frombuffer(seq.sequence.encode(), dtype=np.uint8))
+    return packer.record()
+
+
+class _TwoBitWriter(object):
+    """Write 2bit records as they are completed.
+
+    The header and the index precede the records in a 2bit file but depend
+    on all names and record sizes, so the records are first written to a
+    temporary file next to the output and copied after the index on close.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.names: List[bytes] = []
+        self.sizes: List[int] = []
+        self.seen = set()
+        self.spool = tempfile.TemporaryFile(
+            dir=os.path.dirname(os.path.abspath(filename)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.spool.close()
+
+    def write_record(self, name: str, record: bytes) -> None:
+        name = name.encode()
+        if name in self.seen:
+            raise ValueError("Non-unique sequence names cannot be written "
+                             "to a 2bit file")
+        if len(name) > 255:
+            raise ValueError("Sequence names in 2bit files are limited to "
+                             "255 characters")
+        self.seen.add(name)
+        self.names.append(name)
+        self.sizes.append(len(record))
+        self.spool.write(record)
+
+    def close(self) -> None:
+        index_size = sum(1 + len(name) + 4 for name in self.names)
+        version = 0
+        if 16 + index_size + sum(self.sizes) >= 2 ** 32:
+            version = 1
+            index_size += 4 * len(self.names)
+        offset_format = '<Q' if version else '<I'
+
+        with self.spool, open(self.filename, 'wb') as f:
+            f.write(struct.pack('<IIII', TWOBIT_SIGNATURE, version,
+                                len(self.names), 0))
+            offset = 16 + index_size
+            for name, size in zip(self.names, self.sizes):
+                f.write(struct.pack('<B', len(name)) + name)
+                f.write(struct.pack(offset_format, offset))
+                offset += size
+            self.spool.seek(0)
+            shutil.copyfileobj(self.spool, f, 1 << 24)
+
+
+def write_twobit(seqs: Iterable[Seq], filename: str) -> None:
+    """Write sequences to a 2bit file.
+
+    Each record is written as soon as it is packed, so only one packed
+    sequence is held in memory at a time.
+
+    :param seqs: an iterable of ``Seq`` objects
+    :param filename: the path of the 2bit file to write
+    """
+    with _TwoBitWriter(filename) as writer:
+        for seq in seqs:
+            writer.write_record(seq.name, twobit_record(seq))
+
+
+def fasta_to_twobit(fasta: Union[str, TextIO], filename: str,
+                    chunk_size: int = 1 << 22) -> None:
+    """Convert a fasta file to a 2bit file.
+
+    The fasta file is read in chunks with ``read_fasta_chunks`` and each
+    chunk is packed as it is read, so that only the packed form of one
+    sequence is held in memory.
+
+    :param fasta: a path to a fasta file or an opened fasta file
+    :param filename: the path of the 2bit file to write
+    :param chunk_size: the number of bases read and packed at once
+    """
+    if isinstance(fasta, str):
+        with open(fasta) as f:
+            return fasta_to_twobit(f, filename, chunk_size)
+    name, packer = None, None
+    with _TwoBitWriter(filename) as writer:
+        for chunk_name, start, chunk in read_fasta_chunks(fasta, chunk_size):
+            if not start:
+                if packer is not None:
+                    writer.write_record(name, packer.record())
+                name, packer = chunk_name, _RecordPacker()
+            packer.add(np.frombuffer(chunk.encode(), dtype=np.uint8))
+        if packer is not None:
+            writer.write_record(name, packer.record())
@@ -23,6 +23,8 @@ setup(
         "Topic :: Scientific/Engineering :: Bio-Informatics"
     ],
     packages=["featureio"],
+    install_requires=["attrs", "numpy"],
+    extras_require={"parquet": ["pyarrow"]},
     test_require=["pytest"]
 )
 
@@ -0,0 +1,11 @@
+import featureio
+
+
+def gene(chrom, strand, *exons, cds=None, name='g'):
+    """Build a gene from its exons. The CDS spans the gene by default."""
+    start, end = exons[0][0], exons[-1][1]
+    cds_start, cds_end = cds if cds else (start, end)
+    return featureio.Gene(
+        chrom, start, end, name, 0, strand, cds_start, cds_end, 0,
+        len(exons), ','.join(str(e - s) for s, e in exons),
+        ','.join(str(s - start) for s, _ in exons))
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+import featureio
+
+from .helpers import gene
+
+
+@pytest.fixture
+def genes_a():
+    return [gene('chr1', '+', (10, 20), (30, 40)),
+            gene('chr1', '-', (15, 25)),
+            gene('chr1', '+', (40, 50)),
+            gene('chr2', '+', (0, 5))]
+
+
+@pytest.fixture
+def genes_b():
+    return [gene('chr1', '-', (18, 32)),
+            gene('chr2', '+', (100, 200))]
+
+
+def test_merge_exons(genes_a):
+    assert list(featureio.merge_exons(genes_a)) == [
+        ('chr1', 10, 25, '.'), ('chr1', 30, 50, '.'), ('chr2', 0, 5, '.')]
+    assert list(featureio.merge_exons(genes_a, stranded=True)) == [
+        ('chr1', 10, 20, '+'), ('chr1', 30, 50, '+'), ('chr1', 15, 25, '-'),
+        ('chr2', 0, 5, '+')]
+    assert list(featureio.merge_exons(genes_a, distance=5)) == [
+        ('chr1', 10, 50, '.'), ('chr2', 0, 5, '.')]
+
+
+def test_merge_exons_sorted_input(genes_a):
+    sorted_genes = sorted(genes_a, key=lambda g: (g.chrom, g.start))
+    for stranded in (False, True):
+        assert list(featureio.merge_exons(sorted_genes, stranded=stranded,
+                                          sorted_input=True)) == \
+            list(featureio.merge_exons(genes_a, stranded=stranded))
+
+
+def test_intersect_subtract(genes_a, genes_b):
+    assert list(featureio.intersect(genes_a, genes_b)) == [
+        ('chr1', 18, 25, '.'), ('chr1', 30, 32, '.')]
+    assert list(featureio.intersect(genes_a, genes_b, stranded=True)) == [
+        ('chr1', 18, 25, '-')]
+    assert list(featureio.subtract(genes_a, genes_b)) == [
+        ('chr1', 10, 18, '.'), ('chr1', 32, 50, '.'), ('chr2', 0, 5, '.')]
+
+
+def test_complement(genes_a):
+    sizes = {'chr1': 60, 'chr2': 5, 'chr3': 10}
+    assert list(featureio.complement(genes_a, sizes)) == [
+        ('chr1', 0, 10, '.'), ('chr1', 25, 30, '.'), ('chr1', 50, 60, '.'),
+        ('chr3', 0, 10, '.')]
+
+
+@pytest.mark.fasta
+def test_complement_index(fasta_dir):
+    indexed_fasta = featureio.IndexedFasta(os.path.join(fasta_dir, 'random.fa'))
+    regions = list(featureio.complement([gene('seq1', '+', (0, 100))],
+                                        indexed_fasta))
+    assert regions[0] == ('seq1', 100, 7612, '.')
+    assert len(regions) == len(indexed_fasta)
+
+
+def test_coverage(genes_a):
+    assert list(featureio.coverage(genes_a)) == [
+        ('chr1', 10, 15, '.', 1), ('chr1', 15, 20, '.', 2),
+        ('chr1', 20, 25, '.', 1), ('chr1', 30, 50, '.', 1),
+        ('chr2', 0, 5, '.', 1)]
+    assert list(featureio.coverage(genes_a, chrom_sizes={'chr1': 60,
+                                                         'chr2': 8})) == [
+        ('chr1', 0, 10, '.', 0), ('chr1', 10, 15, '.', 1),
+        ('chr1', 15, 20, '.', 2), ('chr1', 20, 25, '.', 1),
+        ('chr1', 25, 30, '.', 0), ('chr1', 30, 50, '.', 1),
+        ('chr1', 50, 60, '.', 0), ('chr2', 0, 5, '.', 1),
+        ('chr2', 5, 8, '.', 0)]
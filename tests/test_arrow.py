@@ -0,0 +1,81 @@
+import io
+
+import pytest
+
+import featureio
+
+pa = pytest.importorskip('pyarrow')
+
+BED = ('chr1\t100\t500\tg1\t0\t+\t120\t480\t0\t3\t50,100,80,\t0,150,320,\n'
+       'chr2\t1000\t1300\tg2\t7\t-\t1000\t1000\t255,0,0\t1\t300,\t0,\n'
+       'chr1\t700\t900\tg3\t0\t-\t750\t850\t0\t2\t60,70,\t0,130,\n')
+
+AUGUSTUS = '''# start gene g1
+chr1\tAUGUSTUS\tgene\t101\t400\t0.5\t+\t.\tg1
+chr1\tAUGUSTUS\ttranscript\t101\t400\t0.5\t+\t.\tg1.t1
+chr1\tAUGUSTUS\texon\t101\t200\t.\t+\t.\ttranscript_id "g1.t1"; gene_id "g1";
+chr1\tAUGUSTUS\tCDS\t121\t200\t.\t+\t0\ttranscript_id "g1.t1"; gene_id "g1";
+chr1\tAUGUSTUS\texon\t301\t400\t.\t+\t.\ttranscript_id "g1.t1"; gene_id "g1";
+chr1\tAUGUSTUS\tCDS\t301\t380\t.\t+\t1\ttranscript_id "g1.t1"; gene_id "g1";
+# protein sequence = [MKLV]
+'''
+
+
+def bed_genes():
+    return list(featureio.parse(io.StringIO(BED), 'bed12'))
+
+
+def assert_same(genes, expected):
+    genes = list(genes)
+    assert [str(g) for g in genes] == [str(g) for g in expected]
+    assert [(g.exons, g.cds_exons, g.attrs) for g in genes] == \
+        [(g.exons, g.cds_exons, g.attrs) for g in expected]
+
+
+def test_to_arrow():
+    genes = bed_genes()
+    genes[0].attrs = {'ID': 'g1', 'Note': 'first'}
+    table = featureio.to_arrow(genes, batch_size=2)
+    assert table.num_rows == 3
+    assert 'aux' not in table.schema.names
+    assert table.column('block_sizes').type == pa.list_(pa.int32())
+    assert table.column('block_starts').to_pylist()[0] == [0, 150, 320]
+    assert table.column('item_rgb').to_pylist()[1] == '255,0,0'
+    assert_same(featureio.from_arrow(table), genes)
+    assert_same(featureio.from_arrow(table, lazy=True), genes)
+
+
+def test_aux_attributes():
+    genes = list(featureio.parse(io.StringIO(AUGUSTUS), 'augustusgtf'))
+    genes.append(bed_genes()[0])
+    table = featureio.to_arrow(genes)
+    assert table.column('aux').to_pylist()[0] == {'seq': 'MKLV',
+                                                  'gene_id': 'g1'}
+    back = list(featureio.from_arrow(table))
+    assert (back[0].seq, back[0].gene_id) == ('MKLV', 'g1')
+    assert not hasattr(back[1], 'seq')
+    with pytest.raises(ValueError):
+        # the schema of the first batch has no auxiliary attributes
+        list(featureio.to_record_batches(genes[::-1], batch_size=1))
+
+
+def test_parquet(tmp_path):
+    genes = bed_genes()
+    filename = str(tmp_path / 'genes.parquet')
+    featureio.write(genes, filename, 'parquet')
+    assert_same(featureio.parse(filename, 'parquet'), genes)
+
+    handle = io.BytesIO()
+    writer = featureio.ParquetWriter(handle, batch_size=2)
+    writer.write_file(genes)
+    handle.seek(0)
+    import pyarrow.parquet as pq
+    assert pq.ParquetFile(handle).num_row_groups == 2
+    handle.seek(0)
+    assert_same(featureio.parse(handle, 'parquet', lazy=True), genes)
+
+
+def test_empty_parquet(tmp_path):
+    filename = str(tmp_path / 'genes.parquet')
+    featureio.write([], filename, 'parquet')
+    assert list(featureio.parse(filename, 'parquet')) == []
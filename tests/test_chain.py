@@ -0,0 +1,84 @@
+import io
+
+import pytest
+import featureio
+
+from .helpers import gene
+
+CHAINS = '''\
+chain 1000 chr1 1000 + 100 400 chrA 2000 + 500 800 1
+100 10 0
+90 0 10
+100
+
+chain 500 chr2 1000 + 0 100 chrB 500 - 0 100 2
+100
+
+chain 300 chr3 1000 + 0 200 chrC 1000 + 0 100 3
+100
+
+chain 200 chr3 1000 + 300 400 chrD 1000 + 0 100 4
+100
+'''
+
+
+@pytest.fixture
+def index():
+    return featureio.ChainIndex(featureio.parse_chains(io.StringIO(CHAINS)))
+
+
+def test_parse_chains():
+    chain = next(featureio.parse_chains(io.StringIO(CHAINS)))
+    assert (chain.t_name, chain.q_name, chain.q_strand, chain.id) == \
+        ('chr1', 'chrA', '+', '1')
+    assert chain.t_starts.tolist() == [100, 210, 300]
+    assert chain.q_starts.tolist() == [500, 600, 700]
+    assert chain.sizes.tolist() == [100, 90, 100]
+
+
+def test_parse_chains_errors():
+    with pytest.raises(ValueError):
+        list(featureio.parse_chains(io.StringIO('100 10 0\n')))
+    with pytest.raises(ValueError):
+        list(featureio.parse_chains(io.StringIO(CHAINS.split('\n\n')[0][:-4])))
+
+
+def test_map_positions(index):
+    chain, q = index.map_positions('chr1', [99, 100, 205, 215, 399, 400])
+    assert chain.tolist() == [-1, 0, -1, 0, 0, -1]
+    assert q[chain >= 0].tolist() == [500, 605, 799]
+    chain, q = index.map_positions('chr2', [0, 99])
+    assert q.tolist() == [499, 400]
+    assert index.aligned_bases('chr1', [90, 190], [110, 220]).tolist() == \
+        [10, 20]
+
+
+def test_liftover(index):
+    genes = [gene('chr1', '+', (110, 150), (320, 350), cds=(120, 340)),
+             gene('chr2', '+', (10, 20), (50, 60), cds=(12, 55)),
+             gene('chr1', '-', (150, 180), cds=(150, 150))]
+    lifted, failures = featureio.liftover(genes, index)
+    assert not failures
+    plus, minus, noncoding = lifted
+    assert (plus.chrom, plus.strand, plus.exons, plus.cds_start,
+            plus.cds_end) == ('chrA', '+', ((510, 550), (720, 750)), 520, 740)
+    assert (minus.chrom, minus.strand, minus.exons, minus.cds_start,
+            minus.cds_end) == ('chrB', '-', ((440, 450), (480, 490)), 445, 488)
+    assert (noncoding.cds_start, noncoding.cds_end) == (550, 550)
+
+
+def test_liftover_failures(index):
+    genes = [gene('chr1', '+', (190, 220), name='gap'),
+             gene('chr1', '+', (205, 250), name='deleted'),
+             gene('chrX', '+', (0, 10), name='missing'),
+             gene('chr3', '+', (10, 20), (310, 320), name='split'),
+             gene('chr1', '+', (110, 150), cds=(120, 205), name='cds')]
+    lifted, failures = featureio.liftover(genes, index)
+    assert not lifted
+    assert [(g.name, reason) for g, reason in failures] == [
+        ('gap', 'Partially deleted in new'), ('deleted', 'Deleted in new'),
+        ('missing', 'Deleted in new'), ('split', 'Split in new'),
+        ('cds', 'CDS deleted in new')]
+    lifted, _ = featureio.liftover(genes[:1], io.StringIO(CHAINS),
+                                   min_match=0.5)
+    assert lifted[0].exons == ((590, 610),)
@@ -0,0 +1,102 @@
+import io
+import itertools
+import os
+
+import numpy as np
+import pytest
+import featureio
+
+
+def naive_kmers(seq, k):
+    counts = {''.join(p): 0 for p in itertools.product('ACGT', repeat=k)}
+    for i in range(len(seq) - k + 1):
+        if seq[i:i + k].upper() in counts:
+            counts[seq[i:i + k].upper()] += 1
+    return counts
+
+
+def test_count_kmers():
+    seq = 'ACGTNacgtTTGCAAcg'
+    counts = featureio.count_kmers(seq, 3)
+    expected = naive_kmers(seq, 3)
+    assert {featureio.kmer_string(i, 3): c for i, c in enumerate(counts)} == \
+        expected
+    with pytest.raises(ValueError):
+        featureio.count_kmers(seq, 13)
+
+
+def test_count_canonical_kmers():
+    counts = featureio.count_kmers('AAAATTTT', 2, canonical=True)
+    index = {featureio.kmer_string(i, 2): c for i, c in enumerate(counts)}
+    assert index['AA'] == 6
+    assert index['AT'] == 1
+    assert index['TT'] == 0
+
+
+def test_composition_stream_chunks():
+    fasta = '>a\nACGTN\nacgtg\nGG\n>b\nNNNN\n>c\n'
+    result = featureio.sequence_composition(io.StringIO(fasta), k=2,
+                                            window=4, chunk_size=4)
+    assert list(result) == ['a', 'b', 'c']
+    a = result['a']
+    assert a.length == 12
+    assert a.base_counts == {'A': 2, 'C': 2, 'G': 5, 'T': 2, 'N': 1}
+    assert a.masked_fraction == 5 / 12
+    assert a.gc == 7 / 11
+    assert list(a.window_bases) == [4, 3, 4]
+    assert list(a.gc_windows()) == [0.5, 2 / 3, 0.75]
+    assert {featureio.kmer_string(i, 2): c
+            for i, c in enumerate(a.kmers)} == naive_kmers('ACGTNacgtgGG', 2)
+    assert result['b'].n_fraction == 1.0
+    assert result['c'].length == 0
+
+    total = featureio.merge_compositions(result.values())
+    assert total.length == 16
+    assert total.window is None
+    assert total.kmers.sum() == a.kmers.sum()
+
+
+@pytest.mark.fasta
+def test_composition_indexed_parallel(fasta_dir):
+    filename = os.path.join(fasta_dir, 'GCF_000744065.1_ASM74406v1_genomic.fna')
+    indexed_fasta = featureio.IndexedFasta(filename)
+    serial = featureio.sequence_composition(indexed_fasta, k=4, window=100,
+                                            chunk_size=1000)
+    streamed = featureio.sequence_composition(filename, k=4, window=100,
+                                              chunk_size=700, workers=2)
+    assert list(serial) == list(indexed_fasta.sequences())
+    for name, c in serial.items():
+        seq = indexed_fasta[name].sequence
+        assert c.length == len(seq)
+        assert np.array_equal(c.kmers, featureio.count_kmers(seq, 4))
+        assert np.array_equal(c.histogram, streamed[name].histogram)
+        assert np.array_equal(c.kmers, streamed[name].kmers)
+        assert np.array_equal(c.window_gc, streamed[name].window_gc)
+
+
+@pytest.mark.fasta
+def test_genome_composition(fasta_dir):
+    filename = os.path.join(fasta_dir, 'GCF_000744065.1_ASM74406v1_genomic.fna')
+    per_sequence = featureio.sequence_composition(filename, k=5)
+    total = featureio.genome_composition(
+        featureio.IndexedFasta(filename), k=5, chunk_size=1000)
+    merged = featureio.merge_compositions(per_sequence.values())
+    assert total.length == merged.length
+    assert total.k == 5
+    assert np.array_equal(total.kmers, merged.kmers)
+    assert np.array_equal(total.histogram, merged.histogram)
+
+
+@pytest.mark.fasta
+def test_composition_collection(fasta_dir):
+    filenames = [os.path.join(fasta_dir, name) for name in (
+        'GCF_000744065.1_ASM74406v1_genomic.fna', 'random.fa')]
+    collection = featureio.IndexedFastaCollection(filenames)
+    composition = featureio.sequence_composition(collection, k=3,
+                                                 chunk_size=1000)
+    assert set(composition) == set(collection.keys())
+    for filename in filenames:
+        for name, c in featureio.sequence_composition(
+                featureio.IndexedFasta(filename), k=3).items():
+            assert c.length == composition[name].length
+            assert np.array_equal(c.kmers, composition[name].kmers)
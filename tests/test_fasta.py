@@ -1,3 +1,4 @@
+import io
 import os
 import pathlib
 
@@ -183,3 +184,188 @@ def test_write_fasta(tmp_path):
     p: pathlib.Path = tmp_path / 'test'
     featureio.write_fasta_record(seq, p.open('w'), wrap=2)
     assert p.read_text() == '>testname\nAA\nAA\nAA\nAA\n'
+
+
+@pytest.mark.fasta
+def test_fetch_many(fasta_dir):
+    indexed_fasta = featureio.IndexedFasta(os.path.join(fasta_dir, 'random.fa'))
+    seq1 = indexed_fasta['seq1'].sequence
+    seq2 = indexed_fasta['seq2'].sequence
+    regions = [('seq2', 100, 250), ('seq1', 55, 130), ('seq1', 0, 10, '-'),
+               ('seq1', 7600, 9000), ('seq1', 20, 20)]
+    expected = [seq2[100:250], seq1[55:130],
+                featureio.reverse_complement(seq1[0:10]), seq1[7600:], '']
+    assert indexed_fasta.fetch_many(regions) == expected
+    assert indexed_fasta.fetch_many(regions, max_gap=0) == expected
+    assert indexed_fasta.fetch('seq1', 55, 130) == seq1[55:130]
+
+
+@pytest.mark.fasta
+def test_fetch_many_errors(fasta_dir):
+    indexed_fasta = featureio.IndexedFasta(os.path.join(fasta_dir, 'random.fa'))
+    with pytest.raises(KeyError):
+        indexed_fasta.fetch_many([('idontexist', 0, 10)])
+    with pytest.raises(ValueError):
+        indexed_fasta.fetch_many([('seq1', -1, 10)])
+    with pytest.raises(ValueError):
+        indexed_fasta.fetch_many([('seq1', 0)])
+
+
+@pytest.mark.fasta
+def test_fetch_many_collection(fasta_dir):
+    indexed_fasta = featureio.IndexedFastaCollection(
+        [os.path.join(fasta_dir, fn) for fn in
+         ['random.fa', 'GCF_000744065.1_ASM74406v1_genomic.fna']])
+    regions = [('NZ_BBIY01000160.1', 20, 30), ('seq1', 0, 5),
+               ('NZ_BBIY01000160.1', 0, 5, '-')]
+    seqs = indexed_fasta.fetch_many(regions)
+    assert seqs == [indexed_fasta[r[0]][r[1]:r[2]] for r in regions[:2]] + [
+        featureio.reverse_complement(indexed_fasta['NZ_BBIY01000160.1'][0:5])]
+
+
+@pytest.mark.fasta
+def test_gene_sequences_from_index(fasta_dir):
+    indexed_fasta = featureio.IndexedFasta(os.path.join(fasta_dir, 'random.fa'))
+    seq1 = indexed_fasta['seq1']
+    genes = [featureio.Gene('seq1', 100, 400, 'plus', 0, '+', 120, 380, 0, 2,
+                            '50,100', '0,200'),
+             featureio.Gene('seq1', 100, 400, 'minus', 0, '-', 120, 380, 0, 2,
+                            '50,100', '0,200')]
+    for gene in genes:
+        assert gene.get_exons(indexed_fasta) == gene.get_exons(seq1)
+        assert gene.get_cds(indexed_fasta) == gene.get_cds(seq1)
+    assert featureio.get_sequences(genes, indexed_fasta) == \
+        [gene.get_exons(seq1) for gene in genes]
+
+
+@pytest.mark.fasta
+@pytest.mark.parametrize('buffer_size', [7, 64, 1 << 20])
+def test_fasta_writer(tmp_path, buffer_size):
+    seqs = [featureio.Seq('a', 'ACGT' * 50, 'first sequence'),
+            featureio.Seq('b', ''), featureio.Seq('c', 'ACG'),
+            featureio.Seq('d', 'TTAA' * 12)]
+    filename = str(tmp_path / 'out.fa')
+    with featureio.FastaWriter(filename, wrap=6, buffer_size=buffer_size,
+                               index=True) as writer:
+        writer.write_all(seqs)
+        writer.start_record('e')
+        for chunk in ['A', 'CGTAC', b'GTACGTA', 'C' * 40, '']:
+            writer.write_chunk(chunk)
+    with open(filename) as f:
+        text = f.read()
+    expected_seqs = seqs + [featureio.Seq('e', 'ACGTACGTACGTA' + 'C' * 40)]
+    assert text == ''.join(featureio.fasta_string(s, wrap=6)
+                           for s in expected_seqs).replace('>b\n\n', '>b\n')
+    indexed_fasta = featureio.IndexedFasta(filename)
+    for seq in expected_seqs:
+        assert indexed_fasta.fetch(seq.name, 0, len(seq)) == seq.sequence
+    assert indexed_fasta.fetch('e', 3, 20) == expected_seqs[-1].sequence[3:20]
+
+
+@pytest.mark.fasta
+def test_fasta_writer_handles(tmp_path):
+    seq = featureio.Seq('testname', 'AAAAAAAA')
+    text = io.StringIO()
+    index = io.StringIO()
+    featureio.write_fasta([seq], text, wrap=3, index=index)
+    assert text.getvalue() == '>testname\nAAA\nAAA\nAA\n'
+    assert index.getvalue() == 'testname\t8\t10\t3\t4\n'
+    binary = io.BytesIO()
+    featureio.write_fasta([seq], binary, wrap=3)
+    assert binary.getvalue().decode() == text.getvalue()
+    p = tmp_path / 'test'
+    with p.open('w') as f:
+        f.write('>first\nA\n')
+        featureio.write_fasta([seq], f, wrap=3)
+    assert p.read_text() == '>first\nA\n>testname\nAAA\nAAA\nAA\n'
+    with pytest.raises(ValueError):
+        featureio.FastaWriter(text, index=True)
+    with pytest.raises(ValueError):
+        featureio.FastaWriter(text).write_chunk('A')
+
+
+def test_byte_seq_views():
+    text = 'ACgtnNAcGT'
+    seq = featureio.ByteSeq('s', text.encode())
+    assert len(seq) == 10 and str(seq) == text and seq.sequence == text
+    window = seq[2:8]
+    assert window.data.obj is seq.data.obj
+    assert str(window) == text[2:8] and window[1] == 't'
+    assert str(seq[-3:]) == text[-3:] and seq[-1] == 'T'
+    assert str(seq.upper()[2:5]) == 'GTN'
+    assert str(seq.mask()) == 'ACNNNNANGT'
+    assert str(seq.reverse_complement()) == \
+        featureio.reverse_complement(text)
+    assert str(seq.reverse_complement()[1:4]) == \
+        featureio.reverse_complement(text)[1:4]
+    assert str(seq.mask().reverse_complement().upper()) == \
+        featureio.reverse_complement('ACNNNNANGT')
+    assert str(seq[3:3]) == '' and bytes(seq[:2]) == b'AC'
+    with pytest.raises(ValueError):
+        _ = seq[::2]
+    with pytest.raises(IndexError):
+        _ = seq[10]
+
+
+def test_soft_masked_intervals():
+    seq = featureio.ByteSeq('s', 'aaCCgTTtt')
+    starts, ends = seq.soft_masked_intervals()
+    assert starts.tolist() == [0, 4, 7] and ends.tolist() == [2, 5, 9]
+    starts, ends = seq[1:8].soft_masked_intervals()
+    assert starts.tolist() == [0, 3, 6] and ends.tolist() == [1, 4, 7]
+    rc = seq.reverse_complement()
+    starts, ends = rc.soft_masked_intervals()
+    assert [str(rc)[s:e] for s, e in zip(starts, ends)] == ['aa', 'c', 'tt']
+    assert featureio.ByteSeq('s', '').soft_masked_intervals()[0].size == 0
+
+
+def test_byte_seq_writing_and_genes():
+    seq = featureio.ByteSeq('s', 'ACGTacgtAC')
+    out = io.StringIO()
+    featureio.write_fasta([seq, seq.reverse_complement()], out, wrap=4)
+    assert out.getvalue() == '>s\nACGT\nacgt\nAC\n>s\nGTac\ngtAC\nGT\n'
+    gene = featureio.Gene('s', 0, 10, 'g', 0, '-', 0, 10, 0, 2, '2,3', '0,5')
+    assert gene.get_exons(seq) == gene.get_exons(featureio.Seq('s', str(seq)))
+
+
+@pytest.mark.fasta
+def test_lazy_collection(fasta_dir):
+    files = [os.path.join(fasta_dir, fn) for fn in
+             ['random.fa', 'GCF_000744065.1_ASM74406v1_genomic.fna']]
+    eager = featureio.IndexedFastaCollection(files)
+    lazy = featureio.IndexedFastaCollection(files, lazy=True)
+    assert not lazy._indices
+    assert lazy.fetch('seq1', 0, 10) == eager.fetch('seq1', 0, 10)
+    assert lazy.lengths() == eager.lengths()
+    assert set(lazy._indices) == set(files)
+    collision = featureio.IndexedFastaCollection(files[:1] * 2, lazy=True)
+    with pytest.raises(ValueError):
+        _ = 'seq1' in collision
+
+
+@pytest.mark.fasta
+def test_collection_lookup(fasta_dir, tmp_path):
+    files = [os.path.join(fasta_dir, fn) for fn in
+             ['random.fa', 'GCF_000744065.1_ASM74406v1_genomic.fna']]
+    eager = featureio.IndexedFastaCollection(files)
+    lookup = str(tmp_path / 'lookup')
+    eager.write_lookup(lookup)
+    collection = featureio.IndexedFastaCollection(lookup=lookup)
+    assert collection.files == files
+    assert sorted(collection.keys()) == list(collection.keys()) == \
+        sorted(eager.keys())
+    assert collection.lengths() == eager.lengths()
+    assert 'seq1' in collection and 'seq' not in collection
+    assert 'a_sequence_name_longer_than_any_other' not in collection
+    assert not collection._indices
+    regions = [('seq2', 5, 50), ('seq1', 0, 10, '-')]
+    assert collection.fetch_many(regions) == eager.fetch_many(regions)
+    assert list(collection._indices) == files[:1]
+    assert collection['NZ_BBIY01000160.1'].sequence == \
+        eager['NZ_BBIY01000160.1'].sequence
+    with pytest.raises(KeyError):
+        collection.fetch('seq', 0, 1)
+    with pytest.raises(ValueError):
+        featureio.IndexedFastaCollection(files[::-1], lookup=lookup)
+    with pytest.raises(ValueError):
+        featureio.IndexedFastaCollection(lookup=files[0])
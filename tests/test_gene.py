@@ -0,0 +1,162 @@
+import io
+
+import numpy as np
+import pytest
+import featureio
+
+BED12 = ('chr1\t100\t400\tplus\t0\t+\t120\t380\t0\t2\t50,100,\t0,200,\n'
+         'chr2\t1000\t1500\tminus\t0\t-\t1000\t1500\t0\t3\t10,20,30,\t'
+         '0,100,470,\n')
+
+
+def test_lazy_parse_matches_eager():
+    eager = list(featureio.parse(io.StringIO(BED12), 'bed12'))
+    lazy = list(featureio.parse(io.StringIO(BED12), 'bed12', lazy=True))
+    for e, l in zip(eager, lazy):
+        assert '_blocks' in l.__dict__
+        assert (l.chrom, l.start, l.end, l.name) == \
+            (e.chrom, e.start, e.end, e.name)
+        assert '_blocks' in l.__dict__
+        assert l.exons == e.exons
+        assert '_blocks' not in l.__dict__
+        for attr in ['block_sizes', 'block_starts', 'cds_exons', 'length',
+                     'cds_length', 'fivep', 'cds_fivep']:
+            assert getattr(l, attr) == getattr(e, attr)
+        assert str(l) == str(e)
+
+
+def test_lazy_missing_attribute():
+    gene = next(featureio.parse(io.StringIO(BED12), 'bed12', lazy=True))
+    with pytest.raises(AttributeError):
+        _ = gene.idontexist
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_copy_shares_coordinates(lazy):
+    gene = featureio.Gene('chr1', 100, 400, 'g', 0, '+', 120, 380, 0, 2,
+                          '50,100', '0,200', {'ID': 'g'}, lazy=lazy,
+                          gene_id='gid')
+    copy = gene.copy()
+    assert copy.exons == gene.exons
+    assert gene.copy().exons is gene.exons
+    assert copy.attrs == gene.attrs and copy.attrs is not gene.attrs
+    assert copy.gene_id == 'gid'
+    modified = gene.modified(name='h')
+    assert modified.name == 'h' and gene.name == 'g'
+    assert str(modified) == str(gene).replace('\tg\t', '\th\t')
+
+
+def test_transcript_coordinates():
+    plus, minus = featureio.parse(io.StringIO(BED12), 'bed12')
+    # plus exons: [100, 150), [300, 400)
+    assert plus.genome_to_transcript(100) == 0
+    assert plus.genome_to_transcript(149) == 49
+    assert plus.genome_to_transcript(300) == 50
+    assert plus.genome_to_transcript(150) is None
+    assert plus.genome_to_transcript(400) is None
+    assert plus.transcript_to_genome(50) == 300
+    assert plus.transcript_to_genome(150) is None
+    # minus exons: [1000, 1010), [1100, 1120), [1470, 1500)
+    assert minus.genome_to_transcript(1499) == 0
+    assert minus.genome_to_transcript(1470) == 29
+    assert minus.genome_to_transcript(1119) == 30
+    assert minus.genome_to_transcript(1000) == 59
+    assert minus.transcript_to_genome(30) == 1119
+    assert minus.transcript_to_genome(-1) is None
+    for gene in (plus, minus):
+        for pos in range(gene.start - 5, gene.end + 5):
+            tx = gene.genome_to_transcript(pos)
+            assert tx is None or gene.transcript_to_genome(tx) == pos
+
+
+def test_cds_coordinates():
+    plus, _ = featureio.parse(io.StringIO(BED12), 'bed12')
+    # cds exons: [120, 150), [300, 380)
+    assert plus.genome_to_cds(120) == 0
+    assert plus.genome_to_cds(110) is None
+    assert plus.cds_to_genome(30) == 300
+    assert plus.cds_to_genome(110) is None
+
+
+def test_coordinates_arrays():
+    for gene in featureio.parse(io.StringIO(BED12), 'bed12'):
+        positions = np.arange(gene.start - 5, gene.end + 5)
+        expected = [gene.genome_to_transcript(int(p)) for p in positions]
+        result = gene.genome_to_transcript(positions)
+        assert result.tolist() == [-1 if e is None else e for e in expected]
+        tx = np.arange(-2, gene.length + 2)
+        expected = [gene.transcript_to_genome(int(p)) for p in tx]
+        assert gene.transcript_to_genome(tx).tolist() == \
+            [-1 if e is None else e for e in expected]
+        assert (gene.cds_to_genome(np.array([0])) >= 0).all()
+    noncoding = featureio.Gene('chr1', 0, 10, 'n', 0, '+', 0, 0, 0, 1, '10',
+                               '0')
+    assert noncoding.genome_to_cds(np.array([5])).tolist() == [-1]
+    assert noncoding.cds_to_genome(np.array([5])).tolist() == [-1]
+    assert noncoding.cds_to_genome(0) is None
+
+
+def test_coordinates_follow_modifications():
+    gene, _ = featureio.parse(io.StringIO(BED12), 'bed12')
+    assert gene.genome_to_transcript(100) == 0
+    assert gene.modified(strand='-').genome_to_transcript(100) == 149
+    assert gene.modified(exons=((50, 150),)).genome_to_transcript(100) == 50
+
+
+def test_deduplicate():
+    a = featureio.Gene('chr1', 100, 400, 'a', 0, '+', 120, 380, 0, 2,
+                       '50,100', '0,200')
+    b = a.modified(name='b', end=420, exons=((100, 150), (300, 420)),
+                   length=a.length + 20)
+    c = a.modified(name='c', exons=a.exons[::-1])
+    d = a.modified(name='d', chrom='chr2')
+    e = a.modified(name='e', strand='-')
+    genes = [a, b, c, d, e]
+    result = list(featureio.deduplicate(genes))
+    assert [(g.name, names) for g, names in result] == [
+        ('a', ['a', 'c']), ('b', ['b']), ('d', ['d']), ('e', ['e'])]
+    result = list(featureio.deduplicate(genes, 'cds_exons', keep='longest'))
+    assert [(g.name, names) for g, names in result] == [
+        ('b', ['a', 'b', 'c']), ('d', ['d']), ('e', ['e'])]
+    result = list(featureio.deduplicate(
+        genes, keep=lambda group: group[-1]))
+    assert [g.name for g, _ in result] == ['c', 'b', 'd', 'e']
+    with pytest.raises(ValueError):
+        list(featureio.deduplicate(genes, keep='last'))
+
+
+def test_deduplicate_grouped():
+    genes = list(featureio.parse(io.StringIO(BED12 * 2), 'bed12'))
+    noncoding = genes[1].modified(name='noncoding', cds_exons=())
+    genes += [noncoding, noncoding.modified(name='noncoding2')]
+    result = featureio.deduplicate(genes, 'cds_exons', grouped=True)
+    assert [names for _, names in result] == [
+        ['plus'], ['minus'], ['plus'], ['minus'], ['noncoding'],
+        ['noncoding2']]
+    result = featureio.deduplicate(genes, 'cds_exons')
+    assert [names for _, names in result] == [
+        ['plus', 'plus'], ['minus', 'minus'], ['noncoding'], ['noncoding2']]
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'start': 0}, {'cds_start': 130}, {'exons': ((100, 150),)},
+    {'cds_exons': ()}, {'block_sizes': (10, 20)}])
+def test_lazy_modified_matches_eager(kwargs):
+    eager = next(featureio.parse(io.StringIO(BED12), 'bed12'))
+    lazy = next(featureio.parse(io.StringIO(BED12), 'bed12', lazy=True))
+    eager, lazy = eager.modified(**kwargs), lazy.modified(**kwargs)
+    for attr in ['length', 'block_sizes', 'block_starts', 'exons',
+                 'cds_exons', 'cds_length']:
+        assert getattr(lazy, attr) == getattr(eager, attr)
+
+
+@pytest.mark.parametrize('attr,value', [('start', 0), ('cds_start', 130),
+                                        ('cds_end', 300)])
+def test_lazy_assignment_matches_eager(attr, value):
+    eager = next(featureio.parse(io.StringIO(BED12), 'bed12'))
+    lazy = next(featureio.parse(io.StringIO(BED12), 'bed12', lazy=True))
+    setattr(eager, attr, value)
+    setattr(lazy, attr, value)
+    assert getattr(lazy, attr) == value
+    for a in ['exons', 'cds_exons', 'length', 'cds_length']:
+        assert getattr(lazy, a) == getattr(eager, a)
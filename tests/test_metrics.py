@@ -0,0 +1,84 @@
+import io
+import json
+import os
+
+import pytest
+import featureio
+from featureio import metrics
+
+BED12 = ('chr1\t100\t400\tplus\t0\t+\t120\t380\t0\t2\t50,100,\t0,200,\n'
+         'chr2\t1000\t1500\tminus\t0\t-\t1000\t1500\t0\t1\t500,\t0,\n')
+
+
+@pytest.fixture
+def registry():
+    metrics.reset()
+    with metrics.recording() as registry:
+        yield registry
+    metrics.reset()
+
+
+def test_disabled_by_default():
+    metrics.reset()
+    assert not metrics.enabled()
+    list(featureio.parse(io.StringIO(BED12), 'bed12'))
+    assert metrics.to_dict() == {'counters': {}, 'timers': {}}
+
+
+def test_reader_metrics(registry):
+    genes = list(featureio.parse(io.StringIO(BED12), 'bed12', lazy=True))
+    assert len(genes) == 2
+    counters = metrics.to_dict()['counters']
+    assert counters['read.bed12.records'] == 2
+    assert counters['read.bed12.bytes'] == len(BED12)
+    timers = metrics.to_dict()['timers']
+    assert timers['read.bed12.time']['count'] == 2
+    assert timers['read.bed12.construct']['count'] == 2
+    assert timers['read.bed12.construct']['total'] <= \
+        timers['read.bed12.time']['total']
+    # one read per line and one at the end of the file
+    assert timers['read.bed12.io']['count'] == 3
+
+
+def test_writer_metrics(registry):
+    genes = list(featureio.parse(io.StringIO(BED12), 'bed12'))
+    out = io.StringIO()
+    featureio.write(genes, out, 'bed12')
+    result = json.loads(metrics.to_json())
+    assert result['counters']['write.Bed12Writer.records'] == 2
+    assert result['counters']['write.Bed12Writer.bytes'] == \
+        len(out.getvalue())
+    assert result['timers']['write.Bed12Writer.io']['count'] == 2
+    assert result['timers']['write.Bed12Writer.time']['count'] == 1
+
+
+@pytest.mark.fasta
+def test_fetch_metrics(registry, fasta_dir):
+    indexed_fasta = featureio.IndexedFasta(os.path.join(fasta_dir, 'random.fa'))
+    indexed_fasta.fetch_many([('seq1', 0, 10), ('seq1', 20, 30),
+                              ('seq2', 0, 10)], max_gap=100)
+    counters = metrics.to_dict()['counters']
+    assert counters['fetch.regions'] == 3
+    assert counters['fetch.reads'] == 2
+    assert counters['fetch.coalesced'] == 1
+
+    metrics.reset()
+    seq = indexed_fasta.get_sequence('seq1')
+    counters = metrics.to_dict()['counters']
+    assert counters['fetch.records'] == 1
+    assert counters['fetch.bytes'] >= len(seq.sequence)
+    assert metrics.to_dict()['timers']['fetch.time']['count'] == 1
+
+
+def test_listener_and_report(registry):
+    events = []
+    metrics.add_listener(lambda *event: events.append(event))
+    metrics.count('custom', 3)
+    with metrics.timer('stage'):
+        pass
+    metrics.remove_listener(metrics.registry.listeners[0])
+    assert events[0] == ('counter', 'custom', 3)
+    assert events[1][:2] == ('timer', 'stage')
+    reports = []
+    metrics.report(reports.append)
+    assert reports[0]['counters'] == {'custom': 3}
@@ -0,0 +1,20 @@
+import io
+
+import featureio
+
+PSL = ('100\t0\t0\t0\t0\t0\t1\t50\t+\tread1\t100\t0\t100\tchr1\t1000\t'
+       '200\t350\t2\t40,60,\t0,40,\t200,290,\n')
+BLAT_HEADER = 'psLayout version 3\n\nmatch\tmis-\nmatch\tmatch\n------\n'
+
+
+def test_psl():
+    gene, = featureio.parse(io.StringIO(PSL), 'psl')
+    assert (gene.chrom, gene.start, gene.end, gene.name) == \
+        ('chr1', 200, 350, 'read1')
+    assert gene.exons == ((200, 240), (290, 350))
+
+
+def test_blat_psl():
+    gene, = featureio.parse(io.StringIO(BLAT_HEADER + PSL), 'blatpsl')
+    psl_gene, = featureio.parse(io.StringIO(PSL), 'psl')
+    assert str(gene) == str(psl_gene)
@@ -0,0 +1,68 @@
+import io
+import random
+
+import pytest
+import featureio
+
+
+@pytest.fixture
+def bed(tmp_path):
+    rng = random.Random(3)
+    filename = str(tmp_path / 'genes.bed')
+    with open(filename, 'w') as f:
+        for i in range(500):
+            # few distinct starts, so the sort must be stable
+            start = rng.randrange(0, 1000, 100)
+            f.write(f'chr{rng.randrange(3)}\t{start}\t{start + 200}\tg{i}\t0\t'
+                    f'{rng.choice("+-")}\t{start + 10}\t{start + 190}\t0\t2\t'
+                    f'50,30\t0,170\n')
+    return filename
+
+
+def expected(filename, key):
+    genes = sorted(featureio.parse(filename, 'bed12'), key=key)
+    out = io.StringIO()
+    featureio.write(genes, out, 'bed12')
+    return out.getvalue()
+
+
+@pytest.mark.parametrize('mem_limit,workers', [
+    ('1G', 1), (8000, 1), (8000, 2)])
+def test_sort(bed, tmp_path, mem_limit, workers):
+    out = str(tmp_path / 'sorted.bed')
+    n = featureio.sort(bed, 'bed12', out, mem_limit=mem_limit,
+                       workers=workers)
+    assert n == 500
+    with open(out) as f:
+        assert f.read() == expected(bed, lambda g: (g.chrom, g.start))
+
+
+def test_sort_intermediate_merges(bed, tmp_path):
+    out = str(tmp_path / 'sorted.bed')
+    featureio.sort(bed, 'bed12', out, key='strand,end', mem_limit=2000,
+                   max_open=3)
+    with open(out) as f:
+        assert f.read() == expected(bed, lambda g: (g.strand, g.end))
+
+
+def test_sort_to_other_format(bed):
+    out = io.StringIO()
+    featureio.sort(bed, 'bed12', out, key=lambda g: -g.end, out_format='gff3')
+    expected_out = io.StringIO()
+    featureio.write(sorted(featureio.parse(bed, 'bed12'),
+                           key=lambda g: -g.end), expected_out, 'gff3')
+    assert out.getvalue() == expected_out.getvalue()
+
+
+def test_sort_errors(bed):
+    with pytest.raises(ValueError):
+        featureio.sort(bed, 'bed12', io.StringIO(), out_format='psl')
+    with pytest.raises(ValueError):
+        featureio.sort(bed, 'bed12', io.StringIO(), mem_limit='lots')
+
+
+def test_parse_size():
+    assert featureio.parse_size('512M') == 512 << 20
+    assert featureio.parse_size('1.5k') == 1536
+    assert featureio.parse_size('2GB') == 2 << 30
+    assert featureio.parse_size(100) == 100
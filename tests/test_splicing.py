@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+import featureio
+
+from .helpers import gene
+
+
+@pytest.fixture
+def genes():
+    return [gene('chr2', '+', (10, 20), (30, 40), (50, 60)),
+            gene('chr1', '-', (10, 20), (30, 40)),
+            gene('chr2', '+', (15, 20), (30, 45)),
+            gene('chr1', '+', (10, 20), (30, 40)),
+            gene('chr1', '+', (0, 5)),
+            gene('chr2', '+', (0, 20), (21, 25), (30, 35))]
+
+
+def test_junctions(genes):
+    result = featureio.junctions(genes)
+    assert result.dtype.names == ('chrom', 'strand', 'donor', 'acceptor',
+                                  'count')
+    assert result.tolist() == [('chr1', '+', 20, 29, 1),
+                               ('chr1', '-', 29, 20, 1),
+                               ('chr2', '+', 20, 20, 1),
+                               ('chr2', '+', 20, 29, 2),
+                               ('chr2', '+', 25, 29, 1),
+                               ('chr2', '+', 40, 49, 1)]
+    assert featureio.junctions(genes, min_length=2)['count'].sum() == 6
+
+
+def test_junctions_chunks(genes):
+    expected = featureio.junctions(genes)
+    for chunk_size in (1, 2, 4):
+        assert featureio.junctions(genes * 3, chunk_size=chunk_size).tolist() \
+            == [(*j[:4], j[4] * 3) for j in expected.tolist()]
+    assert len(featureio.junctions([])) == 0
+    assert len(featureio.junctions(genes[4:5])) == 0
+
+
+def test_junction_sets(genes):
+    a = featureio.junctions(genes[:3])
+    other = gene('chr10', '-', (0, 1), (5, 6))
+    b = featureio.junctions(genes[2:] + [other])
+    assert featureio.intersect_junctions(a, b).tolist() == [
+        ('chr2', '+', 20, 29, 2)]
+    assert featureio.subtract_junctions(a, b).tolist() == [
+        ('chr1', '-', 29, 20, 1), ('chr2', '+', 40, 49, 1)]
+    assert featureio.union_junctions(a, b).tolist() == \
+        featureio.junctions(genes[:3] + genes[2:] + [other]).tolist()
+    assert len(featureio.intersect_junctions(a, a[:0])) == 0
+
+
+def test_splice_motifs(tmp_path):
+    filename = str(tmp_path / 'genome.fa')
+    # a GT-AG intron at [10, 20) and a CT-AC one, GT-AG on '-', at [30, 40)
+    sequence = 'A' * 10 + 'GTCCCCCCAG' + 'A' * 10 + 'CTCCCCCCAC' + 'A' * 10
+    featureio.write_fasta([featureio.Seq('chr1', sequence)], filename,
+                          wrap=7, index=True)
+    result = featureio.junctions([gene('chr1', '+', (0, 10), (20, 30)),
+                                  gene('chr1', '-', (20, 30), (40, 50)),
+                                  gene('chr1', '+', (20, 30), (40, 50))])
+    motifs = featureio.splice_motifs(result, featureio.IndexedFasta(filename))
+    assert motifs.tolist() == ['GT-AG', 'CT-AC', 'GT-AG']
+    assert np.isin(motifs, featureio.CANONICAL_MOTIFS).tolist() == \
+        [True, False, True]
@@ -0,0 +1,55 @@
+import pytest
+import featureio
+
+
+def test_translate():
+    assert featureio.translate('ATGGCCTTTTAA') == 'MAF*'
+    assert featureio.translate('atggccttttaaGG') == 'MAF*'
+    assert featureio.translate('ATGNCCAUG') == 'MXM'
+    assert featureio.translate('') == ''
+    assert featureio.translate('TGA', table=2) == 'W'
+    with pytest.raises(ValueError):
+        featureio.translate('ATG', table=1000)
+
+
+def test_translate_standard_code():
+    bases = 'TCAG'
+    codons = [a + b + c for a in bases for b in bases for c in bases]
+    assert featureio.translate(''.join(codons)) == \
+        featureio.genetic_codes[1]
+
+
+def test_translate_many():
+    seqs = ['ATGGCCTTTTAA', 'ATGC', '', 'GGGNNN']
+    assert featureio.translate_many(seqs) == \
+        [featureio.translate(seq) for seq in seqs]
+
+
+def test_translate_gene_cds():
+    seq = featureio.Seq('chr', 'CCATGAAACCCGGGTTTTAGCC')
+    gene = featureio.Gene('chr', 0, 22, 'g', 0, '+', 3, 20, 0, 1, '22', '0')
+    assert featureio.translate(gene.get_cds(seq)) == 'MKPGF*'
+
+
+def test_find_orfs():
+    # forward ORF in frame 1 and reverse ORF in frame 0 of the reverse strand
+    forward = 'C' + 'ATGAAATAG' + 'CC'
+    seq = forward + featureio.reverse_complement('ATGCCCTGA')
+    orfs = featureio.find_orfs(seq, min_length=9)
+    assert orfs == [featureio.Orf(1, 10, '+', 1),
+                    featureio.Orf(12, 21, '-', 0)]
+    assert featureio.translate(seq[1:10]) == 'MK*'
+    assert featureio.translate(
+        featureio.reverse_complement(seq[12:21])) == 'MP*'
+    assert featureio.find_orfs(seq, min_length=12) == []
+
+
+def test_find_orfs_first_start():
+    orfs = featureio.find_orfs('ATGATGTAAATGTAGTAG', min_length=3)
+    assert [(orf.start, orf.end) for orf in orfs if orf.strand == '+'] == \
+        [(0, 9), (9, 15)]
+
+
+def test_translation_module():
+    # the module is not shadowed by the translate function
+    assert featureio.translation.translate is featureio.translate
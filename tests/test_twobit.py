@@ -0,0 +1,93 @@
+import os
+
+import pytest
+import featureio
+
+
+@pytest.fixture
+def masked_seqs():
+    return [featureio.Seq('chr1', 'ACGTNNNNacgtnnACGTRYacgTTTGa'),
+            featureio.Seq('chr2', 'GATTACA'),
+            featureio.Seq('empty', '')]
+
+
+@pytest.fixture
+def twobit_file(tmp_path, masked_seqs):
+    filename = str(tmp_path / 'test.2bit')
+    featureio.write_twobit(masked_seqs, filename)
+    return filename
+
+
+def expected_sequence(seq):
+    return ''.join(c if c.upper() in 'ACGT' else ('n' if c.islower() else 'N')
+                   for c in seq)
+
+
+def test_twobit_roundtrip(twobit_file, masked_seqs):
+    twobit = featureio.TwoBitFile(twobit_file)
+    assert len(twobit) == 3
+    assert list(twobit.sequences()) == ['chr1', 'chr2', 'empty']
+    for seq in masked_seqs:
+        assert seq.name in twobit
+        assert twobit[seq.name].sequence == expected_sequence(seq.sequence)
+
+
+def test_twobit_fetch_many(twobit_file, masked_seqs):
+    twobit = featureio.TwoBitFile(twobit_file)
+    chr1 = expected_sequence(masked_seqs[0].sequence)
+    regions = [('chr2', 1, 5), ('chr1', 3, 13), ('chr1', 5, 22, '-'),
+               ('chr1', 20, 100)]
+    assert twobit.fetch_many(regions) == [
+        'ATTA', chr1[3:13], featureio.reverse_complement(chr1[5:22]),
+        chr1[20:]]
+    assert twobit.fetch('chr1', 0, 4) == 'ACGT'
+    with pytest.raises(KeyError):
+        twobit.fetch('idontexist', 0, 4)
+    with pytest.raises(ValueError):
+        _ = twobit[1]
+
+
+def test_twobit_not_twobit(tmp_path):
+    p = tmp_path / 'test.2bit'
+    p.write_text('>hi\nAAAAAAAAAAAAAAAAAAAAAAAAA')
+    with pytest.raises(ValueError):
+        _ = featureio.TwoBitFile(str(p))
+
+
+@pytest.mark.fasta
+def test_fasta_to_twobit(fasta_dir, tmp_path):
+    fasta = os.path.join(fasta_dir, 'GCF_000744065.1_ASM74406v1_genomic.fna')
+    twobit_filename = str(tmp_path / 'genome.2bit')
+    featureio.fasta_to_twobit(fasta, twobit_filename)
+    indexed_fasta = featureio.IndexedFasta(fasta)
+    collection = featureio.IndexedFastaCollection(
+        [twobit_filename, os.path.join(fasta_dir, 'random.fa')])
+    for name in indexed_fasta.sequences():
+        assert collection[name].sequence == indexed_fasta[name].sequence
+    regions = [('NZ_BBIY01000160.1', 20, 30), ('seq1', 0, 100, '-')]
+    assert collection.fetch_many(regions) == [
+        indexed_fasta.fetch(*regions[0]),
+        featureio.IndexedFasta(os.path.join(fasta_dir, 'random.fa')).fetch(
+            *regions[1])]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 5, 8, 1 << 22])
+def test_fasta_to_twobit_chunks(tmp_path, masked_seqs, chunk_size):
+    fasta = str(tmp_path / 'test.fa')
+    with open(fasta, 'w') as f:
+        for seq in masked_seqs:
+            f.write(featureio.fasta_string(seq, wrap=5))
+    expected = str(tmp_path / 'expected.2bit')
+    featureio.write_twobit(masked_seqs, expected)
+    filename = str(tmp_path / 'test.2bit')
+    featureio.fasta_to_twobit(fasta, filename, chunk_size=chunk_size)
+    with open(filename, 'rb') as f, open(expected, 'rb') as g:
+        assert f.read() == g.read()
+    assert sorted(os.listdir(str(tmp_path))) == [
+        'expected.2bit', 'test.2bit', 'test.fa']
+
+
+def test_twobit_duplicate_names(tmp_path):
+    with pytest.raises(ValueError):
+        featureio.write_twobit([featureio.Seq('a', 'ACGT')] * 2,
+                               str(tmp_path / 'test.2bit'))